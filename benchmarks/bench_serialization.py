@@ -0,0 +1,120 @@
+"""
+Микробенчмарк сериализации данных узлов.
+
+Сравнивает для изображений разных размеров:
+  - сериализацию и десериализацию в одном процессе:
+      pickle   - pickle по умолчанию (PIL через tobytes());
+      frame    - core.serialization (протокол 5, внеполосные буферы);
+      frame+z  - то же со сжатием zlib;
+      shm      - кадр в разделяемой памяти (SharedValue);
+  - передачу изображения в воркер ProcessPoolExecutor теми же способами
+    (pool: изображение как аргумент; pool+frame: Frame с частями без склейки, как передает
+    LocalProcessBackend; pool+shm: имя блока).
+
+Запуск: python benchmarks/bench_serialization.py [--repeat 5]
+"""
+import os
+import sys
+import time
+import pickle
+import argparse
+import concurrent.futures
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.serialization import Frame, encode, decode
+from src.core.payloads import SharedValue
+
+SIZES = [(256, 256), (1024, 1024), (2048, 2048), (4096, 4096)]
+
+def _pickle_roundtrip(value):
+    data = pickle.dumps(value)
+    return pickle.loads(data), len(data)
+
+def _frame_roundtrip(value, compression=None):
+    data = encode(value, compression).tobytes()
+    return decode(data), len(data)
+
+def _shm_roundtrip(value):
+    shared = SharedValue(value)
+    try:
+        return shared.load(), shared.nbytes
+    finally:
+        shared.release()
+
+METHODS = {
+    "pickle": _pickle_roundtrip,
+    "frame": _frame_roundtrip,
+    "frame+z": lambda value: _frame_roundtrip(value, "zlib"),
+    "shm": _shm_roundtrip,
+}
+
+def _receive_image(payload):
+    if isinstance(payload, SharedValue):
+        payload = payload.load()
+    elif isinstance(payload, (bytes, Frame)):
+        payload = decode(payload)
+    return payload.size
+
+def _pool_shm(image):
+    shared = SharedValue(image)
+    return shared, shared
+
+# Возвращают (что отправить в воркер, блок для освобождения или None)
+POOL_METHODS = {
+    "pool": lambda image: (image, None),
+    "pool+frame": lambda image: (encode(image), None),
+    "pool+shm": _pool_shm,
+}
+
+def _make_image(size):
+    # Шум плюс градиент: данные, похожие на фотографию, а не на пустой кадр
+    width, height = size
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 8, (height, width, 3))
+    return Image.fromarray(np.clip(gradient + noise, 0, 255).astype(np.uint8), "RGB")
+
+def bench(repeat: int):
+    print(f"{'size':>11} {'method':>8} {'ms':>9} {'MB/s':>9} {'bytes':>12}")
+    for size in SIZES:
+        image = _make_image(size)
+        raw = len(image.tobytes())
+        for name, method in METHODS.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                restored, nbytes = method(image)
+                timings.append(time.perf_counter() - started)
+            assert restored.size == image.size
+            best = min(timings)
+            print(f"{size[0]:>5}x{size[1]:<5} {name:>8} {best * 1000:>9.2f} {raw / best / 1e6:>9.0f} {nbytes:>12}")
+
+    print()
+    print(f"{'size':>11} {'method':>10} {'ms':>9} {'MB/s':>9}")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(_receive_image, None).exception() # прогрев воркера
+        for size in SIZES:
+            image = _make_image(size)
+            raw = len(image.tobytes())
+            for name, method in POOL_METHODS.items():
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    payload, shared = method(image)
+                    assert pool.submit(_receive_image, payload).result() == image.size
+                    timings.append(time.perf_counter() - started)
+                    if shared is not None:
+                        shared.release()
+                best = min(timings)
+                print(f"{size[0]:>5}x{size[1]:<5} {name:>10} {best * 1000:>9.2f} {raw / best / 1e6:>9.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialization micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    bench(parser.parse_args().repeat)
@@ -0,0 +1,247 @@
+"""
+Запуск графа без GUI.
+
+Example:
+    python src/cli.py pipeline.json --input-dir photos/ --set save.path_prefix=out/result
+    python src/cli.py pipeline.json --each load.path=a.jpg --each load.path=b.jpg
+    python src/cli.py pipeline.json --input decode.path=a.jpg --input decode.path=b.jpg --workers 8
+    python src/cli.py pipeline.json --plugin my_nodes   # узлы внешнего пакета (см. NodeRegistry.load_plugin)
+
+Коды завершения: 0 - успешно, 1 - ошибки в узлах, 2 - неверные аргументы, граф или контрольная точка,
+3 - deadlock, 130 - прервано (Ctrl+C).
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+# Добавляем корень проекта в sys.path (как в main.py)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.node import Items
+from core.graph import Graph
+from core.executor import Executor
+from core.backends import LocalProcessBackend
+from core.artifact_cache import ArtifactCache
+from core.checkpoint import Checkpoint
+from core.metrics import MetricsRegistry
+from core.registry import NodeRegistry
+from nodes.registry import NODE_REGISTRY, load_plugins
+
+EXIT_OK = 0
+EXIT_NODE_ERRORS = 1
+EXIT_USAGE = 2
+EXIT_DEADLOCK = 3
+EXIT_CANCELLED = 130
+
+class CliError(Exception):
+    """Неверные аргументы командной строки или граф (код завершения 2)."""
+
+def parse_value(text: str) -> Any:
+    """Значение переопределения: JSON (числа, true/false, списки), иначе строка как есть."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_assignment(text: str):
+    """'node.name=value' -> (node, name, value)."""
+    target, sep, value = text.partition("=")
+    node_id, dot, name = target.partition(".")
+    if not sep or not dot or not node_id or not name:
+        raise CliError(f"Expected NODE.NAME=VALUE, got '{text}'")
+    return node_id, name, parse_value(value)
+
+def _nodes_by_id(graph_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {node["id"]: node for node in graph_data.get("nodes", [])}
+
+def apply_overrides(graph_data: Dict[str, Any], node_registry: NodeRegistry, assignments: List[str],
+                    input_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Возвращает копию графа с переопределенными параметрами узлов.
+    input_dir: каталог для всех узлов с параметром "directory" (ListImages).
+    """
+    graph_data = json.loads(json.dumps(graph_data))
+    nodes = _nodes_by_id(graph_data)
+    if input_dir is not None:
+        targets = [node for node in nodes.values()
+                   if node["type"] in node_registry and "directory" in node_registry.spec(node["type"]).PARAMETERS]
+        if not targets:
+            raise CliError("--input-dir: the graph has no nodes with a 'directory' parameter")
+        for node in targets:
+            node.setdefault("params", {})["directory"] = input_dir
+    for text in assignments:
+        node_id, name, value = parse_assignment(text)
+        if node_id not in nodes:
+            raise CliError(f"--set: unknown node '{node_id}'")
+        nodes[node_id].setdefault("params", {})[name] = value
+    return graph_data
+
+def parse_inputs(assignments: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Начальные данные {node: {port: value}}; несколько значений одного порта подаются по очереди (Items)."""
+    values: Dict[tuple, list] = defaultdict(list)
+    for text in assignments:
+        node_id, port, value = parse_assignment(text)
+        values[(node_id, port)].append(value)
+    inputs: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    for (node_id, port), items in values.items():
+        inputs[node_id][port] = items[0] if len(items) == 1 else Items(items)
+    return dict(inputs)
+
+class ProgressReporter:
+    """
+    Печатает прогресс запуска в stderr по пачкам статусов исполнителя (Executor(status_handler=...)):
+    число завершенных узлов и задач, выполняющиеся задачи и ошибки.
+    """
+    def __init__(self, total_nodes: int, label: str = "", stream=None):
+        self.total_nodes = total_nodes
+        self.label = label
+        self.stream = stream or sys.stderr
+        self.started_at = time.time()
+        self.nodes: Dict[str, Any] = {} # node_id -> последний StatusUpdate
+
+    def __call__(self, updates):
+        for update in updates:
+            self.nodes[update.node_id] = update
+        done = sum(1 for update in self.nodes.values() if update.active == 0)
+        completed = sum(update.completed for update in self.nodes.values())
+        running = sum(update.active for update in self.nodes.values())
+        failed = sum(update.failed for update in self.nodes.values())
+        self.stream.write(f"[{time.time() - self.started_at:7.1f}s] {self.label}nodes {done}/{self.total_nodes}, "
+                          f"tasks completed {completed}, running {running}, failed {failed}\n")
+        self.stream.flush()
+
+def count_errors(metrics: MetricsRegistry, node_types) -> int:
+    tasks = metrics.get("executor_tasks_total")
+    return int(sum(tasks.value(node_type=node_type, status="error") for node_type in node_types))
+
+def print_summary(node_types, metrics: MetricsRegistry, elapsed: float, outcomes: List[str], stream=None):
+    """Итоги: время по типам узлов (из метрик исполнителя), число задач и ошибок."""
+    stream = stream or sys.stderr
+    durations = metrics.get("executor_node_duration_seconds")
+    tasks = metrics.get("executor_tasks_total")
+    stream.write(f"\n{'node type':<22}{'tasks':>8}{'errors':>8}{'total, s':>11}{'mean, s':>10}\n")
+    for node_type in sorted(node_types):
+        timing = durations.value(node_type=node_type)
+        errors = int(tasks.value(node_type=node_type, status="error"))
+        mean = timing["sum"] / timing["count"] if timing["count"] else 0.0
+        stream.write(f"{node_type:<22}{timing['count']:>8}{errors:>8}{timing['sum']:>11.3f}{mean:>10.3f}\n")
+    results = ", ".join(f"{outcome}: {outcomes.count(outcome)}" for outcome in sorted(set(outcomes)))
+    stream.write(f"\n{len(outcomes)} run(s) in {elapsed:.2f}s ({results})\n")
+    stream.flush()
+
+def exit_code(outcomes: List[str], errors: int) -> int:
+    if "cancelled" in outcomes:
+        return EXIT_CANCELLED
+    if "deadlock" in outcomes:
+        return EXIT_DEADLOCK
+    return EXIT_NODE_ERRORS if errors else EXIT_OK
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run a dataflow graph without the GUI.")
+    parser.add_argument("graph", help="graph JSON file (as saved by the editor)")
+    parser.add_argument("--set", action="append", default=[], metavar="NODE.PARAM=VALUE",
+                        help="override a node parameter (VALUE is parsed as JSON when possible)")
+    parser.add_argument("--input", action="append", default=[], metavar="NODE.PORT=VALUE",
+                        help="feed a value into an input port; repeat to feed several values in order")
+    parser.add_argument("--input-dir", metavar="DIR", help="set the 'directory' parameter of ListImages nodes")
+    parser.add_argument("--each", action="append", default=[], metavar="NODE.PARAM=VALUE",
+                        help="run the graph once per value (e.g. one LoadImage path per run)")
+    parser.add_argument("--plugin", action="append", default=[], metavar="MODULE",
+                        help="load a node plugin module (in addition to entry points and DATAFLOW_PLUGINS)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=20.0, help="deadlock detection timeout, seconds")
+    parser.add_argument("--node-timeout", type=float, default=None, help="default per-task deadline, seconds")
+    parser.add_argument("--cache", metavar="DIR", help="persistent artifact cache directory")
+    parser.add_argument("--checkpoint", metavar="DIR", help="checkpoint directory (see --resume)")
+    parser.add_argument("--resume", action="store_true", help="resume an interrupted run from --checkpoint")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="minimum level of node log records")
+    parser.add_argument("--progress-interval", type=float, default=1.0, help="seconds between progress lines")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines and summary")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    node_registry = NODE_REGISTRY
+
+    try:
+        load_plugins(args.plugin)
+        with open(args.graph, "r") as f:
+            graph_data = json.load(f)
+        graph_data = apply_overrides(graph_data, node_registry, args.set, args.input_dir)
+        initial_inputs = parse_inputs(args.input)
+        batch = [parse_assignment(text) for text in args.each]
+        if args.resume and (batch or initial_inputs or not args.checkpoint):
+            raise CliError("--resume requires --checkpoint and cannot be combined with --each or --input")
+        if args.resume and not Checkpoint(args.checkpoint).exists():
+            raise CliError(f"--resume: no checkpoint in {args.checkpoint}")
+        runs = []
+        for assignment in batch or [None]:
+            run_data, value = graph_data, None
+            if assignment is not None:
+                node_id, name, value = assignment
+                run_data = apply_overrides(graph_data, node_registry, [f"{node_id}.{name}={json.dumps(value)}"])
+            graph = Graph(node_registry)
+            graph.load_from_json(run_data)
+            for target in initial_inputs:
+                if target not in graph.nodes:
+                    raise CliError(f"--input: unknown node '{target}'")
+            runs.append((graph, value))
+    except (ImportError, OSError, ValueError, TypeError, KeyError, CliError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    metrics = MetricsRegistry()
+    cache = ArtifactCache(args.cache) if args.cache else None
+    backend = LocalProcessBackend(max_workers=args.workers)
+    current: Dict[str, Executor] = {}
+
+    def on_interrupt(signum, frame):
+        # Первый Ctrl+C отменяет запуск (с сохранением контрольной точки), второй прерывает сразу
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("\nCancelling...", file=sys.stderr)
+        if "executor" in current:
+            current["executor"].cancel()
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+
+    outcomes = []
+    started_at = time.time()
+    try:
+        for index, (graph, value) in enumerate(runs):
+            label = f"run {index + 1}/{len(runs)} " if len(runs) > 1 else ""
+            if label and not args.quiet:
+                print(f"{label}({value})", file=sys.stderr)
+            progress = ProgressReporter(len(graph.nodes), label) if not args.quiet else None
+            executor = Executor(graph, max_workers=args.workers, timeout=args.timeout, backend=backend,
+                                log_level=args.log_level, metrics=metrics, node_timeout=args.node_timeout,
+                                checkpoint_dir=args.checkpoint, cache=cache,
+                                status_handler=progress, status_interval=args.progress_interval)
+            current["executor"] = executor
+            try:
+                outcomes.append(executor.run(initial_inputs, resume=args.resume))
+            except (OSError, ValueError) as e:
+                # Контрольная точка от другого графа или другой версии, ошибка записи точки
+                print(f"error: {e}", file=sys.stderr)
+                return EXIT_USAGE
+            if outcomes[-1] == "cancelled":
+                break
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        backend.shutdown()
+
+    node_types = {type(node).__name__ for graph, _ in runs for node in graph.nodes.values()}
+    if not args.quiet:
+        print_summary(node_types, metrics, time.time() - started_at, outcomes)
+    return exit_code(outcomes, count_errors(metrics, node_types))
+
+if __name__ == "__main__":
+    # Необходимая инициализация для multiprocessing на Windows
+    multiprocessing.freeze_support()
+    sys.exit(main())
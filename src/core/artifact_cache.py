@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Dict, Optional
+from .serialization import encode, decode
+
+# Меняется при изменении формата ключей или записей: старые записи перестают совпадать
+CACHE_VERSION = 1
+
+def _file_stamp(path: str) -> Optional[bytes]:
+    """Размер и время изменения файла, если строка - путь к существующему файлу."""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(path):
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+def fingerprint(value: Any) -> str:
+    """
+    Хэш содержимого значения. Для строки-пути к файлу учитываются размер и время изменения файла,
+    иначе значение сериализуется (core.serialization) и хэшируются части кадра без склейки.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(value, str):
+        digest.update(b"str:" + str(value).encode())
+        digest.update(_file_stamp(value) or b"")
+    else:
+        for part in encode(value).parts:
+            digest.update(part)
+    return digest.hexdigest()
+
+class ArtifactCache:
+    """
+    Постоянный кэш результатов детерминированных узлов (Node.DETERMINISTIC) в локальном каталоге.
+    Ключ - хэш типа узла, параметров и ключей входов: для выхода закэшированного узла это ключ его задачи,
+    для остальных значений - хэш содержимого (fingerprint). Результат хранится в формате core.serialization
+    (pickle 5, пиксели изображений и данные массивов - отдельными буферами), по файлу на задачу.
+
+    Каталог можно использовать из нескольких процессов и запусков одновременно: запись идет во временный
+    файл, который атомарно переименовывается, а файл, удаленный другим процессом, считается промахом.
+    Когда записи занимают больше max_bytes, удаляются давно не использованные (время использования - mtime).
+    """
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024**3, compression: Optional[str] = None):
+        """
+        compression: сжатие записей (None | "zlib" | "lz4").
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = self._scan()[1]
+
+    def key(self, node, input_keys: Dict[str, str]) -> str:
+        """Ключ задачи узла с входами, заданными их ключами {порт: ключ}."""
+        node_type = type(node)
+        params = json.dumps(node.params, sort_keys=True, default=repr)
+        digest = hashlib.blake2b(digest_size=20)
+        preview = getattr(node, "preview_size", None)
+        digest.update(f"{CACHE_VERSION}|{node_type.__module__}.{node_type.__qualname__}|{params}|{preview}".encode())
+        for name, value in sorted(node.params.items()):
+            if isinstance(value, str):
+                digest.update(_file_stamp(value) or b"") # параметр-путь (LoadImage): файл мог измениться
+        for port, input_key in sorted(input_keys.items()):
+            digest.update(f"|{port}={input_key}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns: выходы задачи или None при промахе."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path) # отметка использования для вытеснения
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode(data)
+
+    def put(self, key: str, outputs: Dict[str, Any]):
+        frame = encode(outputs, self.compression)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for part in frame.parts:
+                    f.write(part)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.stores += 1
+        self._bytes += frame.nbytes
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _scan(self):
+        """Returns: ([(время использования, размер, путь)], общий размер)."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue # удален другим процессом
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока кэш не станет меньше 90% max_bytes."""
+        entries, total = self._scan()
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика этого процесса (hits, misses, stores, evictions) и текущий объем каталога."""
+        entries, total = self._scan()
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": total,
+        }
+
+    def clear(self):
+        for _, _, path in self._scan()[0]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._bytes = 0
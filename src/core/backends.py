@@ -0,0 +1,176 @@
+import os
+import signal
+import threading
+import multiprocessing
+import concurrent.futures
+from typing import Any, Dict, List, Optional
+
+class ExecutionBackend(concurrent.futures.Executor):
+    """
+    Интерфейс бэкенда выполнения задач узлов.
+
+    Бэкенд - это concurrent.futures.Executor: Executor отправляет в него задачи через
+    submit(fn, *args) и получает Future. Поэтому любой стандартный пул тоже подходит
+    в качестве бэкенда. Бэкенды, которые оставляют данные у себя (например, на удаленных
+    воркерах), возвращают вместо значений ссылки и материализуют их через resolve().
+    """
+
+    # Поддерживает ли бэкенд передачу значений через разделяемую память (SharedValue)
+    SHARED_MEMORY = False
+    # Получает ли задача собственную копию аргументов (сериализация в другой процесс)
+    COPIES_INPUTS = False
+    # Передавать ли аргументы и результаты задач сериализацией исполнителя (core.serialization)
+    PACKED_PAYLOADS = False
+    # Выполняются ли задачи в потоках главного процесса на тех же экземплярах узлов (см. Node.THREAD_SAFE).
+    # Для стандартных пулов определяется по типу: ThreadPoolExecutor - да.
+    IN_PROCESS = False
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Возвращает значение в главный процесс (для ссылок на данные, оставленные в воркерах).
+        """
+        return value
+
+    def references(self, value: Any) -> List[Any]:
+        """
+        Ссылки на данные бэкенда внутри значения (например, RemoteRef). Исполнитель считает их потребителей
+        и освобождает через release(), когда значение больше никому не нужно.
+        """
+        return []
+
+    def release(self, refs: List[Any]):
+        """Освобождает данные бэкенда по ссылкам, которые исполнителю больше не нужны."""
+
+    def terminate(self, futures: List[concurrent.futures.Future]) -> bool:
+        """
+        Принудительно останавливает выполняющиеся задачи; их Future отменяются.
+        Returns: False, если бэкенд не умеет останавливать задачи (по умолчанию).
+        """
+        return False
+
+class _TaskFuture(concurrent.futures.Future):
+    """
+    Future задачи LocalProcessBackend. Задача может быть перезапущена в новом пуле,
+    поэтому состояние выполнения берется у текущего Future пула (inner).
+    """
+    inner: Optional[concurrent.futures.Future] = None
+
+    def __init__(self):
+        super().__init__()
+        self._cancel_lock = threading.Lock()
+        self._notified = False
+
+    def running(self) -> bool:
+        inner = self.inner
+        return not self.done() and inner is not None and inner.running()
+
+    def cancel(self) -> bool:
+        inner = self.inner
+        if inner is not None and not inner.cancel():
+            return False
+        return self._cancel()
+
+    def _cancel(self) -> bool:
+        """
+        Отменяет Future и будит concurrent.futures.wait: для Future пула это делает сам пул
+        (set_running_or_notify_cancel), а этот Future пул не видит.
+        """
+        with self._cancel_lock:
+            if not super().cancel():
+                return False
+            if not self._notified:
+                self._notified = True
+                self.set_running_or_notify_cancel()
+        return True
+
+def _register_worker(pids):
+    """Инициализатор воркера пула: сообщает свой pid, чтобы пул можно было остановить принудительно."""
+    pids.put(os.getpid())
+
+class LocalProcessBackend(ExecutionBackend):
+    """
+    Бэкенд по умолчанию: локальный пул процессов.
+    Зависшие задачи останавливаются terminate(): процессы пула завершаются и заменяются новым пулом,
+    остальные незавершенные задачи отправляются в него заново (их результаты не теряются).
+    """
+    # Воркеры на той же машине: значения для нескольких потребителей можно передавать через разделяемую память
+    SHARED_MEMORY = True
+    COPIES_INPUTS = True
+    PACKED_PAYLOADS = True
+
+    def __init__(self, max_workers: int = None, mp_context=None):
+        self.max_workers = max_workers
+        self._mp_context = mp_context or multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._tasks: Dict[_TaskFuture, tuple] = {} # Future задачи -> (fn, args, kwargs)
+        self.recycles = 0 # сколько раз пул был заменен
+        self._pool, self._pids = self._new_pool()
+
+    def _new_pool(self):
+        pids = self._mp_context.SimpleQueue()
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._mp_context,
+                                                      initializer=_register_worker, initargs=(pids,))
+        return pool, pids
+
+    def submit(self, fn, /, *args, **kwargs) -> concurrent.futures.Future:
+        future = _TaskFuture()
+        with self._lock:
+            self._tasks[future] = (fn, args, kwargs)
+            inner = self._start(future)
+        # Обратный вызов регистрируется без блокировки: для уже завершенного inner он вызывается сразу
+        self._watch(future, inner)
+        return future
+
+    def _start(self, future: _TaskFuture) -> concurrent.futures.Future:
+        fn, args, kwargs = self._tasks[future]
+        future.inner = self._pool.submit(fn, *args, **kwargs)
+        return future.inner
+
+    def _watch(self, future: _TaskFuture, inner: concurrent.futures.Future):
+        inner.add_done_callback(lambda done: self._on_done(future, done))
+
+    def _on_done(self, future: _TaskFuture, inner: concurrent.futures.Future):
+        with self._lock:
+            if future.inner is not inner or self._tasks.pop(future, None) is None:
+                return # задача перезапущена в новом пуле или остановлена
+        try:
+            if inner.cancelled():
+                future._cancel()
+            elif inner.exception() is not None:
+                future.set_exception(inner.exception())
+            else:
+                future.set_result(inner.result())
+        except concurrent.futures.InvalidStateError:
+            pass # Future уже отменен
+
+    def terminate(self, futures: List[concurrent.futures.Future]) -> bool:
+        """
+        Останавливает задачи futures: пул с их процессами заменяется новым, остальные
+        незавершенные задачи выполняются в нем заново. Задачи должны допускать повторный запуск.
+        """
+        with self._lock:
+            targets = [future for future in futures if self._tasks.pop(future, None) is not None]
+            if not targets:
+                return True
+            old_pool, old_pids = self._pool, self._pids
+            self._pool, self._pids = self._new_pool()
+            self.recycles += 1
+            restarted = [(future, self._start(future)) for future in self._tasks]
+        for future in targets:
+            future._cancel()
+        self._kill_workers(old_pids)
+        old_pool.shutdown(wait=False, cancel_futures=True)
+        for future, inner in restarted:
+            self._watch(future, inner)
+        return True
+
+    @staticmethod
+    def _kill_workers(pids):
+        while not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGTERM)
+            except ProcessLookupError:
+                pass # воркер уже завершился
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from typing import Any, Dict
+from .serialization import dumps, loads
+
+CHECKPOINT_FILE = "checkpoint.bin"
+CHECKPOINT_VERSION = 1
+
+class Checkpoint:
+    """
+    Контрольная точка запуска в локальном каталоге (см. Executor, параметр checkpoint_dir).
+    Состояние: значения в очередях портов, входы задач, которые выполнялись в момент записи,
+    состояния узлов (например, счетчик итераций LoopMerge) и уже выполненные источники.
+    Выходы завершенных узлов хранятся как значения в очередях их потребителей.
+    Файл заменяется атомарно, поэтому сбой во время записи оставляет предыдущую точку.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, CHECKPOINT_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def save(self, state: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        data = dumps(dict(state, version=CHECKPOINT_VERSION))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load(self) -> Dict[str, Any]:
+        """Raises: FileNotFoundError, если точки нет; ValueError, если она записана другой версией."""
+        if not self.exists():
+            raise FileNotFoundError(f"No checkpoint in {self.directory}")
+        with open(self.path, "rb") as f:
+            state = loads(f.read())
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {state.get('version')!r} in {self.path}")
+        return state
+
+    def clear(self):
+        """Удаляет точку (запуск завершен, продолжать нечего)."""
+        if self.exists():
+            os.unlink(self.path)
@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+def memory_info() -> Optional[Tuple[int, int]]:
+    """
+    Returns: (доступно байт, всего байт) или None, если узнать нельзя.
+    Без psutil используется /proc/meminfo.
+    """
+    if HAS_PSUTIL:
+        memory = psutil.virtual_memory()
+        return memory.available, memory.total
+    try:
+        with open("/proc/meminfo") as f:
+            values = {line.split(":")[0]: int(line.split()[1]) for line in f}
+        return values["MemAvailable"] * 1024, values["MemTotal"] * 1024
+    except (OSError, KeyError, ValueError, IndexError):
+        return None
+
+def system_load() -> Tuple[Optional[float], Optional[float]]:
+    """
+    Текущая загрузка машины.
+    Returns: (загрузка CPU 0..1, доля доступной памяти 0..1); None - если значение недоступно.
+    Без psutil используется os.getloadavg().
+    """
+    cpu = None
+    if HAS_PSUTIL:
+        cpu = psutil.cpu_percent(interval=None) / 100.0
+    elif hasattr(os, "getloadavg"):
+        cpu = min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+
+    info = memory_info()
+    return cpu, (info[0] / info[1] if info else None)
+
+class ConcurrencyController:
+    """
+    Адаптивный лимит задач в полете.
+    Раз в interval секунд сравнивает пропускную способность (завершенных задач в секунду)
+    с предыдущим окном и двигает лимит на 1 в сторону роста пропускной способности.
+    Лимит растет, только если он действительно сдерживал отправку и CPU не загружен полностью;
+    при нехватке памяти лимит уменьшается вдвое.
+    """
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: Optional[int] = None, interval: float = 1.0,
+                 cpu_high: float = 0.95, memory_low: float = 0.1,
+                 load_fn: Callable[[], Tuple[Optional[float], Optional[float]]] = system_load,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max_limit or initial * 4
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.interval = interval
+        self.cpu_high = cpu_high
+        self.memory_low = memory_low
+        self._load_fn = load_fn
+        self._clock = clock
+        self._window_start = clock()
+        self._completed = 0
+        self._saturated = False
+        self._last_throughput: Optional[float] = None
+        self._direction = 1
+
+    def record_completion(self):
+        self._completed += 1
+
+    def note_saturated(self):
+        """Отправка задач была остановлена лимитом."""
+        self._saturated = True
+
+    def update(self) -> int:
+        """Пересчитывает лимит, если окно измерения закончилось. Returns: текущий лимит."""
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return self.limit
+
+        throughput = self._completed / elapsed
+        saturated = self._saturated
+        self._window_start, self._completed, self._saturated = now, 0, False
+        cpu, memory = self._load_fn()
+
+        if memory is not None and memory < self.memory_low:
+            # Мультипликативное уменьшение, после него лимит снова растет по одному
+            self.limit = max(self.min_limit, self.limit // 2)
+            self._direction = 1
+        elif saturated:
+            if self._last_throughput is not None and throughput < self._last_throughput * 0.95:
+                # Прошлый шаг ухудшил пропускную способность: идем в обратную сторону
+                self._direction = -self._direction
+            if self._direction > 0 and cpu is not None and cpu >= self.cpu_high:
+                self._direction = 0
+            self.limit = min(self.max_limit, max(self.min_limit, self.limit + self._direction))
+            self._direction = self._direction or 1
+        self._last_throughput = throughput
+        return self.limit
@@ -1,61 +1,272 @@
 from concurrent.futures._base import Future
 
 
+import copy
 import time
-import io
+import itertools
+import asyncio
+import threading
 import contextlib
 import concurrent.futures
 import multiprocessing
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, AsyncIterator, Union
 from collections import defaultdict, deque
 from .graph import Graph
+from .node import Items, Batch
+from .backends import LocalProcessBackend
+from .logs import LogChannel, WorkerLog, capture_stdout, level_value, format_record
+from .status import StatusChannel
+from .metrics import MetricsRegistry
+from .payloads import payload_nbytes, SharedValue, SharedBlock, SharedImageView, shared_handles, materialize
+from .types import convert
+from .serialization import encode, decode
+from .prefetch import PrefetchReader, PrefetchedPath
+from .concurrency import ConcurrencyController
+from .resources import DEFAULT_RESOURCES, ResourceBudget, task_demand
+from .checkpoint import Checkpoint
+from .artifact_cache import ArtifactCache, fingerprint
+
+class NodeEvent:
+    """
+    Событие выполнения узла.
+    status: "running" | "completed" | "error" | "cancelled"
+    outputs: выходные данные узла (заполняется для "completed").
+    error: исключение узла (заполняется для "error"; для задачи, остановленной по сроку, - TimeoutError).
+    """
+    def __init__(self, node_id: str, status: str, outputs: Dict[str, Any] = None, error: Exception = None):
+        self.node_id = node_id
+        self.status = status
+        self.outputs = outputs or {}
+        self.error = error
+
+    def __repr__(self):
+        return f"<NodeEvent {self.node_id} {self.status}>"
 
 class Executor:
     """
     Исполнитель графа. Управляет запуском узлов и передачей данных.
     """
-    def __init__(self, graph: Graph, max_workers: int = None, timeout: float = 20.0):
+    def __init__(self, graph: Graph, max_workers: int = None, timeout: float = 20.0,
+                 backend: Optional[concurrent.futures.Executor] = None,
+                 log_level: str = "INFO", log_handler=None, status_handler=None, status_interval: float = 1 / 30,
+                 metrics: Optional[MetricsRegistry] = None,
+                 share_threshold: int = 64 * 1024, compression: Optional[str] = None,
+                 transfer_threshold: int = 8 * 1024 * 1024, prefetch_depth: int = 8, io_threads: int = 4,
+                 adaptive: bool = False, resources: Union[Dict[str, Optional[float]], ResourceBudget, None] = None,
+                 node_timeout: Optional[float] = None, kill_grace: float = 1.0,
+                 checkpoint_dir: Optional[str] = None, checkpoint_interval: float = 30.0,
+                 cache: Optional[ArtifactCache] = None, retain_outputs: bool = False, preview: Optional[int] = None,
+                 fusion: bool = True):
+        """
+        backend: бэкенд выполнения (ExecutionBackend или любой concurrent.futures.Executor).
+                 Если не задан, на каждый запуск создается свой LocalProcessBackend.
+                 Переданный бэкенд не закрывается исполнителем и может обслуживать несколько запусков одновременно.
+        log_level: минимальный уровень записей лога узлов; фильтрация выполняется в воркере.
+        log_handler: функция(records: List[LogRecord]), получающая записи пачками. По умолчанию печать в stdout.
+        status_handler: функция(updates: List[StatusUpdate]), получающая статусы узлов пачками не чаще раза
+                        в status_interval секунд: по записи на изменившийся узел со счетчиками задач (см. StatusChannel).
+                        Дополняет status_callback из run(), который вызывается на каждый переход.
+        metrics: реестр метрик (можно общий для нескольких исполнителей). По умолчанию создается свой.
+        share_threshold: минимальный размер (в байтах) выхода с несколькими потребителями, который
+                         сериализуется один раз и передается через разделяемую память (если бэкенд это поддерживает).
+        compression: сжатие аргументов и результатов задач (None | "zlib" | "lz4"), если бэкенд
+                     использует сериализацию исполнителя (PACKED_PAYLOADS).
+        transfer_threshold: размер сериализованных аргументов или результата задачи, начиная с которого они
+                            передаются через разделяемую память, а не через канал пула
+                            (см. benchmarks/bench_serialization.py).
+        prefetch_depth: сколько файлов заранее читать для входов PREFETCH_INPUT (например, DecodeImage).
+        io_threads: число потоков ввода-вывода для опережающего чтения.
+        adaptive: подстраивать лимит задач в полете под измеренную пропускную способность, загрузку CPU
+                  и свободную память (ConcurrencyController). Иначе лимит равен max_workers * 2.
+        resources: бюджет ресурсов для упаковки задач по Node.RESOURCES: {"cpu": слоты, "memory": МБ, "io": задач}
+                   или готовый ResourceBudget (например, общий для нескольких исполнителей).
+                   По умолчанию cpu равен наибольшему лимиту задач в полете, memory - 75% доступной памяти, io - без ограничения
+                   ({"io": 1} - задачи с монопольным I/O выполняются по одной).
+        node_timeout: срок одной задачи в секундах для узлов без своего (Node.TIMEOUT, "timeout" в JSON графа).
+                      None - без срока. Узел видит срок через Node.check_deadline().
+        kill_grace: сколько секунд после срока задача может завершиться сама; затем бэкенд останавливает ее
+                    принудительно (ExecutionBackend.terminate), а узел получает ошибку TimeoutError.
+        checkpoint_dir: каталог контрольной точки запуска (Checkpoint). Точка записывается не чаще раза
+                        в checkpoint_interval секунд, при отмене и deadlock, и удаляется после успешного завершения.
+                        run(resume=True) продолжает запуск с нее.
+        cache: постоянный кэш результатов (ArtifactCache). Перед отправкой задачи узла с DETERMINISTIC = True
+               исполнитель ищет ее результат в кэше и при попадании не запускает задачу.
+        retain_outputs: сохранять выходы узлов в retained {node_id: [выходы задачи, ...]}
+                        (для инкрементальных запусков, см. IncrementalSession).
+        preview: режим предпросмотра - наибольшая сторона уменьшенных копий, которые выдают узлы-источники
+                 (Node.preview_size). Узлы с PREVIEW_SKIP = True (SaveImage) не выполняются.
+        fusion: выполнять узлы с FUSABLE = True в задаче узла-источника их единственного входа, без отдельной
+                задачи и пересылки промежуточного значения (только в run(), без retain_outputs).
+        """
         self.graph = graph
         self.max_workers = max_workers or multiprocessing.cpu_count()
         self.timeout = timeout
-        self.input_queues: Dict[str, Dict[str, deque]] = defaultdict[str, Dict[str, deque]](lambda: defaultdict(deque))   
+        self.backend = backend
+        self.log_level = level_value(log_level)
+        self.logs = LogChannel(log_handler)
+        self.status: Optional[StatusChannel] = StatusChannel(status_handler, status_interval) if status_handler else None
+        self.input_queues: Dict[str, Dict[str, deque]] = defaultdict[str, Dict[str, deque]](lambda: defaultdict(deque))
+        self._enqueue_times: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(deque)) # параллельно input_queues
+        self._submit_times: Dict[concurrent.futures.Future, float] = {}
         self.active_tasks: Set[concurrent.futures.Future] = set()
         self.future_to_node: Dict[concurrent.futures.Future, str] = {}
         self._executed_sources: Set[str] = set()
+        self._last_event_time = 0.0
+        self.outcome: Optional[str] = None # "finished" | "deadlock" после завершения запуска
+        self.share_threshold = share_threshold
+        self.compression = compression
+        self.transfer_threshold = transfer_threshold
+        self.prefetch_depth = prefetch_depth
+        self.io_threads = io_threads
+        self._reader: Optional[PrefetchReader] = None
+        self.concurrency: Optional[ConcurrencyController] = ConcurrencyController(self.max_workers * 2) if adaptive else None
+        self._claimed: Dict[str, int] = defaultdict(int) # node_id -> задач, взятых из очередей и еще не завершенных
+        if isinstance(resources, ResourceBudget):
+            self.budget = resources
+        else:
+            cpu = self.concurrency.max_limit if self.concurrency else self.max_workers * 2
+            self.budget = ResourceBudget.default(cpu, resources)
+        self._claim_demands: Dict[int, Dict[str, float]] = {} # id(входы) -> потребность взятой, но еще не отправленной задачи
+        self._task_demands: Dict[concurrent.futures.Future, Dict[str, float]] = {}
+        self._packed = False
+        self._resolver = None # ExecutionBackend.resolve текущего бэкенда
+        self._references = None # ExecutionBackend.references текущего бэкенда (None - бэкенд не хранит данные)
+        self._releaser = None # ExecutionBackend.release
+        self._refs: Dict[int, list] = {} # id ссылки на данные бэкенда -> [ссылка, число еще не обработанных потребителей]
+        self._task_refs: Dict[concurrent.futures.Future, List[Any]] = {}
+        self._inline: Set[concurrent.futures.Future] = set() # задачи INLINE-узлов (результат не сериализован)
+        self._share_fanout = False
+        self._shared: Dict[str, list] = {} # имя блока -> [SharedValue | SharedBlock, число еще не обработанных потребителей]
+        self._task_shared: Dict[concurrent.futures.Future, List[Any]] = {}
+        self._copies_inputs = False
+        self._outputs_escape = False
+        self._exclusive: Set[int] = set() # id значений в очередях, у которых ровно один потребитель
+        self.node_timeout = node_timeout
+        self.kill_grace = kill_grace
+        self._timeouts: Dict[concurrent.futures.Future, float] = {} # задачи со сроком -> срок, с
+        self._started: Dict[concurrent.futures.Future, float] = {} # когда бэкенд отметил задачу выполняющейся
+        self._terminated: Dict[concurrent.futures.Future, str] = {} # остановленные задачи -> "timeout" | "cancelled"
+        self._cancel = threading.Event()
+        self._cancel_handled = False # отмена обработана: очереди очищены, задачи остановлены
+        self._warned_terminate = False
+        self.checkpoint = Checkpoint(checkpoint_dir) if checkpoint_dir else None
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = 0.0
+        self._task_inputs: Dict[concurrent.futures.Future, tuple] = {} # задача -> (node_id, входы) для контрольной точки
+        self.cache = cache
+        self._value_keys: Dict[int, list] = {} # id значения в очередях -> [ключ кэша, число еще не взявших его потребителей]
+        self._task_keys: Dict[concurrent.futures.Future, tuple] = {} # задача -> (ключ кэша, нужно ли сохранить результат)
+        self.retain_outputs = retain_outputs
+        self.retained: Dict[str, List[Dict[str, Any]]] = {}
+        self._restriction: Optional[tuple] = None # (узлы, выходы прошлого запуска) для следующего запуска
+        self._only: Optional[Set[str]] = None # узлы, которые выполняются в текущем запуске (None - все)
+        self.preview = preview
+        self._skipped: Set[str] = set() # узлы, которые не выполняются в режиме предпросмотра
+        self.fusion = fusion
+        self._chains: Dict[str, List[tuple]] = {} # узел -> [(слитый узел, выход, вход), ...] по порядку выполнения
+        self._task_chains: Dict[concurrent.futures.Future, List[tuple]] = {}
+        self._task_batches: Dict[concurrent.futures.Future, int] = {} # задачи-пакеты (Node.MAX_BATCH) -> число вызовов
+        self._order: List[str] = list(graph.nodes) # порядок просмотра узлов планировщиком (по убыванию Node.COST)
+        self._in_process = False # задачи выполняются в потоках главного процесса (см. Node.THREAD_SAFE)
+        self.metrics = metrics or MetricsRegistry()
+        self._init_metrics()
+
+    def _init_metrics(self):
+        m = self.metrics
+        self._m_queue_depth = m.gauge("executor_queue_depth", "Items waiting in node input queues", ("node", "port"))
+        self._m_queue_wait = m.histogram("executor_queue_wait_seconds", "Time items wait in input queues", ("node_type",))
+        self._m_active = m.gauge("executor_active_tasks", "Tasks submitted and not yet completed")
+        self._m_inflight_limit = m.gauge("executor_inflight_limit", "Maximum number of tasks in flight")
+        self._m_saturated = m.counter("executor_inflight_saturated_total", "Scheduler passes blocked by the in-flight limit")
+        self._m_start_latency = m.histogram("executor_submit_to_start_seconds", "Delay between submit and start of a task", ("node_type",))
+        self._m_duration = m.histogram("executor_node_duration_seconds", "Node execution time in the worker", ("node_type",))
+        self._m_tasks = m.counter("executor_tasks_total", "Completed tasks", ("node_type", "status"))
+        self._m_bytes = m.counter("executor_payload_bytes_total", "Estimated payload size of task inputs and outputs", ("node_type", "direction"))
+        self._m_prefetch = m.counter("executor_prefetch_total", "Prefetched file reads taken by tasks", ("result",))
+        self._m_fanout_saved = m.counter("executor_fanout_bytes_saved_total", "Serialized bytes not copied thanks to shared fan-out values")
+        self._m_resources = m.gauge("executor_resource_usage", "Resources reserved by claimed tasks", ("resource",))
+        self._m_cache = m.counter("executor_cache_total", "Artifact cache lookups for deterministic nodes", ("result",))
+        self._m_terminated = m.counter("executor_tasks_terminated_total", "Tasks stopped by the executor", ("reason",))
+        self._m_batch = m.histogram("executor_batch_size", "Input sets per task of nodes with MAX_BATCH > 1", ("node_type",))
+        self._m_fused = m.counter("executor_fused_total", "Node executions fused into the task of their source node", ("node_type",))
 
     def _feed_inputs(self, initial_inputs: Dict[str, Dict[str, Any]]):
         """
         Загружает начальные данные в граф.
-        initial_inputs: {node_id: {input_name: value}}
+        initial_inputs: {node_id: {input_name: value}}. Значение Items подается поэлементно, как выход узла.
         """
         for node_id, inputs in initial_inputs.items():
             for port, value in inputs.items():
-                self.input_queues[node_id][port].append(value)
+                for item in value if isinstance(value, Items) else (value,):
+                    self._enqueue(node_id, port, item)
+
+    def _enqueue(self, node_id: str, port: str, value: Any):
+        if node_id in self._skipped:
+            return
+        if self._reader is not None and isinstance(value, str) and port == getattr(self.graph.nodes[node_id], "PREFETCH_INPUT", None):
+            # Путь к файлу: чтение начинается сразу, пока значение ждет в очереди
+            value = self._reader.request(value)
+        queue = self.input_queues[node_id][port]
+        queue.append(value)
+        self._enqueue_times[node_id][port].append(time.time())
+        self._m_queue_depth.set(len(queue), node=node_id, port=port)
 
-    def _check_ready_nodes(self) -> List[tuple]:
+    def _dequeue(self, node_id: str, port: str) -> Any:
+        queue = self.input_queues[node_id][port]
+        value = queue.popleft()
+        waited = time.time() - self._enqueue_times[node_id][port].popleft()
+        self._m_queue_depth.set(len(queue), node=node_id, port=port)
+        self._m_queue_wait.observe(waited, node_type=type(self.graph.nodes[node_id]).__name__)
+        return value
+
+    def _check_ready_nodes(self, max_tasks: Optional[int] = None) -> List[tuple]:
         """
         Находит узлы, готовые к выполнению (есть данные на всех обязательных входах).
+        Узлы, у которых уже выполняется concurrency_level задач, пропускаются (узлы с THREAD_SAFE = False
+        на бэкенде с потоками главного процесса - как с concurrency_level = 1).
+        Узлы просматриваются по убыванию Node.COST: долгие задачи получают слоты раньше коротких.
+        Узел с MAX_BATCH > 1 получает за проход до MAX_BATCH наборов входов подряд: _submit_ready (и JobServer) отправляет
+        их одной задачей (execute_batch).
+        Задача берется, только если ее потребность (по первым значениям в очередях) помещается в бюджет;
+        после задачи, которая не поместилась, задачи с потребностью в тех же ресурсах в этом проходе не берутся,
+        чтобы мелкие задачи не вытесняли крупную бесконечно. Задачи без таких потребностей продолжают запускаться.
+        max_tasks: не больше стольких задач за вызов (наборы входов одного пакета - одна задача).
         Returns: List[(node_id, inputs_dict)]
         """
         ready_nodes = []
-        
-        for node_id, node in self.graph.nodes.items():
+        blocked: Set[str] = set() # ресурсы, которых не хватило задаче в этом проходе
+        tasks = 0
+
+        for node_id in self._order:
+            if max_tasks is not None and tasks >= max_tasks:
+                break
+            if (self._only is not None and node_id not in self._only) or node_id in self._skipped:
+                continue
+            node = self.graph.nodes[node_id]
+            level = getattr(node, "concurrency_level", None)
+            if level is None and self._in_process and not getattr(node, "THREAD_SAFE", True):
+                level = 1
+            if level is not None and self._claimed[node_id] >= level:
+                continue
             inputs = {}
             is_ready = True
-            
+
             required_inputs = set(node.INPUT_TYPES.keys())
             connected_inputs = set()
-            
+
             incoming_links = self.graph.get_incoming_links(node_id)
             for link in incoming_links:
                 connected_inputs.add(link['to_input'])
 
             if not required_inputs:
                 if node_id not in self._executed_sources:
-                    self._executed_sources.add(node_id)
-                    ready_nodes.append((node_id, {}))
+                    demand = self._reserve(node, {}, blocked)
+                    if demand is not None:
+                        self._executed_sources.add(node_id)
+                        ready_nodes.append((node_id, self._claim(node_id, {}, demand)))
+                        tasks += 1
                 continue
-            
+
             if getattr(node, 'INPUT_STRATEGY', 'ALL') == "ANY":
                 # Для стратегии ANY используем подключенные входы, а если их нет (например, данные поданы initial_inputs),
                 # то рассматриваем все объявленные входы.
@@ -71,111 +282,1056 @@ class Executor:
                     if not self.input_queues[node_id][port]:
                         is_ready = False
                         break
-            
+
             if is_ready:
                 node_inputs = {}
-                
+
                 ports_to_check = connected_inputs if getattr(node, 'INPUT_STRATEGY', 'ALL') == "ANY" else required_inputs
                 if getattr(node, 'INPUT_STRATEGY', 'ALL') == "ANY" and not ports_to_check:
                     ports_to_check = required_inputs
-                
-                for port in ports_to_check:
-                    if port in self.input_queues[node_id] and self.input_queues[node_id][port]:
-                         node_inputs[port] = self.input_queues[node_id][port].popleft()
-                
-                ready_nodes.append((node_id, node_inputs))
-                
+
+                ports = [port for port in ports_to_check if port in self.input_queues[node_id] and self.input_queues[node_id][port]]
+                prefetch_port = getattr(node, "PREFETCH_INPUT", None)
+                batch_size = self._batch_size(node_id, node)
+                if batch_size > 1:
+                    # Пакеты не крупнее доли воркера в накопленных значениях: пакетирование не отнимает параллелизм
+                    queued = min((len(self.input_queues[node_id][port]) for port in ports), default=1)
+                    batch_size = min(batch_size, -(-queued // self.max_workers))
+                taken = 0
+                while taken < batch_size:
+                    if taken and (any(not self.input_queues[node_id][port] for port in ports)
+                                  or (level is not None and self._claimed[node_id] >= level)):
+                        break
+                    if self._reader is not None and prefetch_port in ports and not self._reader.ready(self.input_queues[node_id][prefetch_port][0]):
+                        # Файл еще читается: задача станет готовой после чтения, планировщик не ждет диск
+                        break
+                    # Наборы пакета после первого выполняются в той же задаче: им нужна только память
+                    demand = self._reserve(node, {port: self.input_queues[node_id][port][0] for port in ports}, blocked,
+                                           batched=taken > 0)
+                    if demand is None:
+                        break
+                    node_inputs = {port: self._dequeue(node_id, port) for port in ports}
+                    ready_nodes.append((node_id, self._claim(node_id, node_inputs, demand)))
+                    taken += 1
+                if taken:
+                    tasks += 1
+
         return ready_nodes
 
-    def run(self, initial_inputs: Dict[str, Dict[str, Any]] = None, status_callback=None):
+    def _reserve(self, node, inputs: Dict[str, Any], blocked: Set[str], batched: bool = False) -> Optional[Dict[str, float]]:
         """
-        Запускает выполнение графа.
-        status_callback: функция(node_id, status), где status: "running" | "completed" | "error"
+        Резервирует ресурсы под задачу узла с данными входами.
+        batched: входы добавляются в уже взятую задачу-пакет (резервируется только память).
+        Returns: потребность задачи или None, если задача не помещается в бюджет.
+        """
+        demand = task_demand(getattr(node, "resources", DEFAULT_RESOURCES), inputs)
+        if batched:
+            demand = dict(demand, cpu=0, io=0)
+        needed = {key for key, amount in demand.items() if amount}
+        if needed & blocked or not self.budget.fits(demand):
+            blocked.update(needed)
+            return None
+        self.budget.acquire(demand)
+        self._update_resource_metrics()
+        return demand
+
+    def _claim(self, node_id: str, node_inputs: Dict[str, Any], demand: Dict[str, float]) -> Dict[str, Any]:
+        """Отмечает задачу взятой; зарезервированные ресурсы закрепляются за ее входами до отправки."""
+        self._claimed[node_id] += 1
+        self._claim_demands[id(node_inputs)] = demand
+        return node_inputs
+
+    def _batch_size(self, node_id: str, node) -> int:
+        """
+        Сколько наборов входов узла можно отправить одной задачей. Пакеты не собираются для INLINE-узлов
+        (их задачи и так без пересылки), узлов с кэшем результатов (ключ кэша - на вызов) и с цепочкой слияния.
+        """
+        size = getattr(node, "MAX_BATCH", 1) or 1
+        if size > 1 and (getattr(node, "INLINE", False) or node_id in self._chains
+                         or (self.cache is not None and getattr(node, "DETERMINISTIC", False))):
+            return 1
+        return size
+
+    def _unclaim(self, node_id: str, node_inputs: Dict[str, Any]):
+        """Отменяет взятие задачи, которая не была отправлена: входы возвращаются в начало очередей, ресурсы - в бюджет."""
+        self._claimed[node_id] -= 1
+        self._release_demand(self._claim_demands.pop(id(node_inputs), None))
+        if not node_inputs:
+            self._executed_sources.discard(node_id)
+        for port, value in node_inputs.items():
+            queue = self.input_queues[node_id][port]
+            queue.appendleft(value)
+            self._enqueue_times[node_id][port].appendleft(time.time())
+            self._m_queue_depth.set(len(queue), node=node_id, port=port)
+
+    def restrict(self, nodes: Set[str], replay: Dict[str, List[Dict[str, Any]]]):
         """
+        Ограничивает следующий запуск узлами nodes (остальные не выполняются).
+        replay: выходы узлов из прошлого запуска {node_id: [выходы задачи, ...]}, которые в начале запуска
+                раздаются потребителям из nodes, как если бы эти узлы выполнились снова.
+        """
+        self._restriction = (set(nodes), replay)
+
+    def _release_demand(self, demand: Optional[Dict[str, float]]):
+        if demand is not None:
+            self.budget.release(demand)
+            self._update_resource_metrics()
+
+    def _update_resource_metrics(self):
+        for key, amount in self.budget.in_use.items():
+            self._m_resources.set(amount, resource=key)
+
+    def _start(self, initial_inputs: Optional[Dict[str, Dict[str, Any]]], backend: concurrent.futures.Executor = None,
+               resume: bool = False):
+        """
+        Подготавливает состояние исполнителя к новому запуску.
+        resume: продолжить запуск с контрольной точки (начальные данные уже в ней).
+        """
+        if resume and self.checkpoint is None:
+            raise ValueError("resume requires checkpoint_dir")
+        if resume and initial_inputs:
+            raise ValueError("initial_inputs cannot be combined with resume: they are already in the checkpoint")
+        self._share_fanout = getattr(backend, "SHARED_MEMORY", False)
+        self._in_process = (getattr(backend, "IN_PROCESS", False)
+                            or isinstance(backend, concurrent.futures.ThreadPoolExecutor))
+        # sorted устойчива: узлы без COST остаются в порядке графа
+        self._order = sorted(self.graph.nodes, key=lambda node_id: -(getattr(self.graph.nodes[node_id], "COST", None) or 0))
+        self._chains = {}
+        for node in self.graph.nodes.values():
+            node.preview_size = self.preview
+        self._skipped = {node_id for node_id, node in self.graph.nodes.items()
+                         if self.preview and getattr(node, "PREVIEW_SKIP", False)}
+        if self._reader is None and any(getattr(node, "PREFETCH_INPUT", None) for node in self.graph.nodes.values()):
+            self._reader = PrefetchReader(self.prefetch_depth, self.io_threads)
+        self._copies_inputs = getattr(backend, "COPIES_INPUTS", False)
+        self._packed = getattr(backend, "PACKED_PAYLOADS", False)
+        self._resolver = getattr(backend, "resolve", None)
+        self._releaser = getattr(backend, "release", None)
+        self._references = getattr(backend, "references", None) if self._releaser is not None else None
+        self._exclusive.clear()
         if initial_inputs:
             self._feed_inputs(initial_inputs)
 
         self._executed_sources.clear()
+        self._claimed.clear()
+        self._cancel.clear()
+        self._cancel_handled = False
+        if self.status is not None:
+            self.status.reset()
+        self.outcome = None
+        self._last_event_time = time.time()
+        self._last_checkpoint = self._last_event_time
+        self._outputs_escape = self.retain_outputs
+        self.retained = {}
+        self._only = None
+        if resume:
+            self._restore_checkpoint()
+        if self._restriction is not None:
+            self._only, replay = self._restriction
+            self._restriction = None
+            for node_id, outputs_list in replay.items():
+                for outputs in outputs_list:
+                    self._distribute_outputs(node_id, outputs, targets=self._only)
+
+    def _plan_fusion(self):
+        """
+        Находит цепочки слияния: узел с FUSABLE = True выполняется в задаче узла-источника своего единственного
+        входа, если этот выход источника больше никуда не идет. Промежуточное значение не попадает в очереди
+        и не пересылается между процессами; элементы Items обрабатываются слитым узлом по одному.
+        Узлы, которым нужна отдельная задача (INLINE, concurrency_level, кэш, опережающее чтение), не сливаются.
+        Узлы со сроком задачи (TIMEOUT, timeout в графе, node_timeout) тоже: срок останавливает задачу целиком,
+        и цепочка с долгими слитыми узлами была бы остановлена по сроку источника.
+        """
+        def runs(node_id: str) -> bool:
+            return (self._only is None or node_id in self._only) and node_id not in self._skipped
+
+        def cached(node) -> bool:
+            return self.cache is not None and getattr(node, "DETERMINISTIC", False)
 
-        last_event_time = time.time()
-        
-        with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            while True:
-                done, _ = concurrent.futures.wait(self.active_tasks, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED)
-                
-                if done:
-                    last_event_time = time.time()
-                    for future in done:
-                        self.active_tasks.remove(future)
-                        node_id = self.future_to_node.pop(future)
-                        
-                        try:
-                            result_data, updated_node, captured_logs = future.result()
-                            
-                            self.graph.nodes[node_id] = updated_node
-                            
-                            if status_callback: status_callback(node_id, "completed")
-                            if captured_logs:
-                                print(captured_logs, end="" if captured_logs.endswith("\n") else "\n")
-                            self._distribute_outputs(node_id, result_data)
-                        except Exception as e:
-                            if status_callback: status_callback(node_id, "error")
-                            print(f"Error executing node {node_id}: {e}")
-
-                if len(self.active_tasks) < self.max_workers * 2:
-                    ready_tasks = self._check_ready_nodes()
-                    for node_id, node_inputs in ready_tasks:
-                        node = self.graph.nodes[node_id]
-
-                        future = executor.submit(_execute_node_wrapper, node, node_inputs)
-                        self.active_tasks.add(future)
-                        self.future_to_node[future] = node_id
-                        if status_callback: status_callback(node_id, "running")
-                        last_event_time = time.time()
-
-                is_idle = not self.active_tasks
-                has_pending_data = any(any(q) for queues in self.input_queues.values() for q in queues.values())
-                
-                if is_idle and not has_pending_data:
-                    print("Execution finished (no active tasks and no pending data).")
-                    break
-                
-                if time.time() - last_event_time > self.timeout:
-                    if is_idle and has_pending_data:
-                         print(f"Deadlock detected? Pending data exists but no nodes ready. Timeout {self.timeout}s reached.")
-                         break
-                    elif not is_idle:
-
-                        pass
-
-    def _distribute_outputs(self, source_node_id: str, outputs: Dict[str, Any]):
+        successor: Dict[str, tuple] = {}
+        for node_id, node in self.graph.nodes.items():
+            if (not getattr(node, "FUSABLE", False) or getattr(node, "INLINE", False) or len(node.INPUT_TYPES) != 1
+                    or getattr(node, "concurrency_level", None) is not None or getattr(node, "PREFETCH_INPUT", None)
+                    or cached(node) or self._node_timeout(node) is not None or not runs(node_id)):
+                continue
+            incoming = self.graph.get_incoming_links(node_id)
+            if len(incoming) != 1 or incoming[0].get("convert"):
+                continue
+            link = incoming[0]
+            source = self.graph.nodes[link["from_node"]]
+            if (link["from_node"] == node_id or getattr(source, "INLINE", False) or cached(source)
+                    or self._node_timeout(source) is not None):
+                continue
+            fanout = [other for other in self.graph.get_outgoing_links(link["from_node"])
+                      if other["from_output"] == link["from_output"]]
+            if len(fanout) == 1 and link["from_node"] not in successor:
+                successor[link["from_node"]] = (node_id, link["from_output"], link["to_input"])
+
+        fused = {node_id for node_id, _, _ in successor.values()}
+        for head in successor:
+            if head in fused or not runs(head):
+                continue
+            chain, current = [], head
+            while current in successor:
+                chain.append(successor[current])
+                current = successor[current][0]
+            self._chains[head] = chain
+
+    def _finish(self):
+        """
+        Завершает запуск: доставляет логи и освобождает разделяемые значения.
+        Значения, оставшиеся в очередях (например, при deadlock), заменяются обычными.
+        """
+        self.logs.flush()
+        if self.status is not None:
+            self.status.flush()
+        self._exclusive.clear()
+        # Ресурсы задач, которые не были отправлены или не завершились (отмена, ошибка построения задачи)
+        for demand in list(self._claim_demands.values()) + list(self._task_demands.values()):
+            self._release_demand(demand)
+        self._claim_demands.clear()
+        self._task_demands.clear()
+        # Задачи, брошенные прерванным запуском (см. _abandon), в следующий запуск не переходят
+        self.active_tasks.clear()
+        self.future_to_node.clear()
+        self._submit_times.clear()
+        self._inline.clear()
+        self._timeouts.clear()
+        self._started.clear()
+        self._terminated.clear()
+        self._task_inputs.clear()
+        self._task_chains.clear()
+        self._task_batches.clear()
+        self._value_keys.clear()
+        self._task_keys.clear()
+        # Ссылки, оставшиеся в очередях и у брошенных задач: данные на воркерах больше не нужны
+        self._task_refs.clear()
+        self._release_refs([entry[0] for entry in self._refs.values()], force=True)
+        if self._reader is not None:
+            self._reader.shutdown()
+            self._reader = None
+        if not self._shared:
+            return
+        for queues in self.input_queues.values():
+            for queue in queues.values():
+                for index, value in enumerate(queue):
+                    if shared_handles(value):
+                        queue[index] = materialize(value)
+        for shared, _ in self._shared.values():
+            shared.release()
+        self._shared.clear()
+        self._task_shared.clear()
+
+    def _backend_context(self):
+        """
+        Возвращает контекст бэкенда: переданный извне (не закрывается) или собственный LocalProcessBackend.
+        """
+        if self.backend is not None:
+            return contextlib.nullcontext(self.backend)
+        return LocalProcessBackend(max_workers=self.max_workers)
+
+    def _submit_ready(self, backend: concurrent.futures.Executor, status_callback=None) -> List[NodeEvent]:
+        """
+        Отправляет готовые узлы в бэкенд, пока не достигнут лимит задач в полете.
+        """
+        events = []
+        if self._cancel.is_set():
+            return events
+        limit = self._inflight_limit()
+        if len(self.active_tasks) >= limit:
+            self._note_saturated()
+        else:
+            ready_tasks = self._check_ready_nodes(limit - len(self.active_tasks))
+            # Наборы входов одного узла идут подряд только у узлов с MAX_BATCH > 1
+            for node_id, group in itertools.groupby(ready_tasks, key=lambda task: task[0]):
+                sets = [node_inputs for _, node_inputs in group]
+                self._submit_task(backend, node_id, Batch(sets) if len(sets) > 1 else sets[0], status_callback)
+                events.extend(NodeEvent(node_id, "running") for _ in sets)
+        return events
+
+    def _inflight_limit(self) -> int:
+        limit = self.concurrency.update() if self.concurrency else self.max_workers * 2
+        self._m_inflight_limit.set(limit)
+        return limit
+
+    def _note_saturated(self):
+        self._m_saturated.inc()
+        if self.concurrency:
+            self.concurrency.note_saturated()
+
+    def _submit_task(self, backend: concurrent.futures.Executor, node_id: str, node_inputs: Union[Dict[str, Any], Batch],
+                     status_callback=None) -> concurrent.futures.Future:
+        """
+        Отправляет одну задачу узла в бэкенд и регистрирует ее как активную.
+        node_inputs: входы задачи или Batch наборов входов (одна задача с Node.execute_batch).
+        """
+        node = self.graph.nodes[node_id]
+        sets = node_inputs if isinstance(node_inputs, Batch) else [node_inputs]
+
+        inline = getattr(node, "INLINE", False)
+        if not inline:
+            node = self._task_node(node)
+        if self._reader is not None:
+            for inputs in sets:
+                for port, value in inputs.items():
+                    if isinstance(value, PrefetchedPath):
+                        self._exclusive.discard(id(value))
+                        inputs[port] = value = self._reader.take(value)
+                        self._m_prefetch.inc(result="hit" if value.data is not None else "miss")
+        # Для пакета ключ не нужен (см. _batch_size), но счетчики ключей значений в очередях обновляются
+        cache_keys = [self._cache_key(node, inputs) for inputs in sets] if self.cache is not None else [None]
+        cache_key = cache_keys[0] if len(sets) == 1 else None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cache_key is not None:
+            self._m_cache.inc(result="hit" if cached is not None else "miss")
+        timeout = self._node_timeout(node)
+        if timeout is not None:
+            timeout *= len(sets)
+        chain = self._chains.get(node_id, ()) if cached is None else ()
+        # Пакет владеет только входами, которыми владеет каждый его набор
+        owned = frozenset.intersection(*[self._owned_ports(inputs, copied=not inline) for inputs in sets])
+        args = (node, node_inputs, self.log_level, owned, self._share_fanout and not chain, timeout)
+        if chain:
+            # Выход источника для слитого узла не должен оказаться в разделяемой памяти: он не возвращается в исполнитель
+            args += (tuple((self._task_node(self.graph.nodes[fused_id]), from_port, to_port, self._share_fanout)
+                           for fused_id, from_port, to_port in chain),)
+        shared = [handle for inputs in sets for value in inputs.values() for handle in shared_handles(value)]
+        if cached is not None:
+            # Результат уже в кэше: задача не запускается, состояние детерминированного узла не меняется
+            future = concurrent.futures.Future()
+            now = time.time()
+            future.set_result((cached, node, [], (now, now)))
+            self._inline.add(future)
+        elif inline:
+            future = _run_inline(*args)
+            self._inline.add(future)
+        elif self._packed:
+            threshold = self.transfer_threshold if self._share_fanout else None
+            try:
+                payload = _pack(args, self.compression, threshold)
+            except Exception as exc:
+                # Входы не сериализуются (например, блокировка): ошибка задачи, а не всего запуска
+                payload = None
+                future = concurrent.futures.Future()
+                future.set_exception(exc)
+                self._inline.add(future)
+            if isinstance(payload, SharedValue):
+                # Аргументы задачи в разделяемой памяти: блок удаляется после завершения задачи
+                self._shared[payload.name] = [payload, 1]
+                shared.append(payload)
+            if payload is not None:
+                future = backend.submit(_execute_packed, payload, self.compression, threshold)
+        else:
+            future = backend.submit(_execute_node_wrapper, *args)
+        self.active_tasks.add(future)
+        self.future_to_node[future] = node_id
+        self._task_demands[future] = _total_demand([self._claim_demands.pop(id(inputs), None) for inputs in sets])
+        self._submit_times[future] = time.time()
+        if timeout is not None and not inline:
+            self._timeouts[future] = timeout
+        if self.checkpoint is not None:
+            self._task_inputs[future] = [(node_id, dict(inputs)) for inputs in sets]
+        if len(sets) > 1:
+            self._task_batches[future] = len(sets)
+            self._m_batch.observe(len(sets), node_type=type(node).__name__)
+        if cache_key is not None:
+            self._task_keys[future] = (cache_key, cached is None)
+        if chain:
+            self._task_chains[future] = chain
+        if shared:
+            self._task_shared[future] = shared
+        if self._refs:
+            refs = [ref for inputs in sets for ref in self._references(inputs) if id(ref) in self._refs]
+            if refs:
+                self._task_refs[future] = refs
+        self._m_active.set(len(self.active_tasks))
+        self._m_bytes.inc(sum(payload_nbytes(inputs) for inputs in sets), node_type=type(node).__name__, direction="in")
+        for _ in sets:
+            self._report(status_callback, node_id, "running")
+        self._last_event_time = time.time()
+        return future
+
+    def _task_node(self, node):
+        """
+        Экземпляр узла для задачи. Обертка задачи хранит служебные атрибуты на узле, поэтому параллельные задачи
+        в потоках главного процесса получают свои поверхностные копии (как копии в воркерах);
+        общими остаются только вложенные объекты состояния (см. Node.THREAD_SAFE).
+        """
+        return copy.copy(node) if self._in_process else node
+
+    def _node_timeout(self, node) -> Optional[float]:
+        return node.timeout if getattr(node, "timeout", None) is not None else self.node_timeout
+
+    def _report(self, status_callback, node_id: str, status: str):
+        if status_callback:
+            status_callback(node_id, status)
+        if self.status is not None:
+            self.status.publish(node_id, status)
+
+    def _complete_task(self, future: concurrent.futures.Future, status_callback=None) -> List[NodeEvent]:
+        """
+        Обрабатывает завершенную задачу: обновляет состояние узла и раздает его выходы.
+        Returns: события задачи - по событию на каждый вызов пакета и слитого узла.
+        """
+        self._last_event_time = time.time()
+        self.active_tasks.remove(future)
+        node_id = self.future_to_node.pop(future)
+        submitted_at = self._submit_times.pop(future)
+        inline = future in self._inline
+        self._inline.discard(future)
+        calls = self._task_batches.pop(future, 1)
+        self._claimed[node_id] -= calls
+        self._release_demand(self._task_demands.pop(future, None))
+        if self.concurrency:
+            self.concurrency.record_completion()
+        self._release_shared(self._task_shared.pop(future, ()))
+        self._release_refs(self._task_refs.pop(future, ()))
+        self._timeouts.pop(future, None)
+        self._started.pop(future, None)
+        self._task_inputs.pop(future, None)
+        cache_key, store = self._task_keys.pop(future, (None, False))
+        chain = self._task_chains.pop(future, ())
+        terminated = self._terminated.pop(future, None)
+        node_type = type(self.graph.nodes[node_id]).__name__
+        self._m_active.set(len(self.active_tasks))
+
+        if terminated is not None or self._cancel_handled:
+            # Результат никому не передается: блоки разделяемой памяти из воркера удаляются
+            self._drop_result(future, inline)
+        if terminated == "timeout":
+            return self._fail(node_id, TimeoutError(f"Node {node_id} exceeded its timeout and was stopped"),
+                              status_callback, calls)
+        if terminated == "cancelled" or self._cancel_handled:
+            # Результат задачи, завершившейся после отмены запуска, никому не передается
+            # (ее входы уже в контрольной точке)
+            self._m_tasks.inc(calls, node_type=node_type, status="cancelled")
+            for _ in range(calls):
+                self._report(status_callback, node_id, "cancelled")
+            return [NodeEvent(node_id, "cancelled")] * calls
+
+        try:
+            result = future.result()
+            if self._packed and not inline:
+                result = _unpack(result)
+            result_data, updated_node, records, (started_at, finished_at) = result[:4]
+            self._m_start_latency.observe(max(0.0, started_at - submitted_at), node_type=node_type)
+            if calls > 1:
+                # Пакет: выходы каждого вызова раздаются как выходы отдельной задачи, время делится поровну
+                if not isinstance(result_data, list) or len(result_data) != calls:
+                    raise TypeError(f"execute_batch of node {node_id} must return a list of {calls} output dicts")
+                step = (finished_at - started_at) / calls
+                return [self._accept_result(node_id, outputs, updated_node, records if index == 0 else [],
+                                            (started_at + index * step, started_at + (index + 1) * step), status_callback)
+                        for index, outputs in enumerate(result_data)]
+            events = [self._accept_result(node_id, result_data, updated_node, records, (started_at, finished_at),
+                                          status_callback, cache_key, store)]
+            # Результаты слитых узлов (см. _plan_fusion) - как результаты их собственных задач
+            for index, stage_data, stage_node, stage_records, times, error in (result[4] if len(result) > 4 else ()):
+                fused_id = chain[index][0]
+                self._m_fused.inc(node_type=type(stage_node).__name__)
+                self._report(status_callback, fused_id, "running")
+                if error is not None:
+                    events += self._fail(fused_id, error, status_callback)
+                else:
+                    events.append(self._accept_result(fused_id, stage_data, stage_node, stage_records, times, status_callback))
+            return events
+        except Exception as e:
+            return self._fail(node_id, e, status_callback, calls)
+
+    def _accept_result(self, node_id: str, result_data: Dict[str, Any], updated_node, records, times: tuple,
+                       status_callback=None, cache_key: Optional[str] = None, store: bool = False) -> NodeEvent:
+        """Принимает результат успешной задачи: состояние узла, метрики, логи и раздача выходов."""
+        started_at, finished_at = times
+        node_type = type(self.graph.nodes[node_id]).__name__
+        self.graph.nodes[node_id] = updated_node
+        self._m_tasks.inc(node_type=node_type, status="completed")
+        self._m_duration.observe(finished_at - started_at, node_type=node_type)
+        self._m_bytes.inc(payload_nbytes(result_data), node_type=node_type, direction="out")
+
+        self._report(status_callback, node_id, "completed")
+        self.logs.publish(records)
+        # Получатель событий держит выходы дольше, чем живут блоки разделяемой памяти
+        event_outputs = {port: self._resolve(value) for port, value in result_data.items()} if self._outputs_escape else result_data
+        if store:
+            self._store_result(cache_key, result_data)
+        if self.retain_outputs:
+            self.retained.setdefault(node_id, []).append(event_outputs)
+        self._distribute_outputs(node_id, result_data, cache_key)
+        return NodeEvent(node_id, "completed", event_outputs)
+
+    def _fail(self, node_id: str, error: Exception, status_callback=None, calls: int = 1) -> List[NodeEvent]:
+        """Отмечает ошибку задачи; ошибка пакета - ошибка каждого его вызова."""
+        self._m_tasks.inc(calls, node_type=type(self.graph.nodes[node_id]).__name__, status="error")
+        for _ in range(calls):
+            self._report(status_callback, node_id, "error")
+        self.logs.flush()
+        print(f"Error executing node {node_id}: {error}")
+        return [NodeEvent(node_id, "error", error=error)] * calls
+
+    def _owned_ports(self, node_inputs: Dict[str, Any], copied: bool = True) -> frozenset:
+        """
+        Определяет входы, которыми задача владеет единолично и может изменять на месте.
+        Если бэкенд копирует аргументы (отдельные процессы), задача владеет всеми входами,
+        кроме одного объекта, поданного сразу на несколько портов. Иначе - только значениями
+        с единственным потребителем. copied=False - задача выполняется в главном процессе (INLINE).
+        """
+        counts: Dict[int, int] = defaultdict(int)
+        for value in node_inputs.values():
+            counts[id(value)] += 1
+
+        owned = []
+        for port, value in node_inputs.items():
+            key = id(value)
+            exclusive = key in self._exclusive
+            self._exclusive.discard(key)
+            if counts[key] == 1 and ((copied and self._copies_inputs) or exclusive):
+                owned.append(port)
+        return frozenset(owned)
+
+    def _abandon(self, futures):
+        """
+        Снимает задачи, результаты которых больше не нужны (прерванный events(), ошибка задания).
+        Уже выполняющиеся задачи отменить нельзя: их результаты удаляются по завершении.
+        """
+        for future in list(futures):
+            if not future.cancel():
+                inline = future in self._inline
+                future.add_done_callback(lambda done, inline=inline: self._drop_result(done, inline))
+
+    def _drop_result(self, future: concurrent.futures.Future, inline: bool = False):
+        """
+        Удаляет блоки разделяемой памяти, созданные воркером для результата, который никто не заберет:
+        крупный результат целиком (SharedValue) и полосы SharedImageView в выходах. Иначе блоки остаются
+        в /dev/shm до перезагрузки. Данные, оставленные в воркерах бэкенда (RemoteRef), освобождаются.
+        """
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+            if self._packed and not inline:
+                result = _unpack(result)
+        except Exception:
+            return
+        result_data = result[0]
+        outputs = list(result_data) if isinstance(result_data, list) else [result_data]
+        outputs += [stage[1] for stage in (result[4] if len(result) > 4 else ()) if stage[1] is not None]
+        names = {handle.name for data in outputs if isinstance(data, dict) for value in data.values()
+                 for handle in shared_handles(value) if isinstance(handle, SharedImageView)}
+        for name in names - set(self._shared):
+            SharedBlock(name).release()
+        if self._references is not None:
+            refs = [ref for data in outputs if isinstance(data, dict) for ref in self._references(data)]
+            if refs:
+                self._releaser(refs)
+
+    def _release_shared(self, values: List[Any]):
+        """
+        Отмечает, что потребитель обработал разделяемые значения; блок удаляется после последнего.
+        """
+        for value in values:
+            entry = self._shared.get(value.name)
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._shared[value.name]
+                entry[0].release()
+
+    def _release_refs(self, refs: List[Any], force: bool = False):
+        """
+        Отмечает, что потребитель обработал ссылки на данные бэкенда (RemoteRef); после последнего
+        потребителя (или сразу, force=True) данные освобождаются на воркере.
+        """
+        released = []
+        for ref in refs:
+            entry = self._refs.get(id(ref))
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0 or force:
+                del self._refs[id(ref)]
+                released.append(ref)
+        if released:
+            self._releaser(released)
+
+    def _check_finished(self) -> Optional[str]:
+        """
+        Проверяет условие завершения запуска.
+        Returns: "finished" | "deadlock" | "cancelled" | None (запуск продолжается)
+        """
+        is_idle = not self.active_tasks
+        if self._cancel_handled:
+            if is_idle:
+                print("Execution cancelled.")
+                return "cancelled"
+            return None
+        has_pending_data = self._has_pending_data()
+        if self._reader is not None and self._reader.reads:
+            # Данные ждут чтения файлов: это не простой
+            self._last_event_time = time.time()
+
+        if is_idle and not has_pending_data:
+            print("Execution finished (no active tasks and no pending data).")
+            return "finished"
+
+        if time.time() - self._last_event_time > self.timeout:
+            if is_idle and has_pending_data:
+                 print(f"Deadlock detected? Pending data exists but no nodes ready. Timeout {self.timeout}s reached.")
+                 return "deadlock"
+        return None
+
+    def run(self, initial_inputs: Dict[str, Dict[str, Any]] = None, status_callback=None, resume: bool = False) -> str:
+        """
+        Запускает выполнение графа.
+        status_callback: функция(node_id, status), где status: "running" | "completed" | "error" | "cancelled"
+        resume: продолжить прерванный запуск с контрольной точки (нужен checkpoint_dir).
+        Returns: итог запуска ("finished" | "deadlock" | "cancelled").
+        """
+        try:
+            with self._backend_context() as backend:
+                self._start(initial_inputs, backend, resume)
+                if self.fusion and not self._outputs_escape:
+                    self._plan_fusion()
+                try:
+                    while self.outcome is None:
+                        reads = self._reader.reads if self._reader is not None else []
+                        done, _ = concurrent.futures.wait(self.active_tasks.union(reads), timeout=0.1,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            if future in self.active_tasks:
+                                self._complete_task(future, status_callback)
+
+                        self._maybe_checkpoint()
+                        self._supervise(backend)
+                        self._submit_ready(backend, status_callback)
+                        self.logs.pump()
+                        if self.status is not None:
+                            self.status.pump()
+                        self.outcome = self._check_finished()
+                except BaseException:
+                    # Цикл прерван исключением (запись контрольной точки, обработчик статусов, Ctrl+C):
+                    # еще не начатые задачи снимаются до закрытия бэкенда, результаты остальных удаляются
+                    self._abandon(self.active_tasks)
+                    raise
+                self._end_checkpoint()
+        finally:
+            self._finish()
+        return self.outcome
+
+    async def events(self, initial_inputs: Dict[str, Dict[str, Any]] = None, status_callback=None,
+                     resume: bool = False) -> AsyncIterator[NodeEvent]:
+        """
+        Асинхронно выполняет граф, выдавая события узлов по мере их появления.
+
+        Example:
+            async for event in executor.events():
+                if event.status == "completed":
+                    print(event.node_id, event.outputs)
+        """
+        own_backend = self.backend is None
+        backend = self.backend if not own_backend else LocalProcessBackend(max_workers=self.max_workers)
+        self._start(initial_inputs, backend, resume)
+        # Выходы узлов попадают в события, поэтому потребитель событий тоже держит ссылки на них
+        self._outputs_escape = True
+        waiters: Dict[asyncio.Future, concurrent.futures.Future] = {}
+
+        try:
+            while self.outcome is None:
+                if waiters:
+                    done, _ = await asyncio.wait(list(waiters), timeout=0.1, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    # Нечего ждать: даем циклу событий обслужить другие запуски
+                    done = ()
+                    reads = self._reader.reads if self._reader is not None else []
+                    if reads:
+                        await asyncio.wait([asyncio.wrap_future(read) for read in reads], timeout=0.1,
+                                           return_when=asyncio.FIRST_COMPLETED)
+                    else:
+                        await asyncio.sleep(0.1 if self.active_tasks or self._has_pending_data() else 0)
+
+                for waiter in done:
+                    for event in self._complete_task(waiters.pop(waiter), status_callback):
+                        yield event
+
+                self._maybe_checkpoint()
+                self._supervise(backend)
+                for event in self._submit_ready(backend, status_callback):
+                    yield event
+                watched = set(waiters.values())
+                for future in self.active_tasks:
+                    if future not in watched:
+                        waiters[asyncio.wrap_future(future)] = future
+
+                self.logs.pump()
+                if self.status is not None:
+                    self.status.pump()
+                self.outcome = self._check_finished()
+            self._end_checkpoint()
+        finally:
+            if self.outcome is None:
+                # Потребитель прервал итерацию: снимаем еще не начатые задачи, результаты остальных удаляются
+                self._abandon(self.active_tasks)
+            if own_backend:
+                await asyncio.get_running_loop().run_in_executor(None, backend.shutdown)
+            self._finish()
+            self._outputs_escape = False
+
+    async def run_async(self, initial_inputs: Dict[str, Dict[str, Any]] = None, status_callback=None,
+                        resume: bool = False) -> str:
+        """
+        Асинхронный аналог run(): не блокирует цикл событий, поэтому на одном цикле
+        (и одном общем бэкенде, см. параметр backend) можно вести много запусков одновременно.
+        Returns: итог запуска ("finished" | "deadlock" | "cancelled").
+        """
+        async for _ in self.events(initial_inputs, status_callback, resume):
+            pass
+        return self.outcome
+
+    def cancel(self):
+        """
+        Отменяет текущий запуск (можно вызывать из другого потока, например из GUI).
+        Новые задачи не запускаются, данные в очередях отбрасываются, выполняющиеся задачи
+        останавливаются бэкендом (если он это умеет, иначе их результаты отбрасываются).
+        Запуск завершается с итогом "cancelled".
+        """
+        self._cancel.set()
+
+    def _supervise(self, backend: concurrent.futures.Executor):
+        """
+        Следит за сроками задач и отменой запуска: задачи, превысившие срок на kill_grace,
+        и все задачи отмененного запуска останавливаются через бэкенд.
+        """
+        now = time.time()
+        stop: Dict[concurrent.futures.Future, str] = {}
+        if self._cancel.is_set():
+            if self._cancel_handled:
+                return
+            if self.checkpoint is not None and not self._save_checkpoint():
+                return # точка записывается до того, как очереди будут очищены
+            self._cancel_handled = True
+            for node_id, queues in self.input_queues.items():
+                for port, queue in queues.items():
+                    queue.clear() # разделяемые значения из очередей освобождает _finish()
+                    self._enqueue_times[node_id][port].clear()
+                    self._m_queue_depth.set(0, node=node_id, port=port)
+            stop = {future: "cancelled" for future in self.active_tasks if future not in self._terminated}
+        else:
+            for future, timeout in self._timeouts.items():
+                if future in self._terminated or future.done():
+                    continue
+                started = self._started.get(future)
+                if started is None:
+                    # Срок отсчитывается с момента, когда бэкенд начал выполнять задачу, а не с отправки
+                    if future.running():
+                        self._started[future] = now
+                elif now - started > timeout + self.kill_grace:
+                    stop[future] = "timeout"
+        if stop:
+            self._stop_tasks(backend, stop)
+
+    def _stop_tasks(self, backend: concurrent.futures.Executor, stop: Dict[concurrent.futures.Future, str]):
+        running = []
+        for future, reason in stop.items():
+            self._terminated[future] = reason
+            self._m_terminated.inc(reason=reason)
+            if not future.cancel() and not future.done():
+                running.append(future)
+        terminate = getattr(backend, "terminate", None)
+        if running and not (terminate is not None and terminate(running)) and not self._warned_terminate:
+            self._warned_terminate = True
+            print(f"Warning: backend {type(backend).__name__} cannot stop running tasks; waiting for them to finish.")
+
+    def _maybe_checkpoint(self):
+        if self.checkpoint is not None and time.time() - self._last_checkpoint >= self.checkpoint_interval:
+            self._save_checkpoint()
+
+    def _end_checkpoint(self):
+        """После успешного запуска точка удаляется, после deadlock - записывается (при отмене она уже записана)."""
+        if self.checkpoint is None:
+            return
+        if self.outcome == "finished":
+            self.checkpoint.clear()
+        elif self.outcome == "deadlock":
+            self._save_checkpoint()
+
+    def _save_checkpoint(self) -> bool:
+        """
+        Записывает контрольную точку. Задачи в полете попадают в нее своими входами и при продолжении
+        выполняются заново; состояния их узлов сохраняются такими, какими были до задачи.
+        Returns: False, если точка отложена: INLINE-задача уже изменила состояние узла, но ее результат еще не обработан.
+        """
+        if self._inline & self.active_tasks:
+            return False
+        queues = {}
+        for node_id, node_queues in self.input_queues.items():
+            for port, queue in node_queues.items():
+                if queue:
+                    queues.setdefault(node_id, {})[port] = [self._checkpoint_value(value) for value in queue]
+        inflight = [(node_id, {port: self._checkpoint_value(value) for port, value in inputs.items()})
+                    for task_inputs in self._task_inputs.values() for node_id, inputs in task_inputs]
+        self.checkpoint.save({
+            "graph": self._graph_signature(),
+            "nodes": dict(self.graph.nodes),
+            "inflight": inflight,
+            "queues": queues,
+            "executed_sources": sorted(self._executed_sources),
+        })
+        self._last_checkpoint = time.time()
+        return True
+
+    def _checkpoint_value(self, value: Any) -> Any:
+        if isinstance(value, PrefetchedPath):
+            return str(value) # файл будет прочитан заново
+        return self._resolve(value)
+
+    def _graph_signature(self) -> Dict[str, str]:
+        return {node_id: type(node).__name__ for node_id, node in self.graph.nodes.items()}
+
+    def _restore_checkpoint(self):
+        """Восстанавливает состояние запуска с контрольной точки. Raises: ValueError, если точка от другого графа."""
+        state = self.checkpoint.load()
+        if state["graph"] != self._graph_signature():
+            raise ValueError(f"Checkpoint in {self.checkpoint.directory} was written for a different graph")
+        self.graph.nodes.update(state["nodes"])
+        self._executed_sources.update(state["executed_sources"])
+        # Входы задач, прерванных вместе с запуском, были взяты из очередей раньше остальных значений
+        for node_id, inputs in state["inflight"]:
+            if not inputs:
+                self._executed_sources.discard(node_id)
+            for port, value in inputs.items():
+                self._enqueue(node_id, port, value)
+        for node_id, node_queues in state["queues"].items():
+            for port, values in node_queues.items():
+                for value in values:
+                    self._enqueue(node_id, port, value)
+        print(f"Resumed from checkpoint {self.checkpoint.path}")
+
+    def _has_pending_data(self) -> bool:
+        if any(any(q) for queues in self.input_queues.values() for q in queues.values()):
+            return True
+        # Источник, который еще не запускался (например, не поместился в общий бюджет ресурсов), - тоже работа
+        return any(not node.INPUT_TYPES and node_id not in self._executed_sources and node_id not in self._skipped
+                   and (self._only is None or node_id in self._only) for node_id, node in self.graph.nodes.items())
+
+    def _distribute_outputs(self, source_node_id: str, outputs: Dict[str, Any], cache_key: Optional[str] = None,
+                            targets: Optional[Set[str]] = None):
         """
         Передает результаты выполнения узла в очереди следующих узлов.
+        cache_key: ключ кэша задачи; выходы получают производные от него ключи, чтобы ключи задач
+                   потребителей не требовали хэширования содержимого.
+        targets: передавать только этим узлам (None - всем потребителям).
         """
         if not outputs:
             return
 
-        outgoing = self.graph.get_outgoing_links(source_node_id)
-        for link in outgoing:
-            port_name = link["from_output"]
-            target_node = link["to_node"]
-            target_input = link["to_input"]
-            
-            if port_name in outputs:
-                value = outputs[port_name]
-                self.input_queues[target_node][target_input].append(value)
-
-def _execute_node_wrapper(node, inputs):
+        # Полосы изображений в разделяемой памяти (SharedImageView): блок живет, пока полосы не обработаны всеми потребителями
+        view_blocks = {handle.name for output in outputs.values() for handle in shared_handles(output)
+                       if isinstance(handle, SharedImageView)}
+        for name in view_blocks:
+            self._shared.setdefault(name, [SharedBlock(name), 0])
+        # Ссылки на данные, оставленные в воркерах бэкенда: данные освобождаются после последнего потребителя
+        refs = [ref for output in outputs.values() for ref in self._references(output)] if self._references else []
+        for ref in refs:
+            self._refs.setdefault(id(ref), [ref, 0])
+
+        # Связи группируются по выходу и целевому типу: преобразование выполняется один раз на группу
+        links_by_port: Dict[tuple, List[dict]] = defaultdict(list)
+        for link in self.graph.get_outgoing_links(source_node_id):
+            if link["to_node"] in self._skipped or (targets is not None and link["to_node"] not in targets):
+                continue
+            if link["from_output"] in outputs:
+                links_by_port[(link["from_output"], link.get("convert"))].append(link)
+
+        for (port_name, target_type), links in links_by_port.items():
+            output = outputs[port_name]
+            # Items раздаются поэлементно: каждый элемент - отдельный элемент очереди потребителя
+            for index, value in enumerate(output if isinstance(output, Items) else (output,)):
+                if target_type:
+                    value = convert(self._resolve(value), target_type)
+                value = self._share_value(value, len(links))
+                if cache_key is not None:
+                    entry = self._value_keys.setdefault(id(value), [f"{cache_key}/{port_name}/{index}/{target_type}", 0])
+                    entry[1] += len(links)
+                for handle in shared_handles(value):
+                    if isinstance(handle, SharedImageView):
+                        self._shared[handle.name][1] += len(links)
+                if refs:
+                    for ref in self._references(value):
+                        if id(ref) in self._refs:
+                            self._refs[id(ref)][1] += len(links)
+                if len(links) == 1 and not self._outputs_escape:
+                    self._exclusive.add(id(value))
+                for link in links:
+                    self._enqueue(link["to_node"], link["to_input"], value)
+
+        for name in view_blocks:
+            if self._shared[name][1] == 0:
+                # Полосы никому не переданы
+                self._shared.pop(name)[0].release()
+        unused = [self._refs.pop(id(ref))[0] for ref in refs if id(ref) in self._refs and self._refs[id(ref)][1] == 0]
+        if unused:
+            self._releaser(unused)
+
+    def _cache_key(self, node, node_inputs: Dict[str, Any]) -> Optional[str]:
+        """
+        Ключ кэша задачи или None, если узел не детерминирован (или входы нельзя хэшировать).
+        Входы без известного ключа (начальные данные, выходы недетерминированных узлов) хэшируются по содержимому,
+        кроме данных вне главного процесса (RemoteRef) и полос в разделяемой памяти (SharedImageView): их пришлось бы
+        загрузить и хэшировать в потоке планировщика, поэтому такая задача выполняется без кэша.
+        """
+        input_keys = {}
+        for port, value in node_inputs.items():
+            entry = self._value_keys.get(id(value))
+            if entry is not None:
+                input_keys[port] = entry[0]
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._value_keys[id(value)]
+        if not getattr(node, "DETERMINISTIC", False) or getattr(node, "INLINE", False):
+            return None
+        try:
+            for port, value in node_inputs.items():
+                if port in input_keys:
+                    continue
+                if ((self._references is not None and self._references(value))
+                        or any(isinstance(handle, SharedImageView) for handle in shared_handles(value))):
+                    return None
+                input_keys[port] = fingerprint(materialize(value))
+        except Exception as e:
+            print(f"Warning: inputs of node {node.node_id} cannot be hashed, cache skipped: {e}")
+            return None
+        return self.cache.key(node, input_keys)
+
+    def _store_result(self, cache_key: str, result_data: Dict[str, Any]):
+        try:
+            self.cache.put(cache_key, {port: self._resolve(value) for port, value in result_data.items()})
+        except Exception as e:
+            # Кэш - оптимизация: ошибка записи (нет места, несериализуемый выход) не прерывает запуск
+            print(f"Warning: failed to cache result: {e}")
+
+    def _resolve(self, value: Any) -> Any:
+        """
+        Обычное значение вместо разделяемого представления или ссылки на данные бэкенда (RemoteRef).
+        """
+        value = materialize(value)
+        return self._resolver(value) if self._resolver is not None else value
+
+    def _share_value(self, value: Any, consumers: int) -> Any:
+        """
+        Для выхода с несколькими потребителями заменяет крупное значение на SharedValue,
+        чтобы оно сериализовалось один раз, а не при отправке каждой задачи.
+        """
+        if consumers < 2 or not self._share_fanout or payload_nbytes(value) < self.share_threshold:
+            return value
+        shared = SharedValue(value)
+        self._shared[shared.name] = [shared, consumers]
+        self._m_fanout_saved.inc(shared.nbytes * (consumers - 1))
+        return shared
+
+def _execute_node_wrapper(node, inputs, log_level: int = 20, owned: frozenset = frozenset(), shared_memory: bool = False,
+                          timeout: Optional[float] = None, chain: tuple = ()):
     """
     Функция-обертка для запуска в отдельном процессе.
+    Вывод узла (print и Node.log) собирается в записи лога, отфильтрованные по log_level.
+    inputs: входы или Batch наборов входов - тогда вызывается node.execute_batch и выходы - список по наборам.
+    owned: входы, которыми узел владеет единолично (доступны узлу как inputs_owned).
+    shared_memory: узел может возвращать выходы в разделяемой памяти (доступно как node.shared_memory).
+    timeout: срок задачи в секундах (проверяется узлом через Node.check_deadline()).
+    chain: слитые узлы ((узел, выход, вход, shared_memory), ...), которые выполняются следом (см. _run_chain).
+    Returns: (выходы, обновленный узел, записи лога, (время старта, время завершения)),
+             с цепочкой - пятым элементом результаты слитых узлов.
     """
-    buffer = io.StringIO()
+    log = WorkerLog(node.node_id, log_level)
+    node._log_sink = log
+    node.inputs_owned = owned
+    node.shared_memory = shared_memory
+    started_at = time.time()
+    node._deadline = started_at + timeout if timeout is not None else None
     try:
-        with contextlib.redirect_stdout(buffer):
-            result = node.execute(**inputs)
-        logs = buffer.getvalue()
-        return result, node, logs
+        with capture_stdout(log):
+            if isinstance(inputs, Batch):
+                result = node.execute_batch([{port: materialize(value) for port, value in item.items()} for item in inputs])
+            else:
+                result = node.execute(**{port: materialize(value) for port, value in inputs.items()})
+        outcome = result, node, log.close(), (started_at, time.time())
     except Exception as exc:
-        logs = buffer.getvalue()
+        logs = "\n".join(format_record(record) for record in log.close())
         raise Exception(f"{exc}\nCaptured logs:\n{logs}") from exc
+    finally:
+        del node._log_sink
+        del node.inputs_owned
+        del node.shared_memory
+        del node._deadline
+    if chain:
+        outcome += (_run_chain(result, chain, log_level),)
+    return outcome
+
+def _run_chain(outputs: Dict[str, Any], chain: tuple, log_level: int) -> list:
+    """
+    Выполняет слитые узлы в задаче их источника: выход источника забирается из его результата
+    и подается на вход следующего узла цепочки (Items - поэлементно). Ошибка узла не прерывает задачу,
+    а возвращается исполнителю вместо результата этого вызова.
+    Returns: [(номер узла в цепочке, выходы, обновленный узел, записи лога, время, ошибка), ...]
+    """
+    stages = []
+    current = [outputs]
+    for index, (node, from_port, to_port, shared_memory) in enumerate(chain):
+        produced = []
+        for outputs in current:
+            if not isinstance(outputs, dict) or from_port not in outputs:
+                continue
+            value = outputs.pop(from_port)
+            for item in value if isinstance(value, Items) else (value,):
+                try:
+                    # Значение создано в этой задаче и больше никому не передается
+                    result, node, records, times = _execute_node_wrapper(node, {to_port: item}, log_level,
+                                                                         frozenset((to_port,)), shared_memory)
+                except Exception as exc:
+                    stages.append((index, None, node, [], None, exc))
+                    continue
+                stages.append((index, result, node, records, times, None))
+                produced.append(result)
+        current = produced
+    return stages
 
+def _total_demand(demands: List[Optional[Dict[str, float]]]) -> Optional[Dict[str, float]]:
+    """Суммарная потребность наборов входов задачи-пакета."""
+    total = None
+    for demand in demands:
+        if demand is not None:
+            total = dict(demand) if total is None else {key: total.get(key, 0) + demand.get(key, 0)
+                                                        for key in total.keys() | demand.keys()}
+    return total
+
+def _run_inline(node, inputs, log_level: int, owned: frozenset, shared_memory: bool = False,
+                timeout: Optional[float] = None) -> concurrent.futures.Future:
+    """Выполняет INLINE-узел в текущем процессе и возвращает уже завершенный Future."""
+    future = concurrent.futures.Future()
+    try:
+        future.set_result(_execute_node_wrapper(node, inputs, log_level, owned, shared_memory, timeout))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+def _pack(value: Any, compression: Optional[str], threshold: Optional[int]):
+    """
+    Сериализует значение для передачи между процессами: крупные кадры (не меньше threshold)
+    кладутся в разделяемую память, остальные передаются как Frame (части без склейки в один буфер).
+    """
+    frame = encode(value, compression)
+    if threshold is not None and frame.nbytes >= threshold:
+        return SharedValue.from_frame(frame)
+    return frame
+
+def _unpack(payload) -> Any:
+    """Восстанавливает результат задачи; блок разделяемой памяти из воркера удаляется."""
+    if isinstance(payload, SharedValue):
+        return payload.consume()
+    return decode(payload)
+
+def _execute_packed(payload, compression: Optional[str] = None, threshold: Optional[int] = None):
+    """
+    Запуск узла с сериализацией исполнителя (pickle 5 с внеполосными буферами) для аргументов и результата.
+    """
+    args = payload.load() if isinstance(payload, SharedValue) else decode(payload)
+    return _pack(_execute_node_wrapper(*args), compression, threshold)
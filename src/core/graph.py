@@ -1,5 +1,7 @@
-from typing import Dict, List, Any, Type
+from typing import Dict, List, Any, Set, Type
 from .node import Node
+from .types import link_conversion
+from .resources import validate_resources
 
 class Graph:
     """
@@ -21,6 +23,8 @@ class Graph:
         {
             "nodes": [
                 {"id": "1", "type": "LoadImage", "params": {"path": "img.jpg"}},
+                {"id": "2", "type": "BlendImages", "resources": {"memory_per_mpx": 20}, "concurrency_level": 2,
+                 "timeout": 30},
                 ...
             ],
             "links": [
@@ -44,6 +48,19 @@ class Graph:
             
             node_class = self.node_registry[node_type]
             node_instance = node_class(node_id, params)
+            # Переопределения для экземпляра: требования к ресурсам и число одновременных задач
+            if "resources" in node_data:
+                node_instance.resources = validate_resources(dict(node_instance.resources, **node_data["resources"]))
+            if "concurrency_level" in node_data:
+                level = node_data["concurrency_level"]
+                if level is not None and (not isinstance(level, int) or level < 1):
+                    raise ValueError(f"concurrency_level of node {node_id} must be a positive integer or null, got {level!r}")
+                node_instance.concurrency_level = level
+            if "timeout" in node_data:
+                timeout = node_data["timeout"]
+                if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+                    raise ValueError(f"timeout of node {node_id} must be a positive number or null, got {timeout!r}")
+                node_instance.timeout = timeout
             self.nodes[node_id] = node_instance
             self.adj_list[node_id] = []
             self.reverse_adj_list[node_id] = []
@@ -70,8 +87,10 @@ class Graph:
             out_type = source_node.OUTPUT_TYPES[from_output]
             in_type = target_node.INPUT_TYPES[to_input]
             
-            if out_type != in_type and out_type != "Any" and in_type != "Any":
-                 raise ValueError(f"Type mismatch: Node {from_node} output '{from_output}' ({out_type}) -> Node {to_node} input '{to_input}' ({in_type})")
+            try:
+                conversion = link_conversion(out_type, in_type)
+            except ValueError:
+                raise ValueError(f"Type mismatch: Node {from_node} output '{from_output}' ({out_type}) -> Node {to_node} input '{to_input}' ({in_type})")
 
             link = {
                 "from_node": from_node,
@@ -79,6 +98,9 @@ class Graph:
                 "to_node": to_node,
                 "to_input": to_input
             }
+            if conversion:
+                # Данные на этой связи преобразуются исполнителем (например, Image -> Array)
+                link["convert"] = conversion
             self.links.append(link)
             self.adj_list[from_node].append(link)
             self.reverse_adj_list[to_node].append(link)
@@ -92,4 +114,16 @@ class Graph:
     def get_outgoing_links(self, node_id: str) -> List[Dict[str, str]]:
         return self.adj_list.get(node_id, [])
 
+    def downstream(self, node_ids) -> Set[str]:
+        """Узлы node_ids и все узлы, достижимые из них по связям (включая циклы)."""
+        result = set()
+        stack = [node_id for node_id in node_ids if node_id in self.nodes]
+        while stack:
+            node_id = stack.pop()
+            if node_id in result:
+                continue
+            result.add(node_id)
+            stack.extend(link["to_node"] for link in self.get_outgoing_links(node_id))
+        return result
+
 
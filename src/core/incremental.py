@@ -0,0 +1,72 @@
+from typing import Dict, Any, List, Optional, Set, Type
+from .graph import Graph
+from .node import Node
+from .executor import Executor
+
+class IncrementalSession:
+    """
+    Серия запусков одного редактируемого графа. Выходы узлов последнего запуска сохраняются,
+    и следующий запуск выполняет только измененные узлы и все узлы ниже них по связям;
+    остальным потребителям выходы прошлого запуска подаются повторно.
+
+    Example:
+        session = IncrementalSession(NODE_REGISTRY)
+        session.run(graph_data)                  # полный запуск
+        session.run(graph_data, dirty={"blur"})  # только blur и его потомки
+    """
+    def __init__(self, node_registry: Dict[str, Type[Node]], **executor_options):
+        """
+        executor_options: параметры Executor для каждого запуска (max_workers, backend, cache, ...).
+        """
+        self.node_registry = node_registry
+        self.executor_options = executor_options
+        self.executor: Optional[Executor] = None # исполнитель текущего запуска (например, для cancel())
+        self.outputs: Optional[Dict[str, List[Dict[str, Any]]]] = None # выходы узлов последнего запуска
+        self._stale: Set[str] = set() # узлы, которые не выполнились успешно и должны быть перезапущены
+
+    def invalidate(self):
+        """Следующий запуск будет полным (например, после загрузки другого графа)."""
+        self.outputs = None
+        self._stale.clear()
+
+    def run(self, graph_data: Dict[str, Any], dirty: Optional[Set[str]] = None, status_callback=None) -> str:
+        """
+        graph_data: граф в формате Graph.load_from_json.
+        dirty: узлы, измененные после прошлого запуска (параметры, новые узлы, целевые узлы измененных связей).
+               None - полный запуск.
+        Returns: итог запуска ("finished" | "deadlock" | "cancelled").
+        """
+        graph = Graph(self.node_registry)
+        graph.load_from_json(graph_data)
+
+        if self.outputs is None or dirty is None:
+            outputs = {}
+            cone = set(graph.nodes)
+        else:
+            outputs = {node_id: value for node_id, value in self.outputs.items() if node_id in graph.nodes}
+            # Узлы, которых не было в прошлом запуске, тоже выполняются
+            changed = set(dirty) | self._stale | {node_id for node_id in graph.nodes if node_id not in self.outputs}
+            cone = graph.downstream(changed)
+        replay = {node_id: value for node_id, value in outputs.items() if node_id not in cone}
+
+        failed = set()
+        def track(node_id, status):
+            if status in ("error", "cancelled"):
+                failed.add(node_id)
+            if status_callback:
+                status_callback(node_id, status)
+
+        executor = Executor(graph, retain_outputs=True, **self.executor_options)
+        executor.restrict(cone, replay)
+        self.executor = executor
+        try:
+            outcome = executor.run(status_callback=track)
+        finally:
+            self.executor = None
+
+        for node_id in cone:
+            outputs[node_id] = executor.retained.get(node_id, [])
+        self.outputs = outputs
+        # Прерванный или неудачный запуск: затронутые узлы выполняются снова в следующий раз
+        self._stale = cone if outcome != "finished" else failed
+        return outcome
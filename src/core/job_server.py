@@ -0,0 +1,371 @@
+import json
+import time
+import queue
+import itertools
+import threading
+import concurrent.futures
+import multiprocessing
+from typing import Dict, Any, List, Optional, Type, Union
+from collections import deque
+from .graph import Graph
+from .node import Node, Batch
+from .executor import Executor
+from .backends import LocalProcessBackend
+from .concurrency import ConcurrencyController
+from .resources import ResourceBudget
+
+class Job:
+    """
+    Задание сервера: один граф со своим исполнителем, приоритетом и статистикой.
+    status: "queued" | "running" | "finished" | "deadlock" | "error" | "cancelled"
+    """
+    def __init__(self, job_id: str, graph_data: Dict[str, Any], initial_inputs: Dict[str, Dict[str, Any]] = None,
+                 priority: float = 1.0, status_callback=None, status_handler=None):
+        if priority <= 0:
+            raise ValueError(f"Job priority must be positive, got {priority}")
+        self.job_id = job_id
+        self.graph_data = graph_data
+        self.initial_inputs = initial_inputs
+        self.priority = priority
+        self.status_callback = status_callback
+        self.status_handler = status_handler
+        self.status = "queued"
+        self.error: Optional[Exception] = None
+        self.executor: Optional[Executor] = None
+        self.cancel_requested = False
+
+        self.running = 0 # задачи этого задания в пуле
+        self.ready: deque = deque() # взятые из очередей наборы входов, которые еще не отправлены (в пределах _dispatch)
+        self.tasks_completed = 0
+
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def queue_time(self) -> Optional[float]:
+        """Время от постановки в очередь до первого запуска задачи."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Полное время задания: от постановки в очередь до завершения."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        self._done.set()
+
+    def __repr__(self):
+        return f"<Job {self.job_id} {self.status} priority={self.priority}>"
+
+class JobServer:
+    """
+    Локальный сервер заданий: принимает графы в очередь и выполняет узлы всех
+    активных заданий на одном общем пуле воркеров.
+
+    Доля пула распределяется пропорционально приоритету: следующей запускается задача
+    того задания, у которого меньше всего задач в полете в расчете на единицу приоритета.
+    Бюджет ресурсов (Node.RESOURCES) общий для всех заданий; ресурсы резервируются только
+    под задачу, которую планировщик отправляет, поэтому задания не занимают бюджет впрок.
+    """
+    def __init__(self, node_registry: Dict[str, Type[Node]], max_workers: int = None, timeout: float = 20.0,
+                 backend: Optional[concurrent.futures.Executor] = None, adaptive: bool = False,
+                 resources: Optional[Dict[str, Optional[float]]] = None, node_timeout: Optional[float] = None):
+        """
+        backend: общий бэкенд выполнения. Если не задан, сервер создает собственный LocalProcessBackend.
+        adaptive: подстраивать общий лимит задач в полете под нагрузку (ConcurrencyController).
+        resources: емкость общего бюджета ресурсов (см. Executor, параметр resources).
+        node_timeout: срок задачи узла по умолчанию (см. Executor, параметр node_timeout).
+        """
+        self.node_registry = node_registry
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.node_timeout = node_timeout
+        self._own_backend = backend is None
+        self.backend = backend or LocalProcessBackend(max_workers=self.max_workers)
+        self.concurrency = ConcurrencyController(self.max_workers * 2) if adaptive else None
+        cpu = self.concurrency.max_limit if self.concurrency else self.max_workers * 2
+        self.budget = ResourceBudget.default(cpu, resources)
+
+        self.jobs: Dict[str, Job] = {}
+        self._active: List[Job] = []
+        self._future_to_job: Dict[concurrent.futures.Future, Job] = {}
+        self._submissions: "queue.Queue[Job]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._stopping = threading.Event()
+        self._aborting = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Запускает поток планировщика."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._serve, name="JobServer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, graph_data: Union[str, Dict[str, Any]], initial_inputs: Dict[str, Dict[str, Any]] = None,
+               priority: float = 1.0, status_callback=None, status_handler=None) -> str:
+        """
+        Ставит граф в очередь заданий.
+        graph_data: JSON-строка или словарь в формате Graph.load_from_json.
+        status_callback: функция(node_id, status) для узлов этого задания.
+        status_handler: функция(updates) для статусов узлов пачками (см. Executor, параметр status_handler).
+        Returns: идентификатор задания.
+        """
+        if self._stopping.is_set():
+            raise RuntimeError("JobServer is shutting down")
+        if isinstance(graph_data, str):
+            graph_data = json.loads(graph_data)
+
+        job = Job(f"job_{next(self._ids)}", graph_data, initial_inputs, priority, status_callback, status_handler)
+        self.jobs[job.job_id] = job
+        self._submissions.put(job)
+        self.start()
+        return job.job_id
+
+    def wait(self, job_id: str, timeout: float = None) -> Job:
+        """Ожидает завершения задания и возвращает его."""
+        job = self.jobs[job_id]
+        if not job._done.wait(timeout):
+            raise TimeoutError(f"Job {job_id} did not finish in {timeout}s")
+        return job
+
+    def cancel(self, job_id: str):
+        """
+        Отменяет задание: его задачи останавливаются, задание завершается со статусом "cancelled".
+        Остальные задания продолжаются.
+        """
+        job = self.jobs[job_id]
+        job.cancel_requested = True
+        if job.executor is not None:
+            job.executor.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Статистика по заданиям: {job_id: {status, priority, tasks_completed, queue_time, latency}}.
+        """
+        return {
+            job_id: {
+                "status": job.status,
+                "priority": job.priority,
+                "tasks_completed": job.tasks_completed,
+                "queue_time": job.queue_time,
+                "latency": job.latency,
+            }
+            for job_id, job in list(self.jobs.items())
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Останавливает сервер. При wait=True дожидается завершения всех принятых заданий,
+        иначе незавершенные задания отменяются.
+        """
+        self._stopping.set()
+        if not wait:
+            self._aborting.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._own_backend:
+            self.backend.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=exc_type is None)
+
+    def _serve(self):
+        """
+        Основной цикл планировщика.
+        """
+        try:
+            self._serve_loop()
+        finally:
+            # Задания, которые не завершились (остановка сервера или сбой планировщика), не должны ждать вечно
+            for future, job in self._future_to_job.items():
+                job.executor._abandon([future])
+            for job in list(self.jobs.values()):
+                if not job.done:
+                    if job.executor is not None:
+                        job.executor._finish()
+                    job._finish("cancelled")
+
+    def _serve_loop(self):
+        while not self._aborting.is_set():
+            self._accept_submissions(block=not self._future_to_job)
+
+            if self._future_to_job:
+                done, _ = concurrent.futures.wait(self._future_to_job, timeout=0.05,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    job = self._future_to_job.pop(future)
+                    job.running -= 1
+                    job.tasks_completed += 1
+                    if self.concurrency:
+                        self.concurrency.record_completion()
+                    if job in self._active:
+                        self._guarded(job, job.executor._complete_task, future, job.status_callback)
+
+            for job in self._active[:]:
+                self._guarded(job, self._supervise_job, job)
+
+            self._dispatch()
+            self._finish_jobs()
+
+            if self._stopping.is_set() and not self._active and self._submissions.empty():
+                break
+
+    def _supervise_job(self, job: Job):
+        job.executor._supervise(self.backend)
+        if job.executor.status is not None:
+            job.executor.status.pump()
+
+    def _collect_ready(self, job: Job) -> bool:
+        """
+        Берет из очередей задания одну готовую задачу (с ее ресурсами из общего бюджета) в job.ready.
+        Для узла с MAX_BATCH это несколько наборов входов одной задачи-пакета.
+        Returns: False, если у задания нет задачи, которую можно запустить сейчас.
+        """
+        if not job.ready and not job.executor._cancel.is_set():
+            job.ready.extend(job.executor._check_ready_nodes(max_tasks=1))
+        return bool(job.ready)
+
+    def _release_ready(self, job: Job):
+        """Возвращает взятые, но не отправленные наборы входов в очереди исполнителя, а их ресурсы - в бюджет."""
+        while job.ready:
+            node_id, node_inputs = job.ready.pop()
+            job.executor._unclaim(node_id, node_inputs)
+
+    def _guarded(self, job: Job, step, *args):
+        """
+        Выполняет шаг планировщика для задания. Исключение (ошибка исполнителя, бэкенда)
+        завершает только это задание со статусом "error", остальные задания продолжаются.
+        """
+        try:
+            step(*args)
+        except Exception as e:
+            self._fail_job(job, e)
+
+    def _fail_job(self, job: Job, error: Exception):
+        print(f"Job {job.job_id} failed: {error}")
+        futures = [future for future, owner in self._future_to_job.items() if owner is job]
+        for future in futures:
+            del self._future_to_job[future]
+        if job.executor is not None:
+            # Результаты уже выполняющихся задач удаляются по завершении (разделяемая память воркеров)
+            job.executor._abandon(futures)
+        job.ready.clear()
+        job.running = 0
+        if job in self._active:
+            self._active.remove(job)
+        try:
+            job.executor._finish()
+        except Exception:
+            pass
+        job.error = error
+        job._finish("error")
+
+    def _accept_submissions(self, block: bool):
+        """
+        Переносит новые задания из очереди в активные. Ошибки построения графа завершают задание.
+        """
+        while True:
+            try:
+                job = self._submissions.get(timeout=0.05) if block else self._submissions.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+
+            try:
+                graph = Graph(self.node_registry)
+                graph.load_from_json(job.graph_data)
+            except Exception as e:
+                print(f"Job {job.job_id} rejected: {e}")
+                job.error = e
+                job._finish("error")
+                continue
+
+            job.executor = Executor(graph, max_workers=self.max_workers, timeout=self.timeout, backend=self.backend,
+                                    resources=self.budget, node_timeout=self.node_timeout,
+                                    status_handler=job.status_handler)
+            job.executor._start(job.initial_inputs, self.backend)
+            if job.cancel_requested:
+                job.executor.cancel()
+            job.status = "running"
+            self._active.append(job)
+
+    def _pick_job(self, exclude=()) -> Optional[Job]:
+        """
+        Выбирает задание для следующего слота пула: минимальная загрузка на единицу приоритета,
+        при равенстве - задание с большим приоритетом, затем более раннее.
+        exclude: задания, у которых в этом проходе нет задач для запуска.
+        """
+        candidates = [job for job in self._active if job not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda job: (job.running / job.priority, -job.priority, job.submitted_at))
+
+    def _dispatch(self):
+        """
+        Раздает свободные слоты пула готовым задачам заданий. Задача берется из очередей выбранного
+        задания только тогда, когда для нее есть слот, поэтому общий бюджет ресурсов достается
+        заданиям в порядке справедливой доли, а не в порядке опроса.
+        """
+        limit = self.concurrency.update() if self.concurrency else self.max_workers * 2
+        idle: List[Job] = [] # задания без задач, которые можно запустить в этом проходе
+        while len(self._future_to_job) < limit:
+            job = self._pick_job(idle)
+            if job is None:
+                break
+            try:
+                if not self._collect_ready(job):
+                    idle.append(job)
+                    continue
+                # Наборы входов одного узла - одна задача-пакет (Node.MAX_BATCH): ресурсы под них зарезервированы
+                # как под одну задачу
+                node_id = job.ready[0][0]
+                sets = []
+                while job.ready and job.ready[0][0] == node_id:
+                    sets.append(job.ready.popleft()[1])
+                future = job.executor._submit_task(self.backend, node_id, Batch(sets) if len(sets) > 1 else sets[0],
+                                                   job.status_callback)
+            except Exception as e:
+                self._fail_job(job, e)
+                continue
+            self._future_to_job[future] = job
+            job.running += 1
+            if job.started_at is None:
+                job.started_at = time.time()
+
+        for job in self._active:
+            self._release_ready(job)
+        if self.concurrency and len(self._future_to_job) >= limit and len(idle) < len(self._active):
+            # Слоты кончились раньше, чем задачи заданий
+            self.concurrency.note_saturated()
+
+    def _finish_jobs(self):
+        for job in self._active[:]:
+            if job.ready:
+                continue
+            try:
+                outcome = job.executor._check_finished()
+            except Exception as e:
+                self._fail_job(job, e)
+                continue
+            if outcome is not None:
+                job.executor._finish()
+                job.executor.outcome = outcome
+                job._finish(outcome)
+                self._active.remove(job)
+                print(f"Job {job.job_id} {outcome} in {job.latency:.3f}s")
@@ -0,0 +1,150 @@
+import sys
+import time
+import threading
+import contextlib
+from typing import Callable, List, NamedTuple, Optional
+from collections import deque
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+class LogRecord(NamedTuple):
+    """Структурированная запись лога узла."""
+    node_id: str
+    level: int
+    message: str
+    created: float
+
+def level_value(level) -> int:
+    """Преобразует имя уровня ("INFO") или число в числовой уровень."""
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVELS[level.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}")
+
+def format_record(record: LogRecord) -> str:
+    if record.level == LEVELS["INFO"]:
+        return record.message
+    return f"[{LEVEL_NAMES.get(record.level, record.level)}] {record.message}"
+
+def print_records(records: List[LogRecord]):
+    """Обработчик по умолчанию: печатает пачку записей в stdout одной операцией записи."""
+    sys.stdout.write("".join(format_record(record) + "\n" for record in records))
+
+class WorkerLog:
+    """
+    Сборщик логов внутри воркера. Получает вывод потока узла на время его выполнения (см. capture_stdout):
+    print() превращается в записи уровня INFO, Node.log() - в записи заданного уровня.
+    Записи ниже min_level отбрасываются сразу, не доходя до сериализации.
+    """
+    def __init__(self, node_id: str, min_level: int = LEVELS["INFO"]):
+        self.node_id = node_id
+        self.min_level = min_level
+        self.records: List[LogRecord] = []
+        self._partial: List[str] = []
+        self._print_enabled = min_level <= LEVELS["INFO"]
+
+    def log(self, level, message: str):
+        level = level_value(level)
+        if level >= self.min_level:
+            self.records.append(LogRecord(self.node_id, level, str(message), time.time()))
+
+    def write(self, text: str) -> int:
+        if not self._print_enabled or not text:
+            return len(text)
+        if "\n" not in text:
+            self._partial.append(text)
+            return len(text)
+
+        lines = text.split("\n")
+        lines[0] = "".join(self._partial) + lines[0]
+        tail = lines.pop()
+        self._partial = [tail] if tail else []
+        created = time.time()
+        level = LEVELS["INFO"]
+        self.records.extend(LogRecord(self.node_id, level, line, created) for line in lines)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self) -> List[LogRecord]:
+        """Завершает сбор и возвращает записи (включая незавершенную строку)."""
+        if self._partial:
+            self.records.append(LogRecord(self.node_id, LEVELS["INFO"], "".join(self._partial), time.time()))
+            self._partial = []
+        return self.records
+
+class _ThreadStdout:
+    """
+    Замена sys.stdout, которая направляет вывод в WorkerLog текущего потока, а без него - в исходный поток.
+    Устанавливается один раз на процесс: задачи в потоках одного процесса (ThreadPoolExecutor, INLINE-узлы)
+    не подменяют вывод друг друга, как это делал бы contextlib.redirect_stdout.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        log = getattr(self.local, "log", None)
+        return log if log is not None else self.stream
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+_install_lock = threading.Lock()
+
+@contextlib.contextmanager
+def capture_stdout(log: WorkerLog):
+    """Направляет print() текущего потока в log на время блока with."""
+    with _install_lock:
+        proxy = sys.stdout
+        if not isinstance(proxy, _ThreadStdout):
+            proxy = sys.stdout = _ThreadStdout(proxy)
+    previous = getattr(proxy.local, "log", None)
+    proxy.local.log = log
+    try:
+        yield log
+    finally:
+        proxy.local.log = previous
+
+class LogChannel:
+    """
+    Канал логов исполнителя. Записи из завершенных задач складываются в очередь
+    и передаются обработчику пачками: не чаще раза в interval секунд или при
+    накоплении max_batch записей.
+    """
+    def __init__(self, handler: Optional[Callable[[List[LogRecord]], None]] = None,
+                 interval: float = 0.05, max_batch: int = 1000):
+        self.handler = handler or print_records
+        self.interval = interval
+        self.max_batch = max_batch
+        self._queue: deque = deque()
+        self._last_delivery = 0.0
+
+    def publish(self, records: List[LogRecord]):
+        if records:
+            self._queue.extend(records)
+            self.pump()
+
+    def pump(self):
+        """Передает накопленные записи, если подошло время или пачка заполнена."""
+        if self._queue and (len(self._queue) >= self.max_batch or time.time() - self._last_delivery >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """Немедленно передает все накопленные записи."""
+        if not self._queue:
+            return
+        records = list(self._queue)
+        self._queue.clear()
+        self._last_delivery = time.time()
+        self.handler(records)
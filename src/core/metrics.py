@@ -0,0 +1,202 @@
+import bisect
+import threading
+import http.server
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _Metric:
+    """
+    Базовый класс метрики с метками. Значения хранятся по кортежу значений меток
+    в порядке labelnames.
+    """
+    TYPE = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels_text(self, key: Tuple[str, ...], extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class _ScalarMetric(_Metric):
+    """Метрика с одним числовым значением на набор меток."""
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            return [(self.name, self._labels_text(key), value) for key, value in self._values.items()]
+
+class Counter(_ScalarMetric):
+    """Монотонно растущий счетчик."""
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} can only increase")
+        super().inc(amount, **labels)
+
+class Gauge(_ScalarMetric):
+    """Значение, которое может как расти, так и уменьшаться."""
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Гистограмма распределения (например, задержек в секундах)."""
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def value(self, **labels) -> Dict[str, Any]:
+        """Returns: {"count", "sum", "buckets": {le: накопленное число наблюдений}}."""
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return {"count": 0, "sum": 0.0, "buckets": {}}
+        cumulative, total = {}, 0
+        for le, count in zip(self.buckets, state["counts"]):
+            total += count
+            cumulative[le] = total
+        return {"count": state["count"], "sum": state["sum"], "buckets": cumulative}
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        result = []
+        with self._lock:
+            for key, state in self._values.items():
+                total = 0
+                for le, count in zip(self.buckets, state["counts"]):
+                    total += count
+                    result.append((f"{self.name}_bucket", self._labels_text(key, {"le": _format_value(le)}), total))
+                result.append((f"{self.name}_bucket", self._labels_text(key, {"le": "+Inf"}), state["count"]))
+                result.append((f"{self.name}_sum", self._labels_text(key), state["sum"]))
+                result.append((f"{self.name}_count", self._labels_text(key), state["count"]))
+        return result
+
+class MetricsRegistry:
+    """
+    Реестр метрик. Метрики читаются через snapshot() или отдаются в формате
+    Prometheus через render_prometheus() / serve().
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as {metric.TYPE}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Текущие значения всех метрик: {name: {"type", "help", "values": {(label values): value}}}.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        result = {}
+        for metric in metrics:
+            with metric._lock:
+                keys = list(metric._values)
+            values = {key: metric.value(**dict(zip(metric.labelnames, key))) for key in keys}
+            result[metric.name] = {"type": metric.TYPE, "help": metric.help, "values": values}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Текстовый формат экспозиции Prometheus (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+        """
+        Запускает в фоновом потоке HTTP-эндпоинт с метриками в формате Prometheus.
+        Returns: сервер (адрес - server.server_address, остановка - server.shutdown()).
+        """
+        registry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+        return server
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
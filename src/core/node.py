@@ -1,5 +1,18 @@
 from abc import ABC, abstractmethod
+import time
 from typing import Dict, Any, List
+from .resources import validate_resources
+
+class Items(list):
+    """
+    Выход, который передается потребителям поэлементно: каждый элемент попадает
+    в очередь отдельно, и потребитель обрабатывает элементы по мере их поступления.
+    """
+
+class Batch(list):
+    """
+    Наборы входов нескольких вызовов узла, которые исполнитель отправляет одной задачей (см. Node.MAX_BATCH).
+    """
 
 class Node(ABC):
     """
@@ -13,10 +26,65 @@ class Node(ABC):
 
     INPUT_STRATEGY = "ALL"
 
+    # Выполнять узел в главном процессе, без отправки в бэкенд. Подходит для дешевых узлов
+    # с крупным состоянием (например, потоковая склейка), которое иначе пересылалось бы с каждой задачей.
+    INLINE = False
+
+    # Вход с путем к файлу, который исполнитель читает заранее (см. core/prefetch.py)
+    PREFETCH_INPUT = None
+
+    # Сколько задач узла может выполняться одновременно (None - без ограничения).
+    # Узлам с состоянием, которое меняется между вызовами, нужен 1.
+    CONCURRENCY_LEVEL = None
+
+    # Требования задачи к ресурсам: {"cpu", "memory_mb", "memory_per_mpx", "io"} (см. core/resources.py).
+    # Планировщик запускает задачи, пока они помещаются в бюджет исполнителя.
+    RESOURCES: Dict[str, Any] = {}
+
+    # Предельное время одной задачи узла в секундах (None - по умолчанию исполнителя, Executor(node_timeout=...)).
+    # Узел может проверять его сам через check_deadline(); после срока с запасом исполнитель останавливает задачу.
+    TIMEOUT = None
+
+    # Чистый узел: результат зависит только от параметров и входов (без побочных эффектов и состояния),
+    # исполнитель может взять его из постоянного кэша (Executor(cache=ArtifactCache(...))).
+    DETERMINISTIC = False
+
+    # Узел с побочными эффектами (запись файлов), который не выполняется в режиме предпросмотра.
+    PREVIEW_SKIP = False
+
+    # Дешевый узел без состояния с одним входом: исполнитель может выполнить его в задаче узла-источника
+    # этого входа (слияние), без отдельной задачи и пересылки промежуточного значения (Executor(fusion=True)).
+    FUSABLE = False
+
+    # execute() можно вызывать одновременно из нескольких потоков на одном экземпляре. Если бэкенд выполняет
+    # задачи в потоках главного процесса (ThreadPoolExecutor), задачи узла с False выполняются по одной.
+    THREAD_SAFE = True
+
+    # Ожидаемое время одной задачи в секундах (None - неизвестно). Когда слотов не хватает на все готовые узлы,
+    # планировщик сначала запускает более долгие задачи, чтобы короткие не задерживали окончание запуска.
+    COST = None
+
+    # Сколько готовых наборов входов исполнитель может отправить одной задачей (execute_batch).
+    # Пакет экономит на отправке задач и сериализации, когда в очередях узла накопилось много значений.
+    MAX_BATCH = 1
+
+    # Наибольшая сторона изображений в режиме предпросмотра (Executor(preview=...)), иначе None.
+    # Узлы-источники выдают уменьшенные копии, остальные узлы работают с ними как обычно.
+    preview_size = None
+
+    # Входы, которыми узел владеет единолично во время execute() (заполняет исполнитель).
+    # Остальные входы могут быть у других потребителей и не должны изменяться на месте.
+    inputs_owned: frozenset = frozenset()
+    # Может ли узел вернуть выход в разделяемой памяти (например, SharedImageView) - заполняет исполнитель,
+    # если воркеры и главный процесс на одной машине.
+    shared_memory: bool = False
+
     def __init__(self, node_id: str, params: Dict[str, Any] = None):
         self.node_id = node_id
         self.params = params or {}
-        self.concurrency_level = 1  
+        self.concurrency_level = self.CONCURRENCY_LEVEL
+        self.resources = validate_resources(self.RESOURCES)
+        self.timeout = self.TIMEOUT
         
         self._validate_params()
 
@@ -44,6 +112,42 @@ class Node(ABC):
         """
         pass
 
+    def execute_batch(self, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Выполняет узел для нескольких наборов входов (MAX_BATCH > 1). По умолчанию вызывает execute
+        для каждого набора; узел может переопределить метод векторизованной обработкой.
+
+        Returns:
+            List[Dict[str, Any]]: выходы для каждого набора в том же порядке.
+        """
+        return [self.execute(**inputs) for inputs in inputs_list]
+
+    def owns_input(self, port: str) -> bool:
+        """
+        True, если значение входа port больше никому не доступно и его можно изменять на месте.
+        """
+        return port in self.inputs_owned
+
+    def check_deadline(self):
+        """
+        Кооперативная проверка срока задачи: долгие циклы узла вызывают ее, чтобы завершиться
+        до принудительной остановки. Raises: TimeoutError, если срок истек. Вне исполнителя ничего не делает.
+        """
+        deadline = getattr(self, "_deadline", None)
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"Node {self.node_id} exceeded its timeout")
+
+    def log(self, message: str, level: str = "INFO"):
+        """
+        Пишет структурированную запись в лог узла. Вне исполнителя просто печатает сообщение.
+        level: "DEBUG" | "INFO" | "WARNING" | "ERROR"
+        """
+        sink = getattr(self, "_log_sink", None)
+        if sink is None:
+            print(message)
+        else:
+            sink.log(level, message)
+
     def __repr__(self):
         return f"<{self.__class__.__name__} id={self.node_id}>"
 
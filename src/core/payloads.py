@@ -0,0 +1,169 @@
+from typing import Any, Dict, List, Optional, Tuple
+from .shm import create_block, attach_block, unlink_block
+from .serialization import Frame, encode, decode
+
+def payload_nbytes(value: Any) -> int:
+    """
+    Оценивает объем данных значения без сериализации.
+    Изображения (PIL) и массивы (numpy) распознаются по атрибутам, поэтому модуль
+    не импортирует тяжелые библиотеки.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(payload_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(payload_nbytes(item) for item in value.values())
+
+    nbytes = getattr(value, "nbytes", None) # numpy.ndarray
+    if isinstance(nbytes, int):
+        return nbytes
+
+    if hasattr(value, "getbands") and hasattr(value, "size"): # PIL.Image
+        width, height = value.size
+        return width * height * len(value.getbands())
+
+    return 0
+
+class SharedValue:
+    """
+    Значение, сериализованное один раз для нескольких потребителей.
+    Данные лежат в блоке разделяемой памяти, поэтому при отправке задачи в воркер
+    сериализуется только имя блока, а не само значение.
+    Блок принадлежит создавшему процессу и удаляется через release(); если блок создан
+    в воркере и передан в главный процесс, его забирают через consume().
+    """
+    def __init__(self, value: Any, compression: Optional[str] = None):
+        self._attach(encode(value, compression))
+
+    @classmethod
+    def from_frame(cls, frame: Frame) -> "SharedValue":
+        """Создает значение из уже сериализованного кадра (без повторной сериализации)."""
+        shared = cls.__new__(cls)
+        shared._attach(frame)
+        return shared
+
+    def _attach(self, frame: Frame):
+        self.nbytes = frame.nbytes
+        self._block = create_block(self.nbytes)
+        frame.write_to(self._block.buf)
+        self.name = self._block.name
+
+    def __getstate__(self):
+        return {"name": self.name, "nbytes": self.nbytes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._block = None
+
+    def load(self) -> Any:
+        """Десериализует значение (в воркере - подключаясь к блоку по имени)."""
+        block = self._block or attach_block(self.name)
+        try:
+            with block.buf[:self.nbytes] as view:
+                return decode(view, copy_buffers=True)
+        finally:
+            if block is not self._block:
+                block.close()
+
+    def release(self):
+        if self._block is not None:
+            unlink_block(self._block)
+            self._block = None
+
+    def consume(self) -> Any:
+        """Десериализует значение и удаляет блок (для блоков, переданных из воркера)."""
+        if self._block is None:
+            self._block = attach_block(self.name)
+        try:
+            return self.load()
+        finally:
+            self.release()
+
+    def __repr__(self):
+        return f"<SharedValue {self.name} {self.nbytes}B>"
+
+class SharedBlock:
+    """Блок, созданный в другом процессе (воркере): владелец только удаляет его по имени."""
+    def __init__(self, name: str):
+        self.name = name
+
+    def release(self):
+        try:
+            unlink_block(attach_block(self.name))
+        except FileNotFoundError:
+            pass
+
+class SharedImageView:
+    """
+    Полоса строк изображения, пиксели которого лежат в блоке разделяемой памяти.
+    Передача представления в воркер сериализует только имя блока и диапазон строк;
+    изображение создается при материализации (load) копированием только своих строк.
+    """
+    def __init__(self, name: str, mode: str, width: int, rows: Tuple[int, int], row_bytes: int,
+                 info: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.mode = mode
+        self.width = width
+        self.rows = rows
+        self.row_bytes = row_bytes
+        self.info = info or {}
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.rows[1] - self.rows[0]
+
+    def load(self) -> Any:
+        from PIL import Image
+        top, bottom = self.rows
+        block = attach_block(self.name)
+        try:
+            with block.buf[top * self.row_bytes:bottom * self.row_bytes] as view:
+                img = Image.frombytes(self.mode, self.size, view)
+        finally:
+            block.close()
+        img.info.update(self.info)
+        return img
+
+    def __repr__(self):
+        return f"<SharedImageView {self.name} {self.mode} rows={self.rows}>"
+
+def share_image_rows(img: Any, rows: List[Tuple[int, int]], infos: Optional[List[dict]] = None) -> Optional[List[SharedImageView]]:
+    """
+    Копирует пиксели изображения в блок разделяемой памяти один раз и возвращает
+    представления полос строк rows. Блок удаляет исполнитель, когда полосы обработаны.
+    Returns: None, если строки изображения нельзя адресовать побайтно (режимы "1" и с палитрой).
+    """
+    if img.mode in ("1", "P", "PA"):
+        return None
+    width, height = img.size
+    data = img.tobytes()
+    if height == 0 or len(data) % height:
+        return None
+    block = create_block(len(data))
+    block.buf[:len(data)] = data
+    name = block.name
+    block.close()
+    row_bytes = len(data) // height
+    infos = infos or [None] * len(rows)
+    return [SharedImageView(name, img.mode, width, row_range, row_bytes, info) for row_range, info in zip(rows, infos)]
+
+SHARED_TYPES = (SharedValue, SharedImageView)
+
+def shared_handles(value: Any) -> List[Any]:
+    """Разделяемые значения внутри значения (на верхнем уровне и в списках)."""
+    if isinstance(value, SHARED_TYPES):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, SHARED_TYPES)]
+    return []
+
+def materialize(value: Any) -> Any:
+    """Возвращает обычное значение вместо разделяемого представления (в том числе внутри списков)."""
+    if isinstance(value, SHARED_TYPES):
+        return value.load()
+    if isinstance(value, list) and any(isinstance(item, SHARED_TYPES) for item in value):
+        return type(value)(materialize(item) for item in value)
+    return value
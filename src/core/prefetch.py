@@ -0,0 +1,90 @@
+import os
+import concurrent.futures
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+class PrefetchedPath(str):
+    """
+    Путь к файлу. Если содержимое прочитано заранее, оно доступно в data (bytearray),
+    и узлу не нужно читать файл самому.
+    """
+    data: Optional[bytearray] = None
+
+def read_file(path: str) -> bytearray:
+    """Читает файл целиком, сообщая ядру о последовательном чтении (posix_fadvise, где доступно)."""
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        data = bytearray(os.fstat(fd).st_size)
+        f.readinto(data)
+    return data
+
+class PrefetchReader:
+    """
+    Опережающее чтение файлов пулом потоков ввода-вывода.
+    Одновременно читается или хранится в памяти не больше depth файлов; остальные
+    запросы ждут в очереди. Используется из одного потока (цикла исполнителя).
+    """
+    def __init__(self, depth: int = 8, threads: int = 4):
+        if depth < 1:
+            raise ValueError("Prefetch depth must be at least 1")
+        self.depth = depth
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads, thread_name_prefix="Prefetch")
+        self._pending: OrderedDict = OrderedDict() # id(handle) -> handle, в порядке запросов
+        self._active: Dict[int, concurrent.futures.Future] = {} # id(handle) -> чтение
+        self.hits = 0
+        self.misses = 0
+
+    def request(self, path: str) -> PrefetchedPath:
+        """Ставит файл в очередь чтения. Returns: дескриптор, который позже передается в take()."""
+        handle = PrefetchedPath(path)
+        self._pending[id(handle)] = handle
+        self._fill()
+        return handle
+
+    def ready(self, handle: PrefetchedPath) -> bool:
+        """
+        True, если take() не будет ждать: чтение завершено или дескриптор не ставился в очередь.
+        Исполнитель отправляет задачу только после этого, чтобы медленное чтение не останавливало планировщик.
+        """
+        future = self._active.get(id(handle))
+        if future is not None:
+            return future.done()
+        return id(handle) not in self._pending
+
+    @property
+    def reads(self) -> List[concurrent.futures.Future]:
+        """Чтения, которые еще выполняются."""
+        return [future for future in self._active.values() if not future.done()]
+
+    def take(self, handle: PrefetchedPath) -> PrefetchedPath:
+        """
+        Забирает результат чтения. Если чтение уже идет, ждет его (см. ready()); если не начиналось
+        или завершилось ошибкой, возвращает путь без данных (узел прочитает файл сам).
+        """
+        future = self._active.pop(id(handle), None)
+        result = PrefetchedPath(handle)
+        if future is None:
+            self._pending.pop(id(handle), None)
+            self.misses += 1
+        else:
+            try:
+                result.data = future.result()
+                self.hits += 1
+            except OSError:
+                self.misses += 1
+        self._fill()
+        return result
+
+    def _fill(self):
+        while self._pending and len(self._active) < self.depth:
+            _, handle = self._pending.popitem(last=False)
+            self._active[id(handle)] = self._pool.submit(read_file, str(handle))
+
+    def shutdown(self):
+        self._pending.clear()
+        for future in self._active.values():
+            future.cancel()
+        self._active.clear()
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,124 @@
+import importlib
+import importlib.metadata
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Type
+from .node import Node
+
+class NodeSpec:
+    """
+    Описание типа узла, доступное без импорта реализации: порты, параметры и путь к классу "module:Class".
+    Атрибуты называются так же, как у класса узла, поэтому редактор может работать со спецификацией вместо класса.
+    """
+    def __init__(self, name: str, target: str, input_types: Dict[str, Any], output_types: Dict[str, Any],
+                 parameters: Dict[str, Any]):
+        if ":" not in target:
+            raise ValueError(f"Node {name}: target must look like 'module:Class', got {target!r}")
+        self.name = name
+        self.target = target
+        self.INPUT_TYPES = dict(input_types)
+        self.OUTPUT_TYPES = dict(output_types)
+        self.PARAMETERS = dict(parameters)
+
+    @classmethod
+    def from_class(cls, name: str, node_class: Type[Node]) -> "NodeSpec":
+        return cls(name, f"{node_class.__module__}:{node_class.__qualname__}",
+                   node_class.INPUT_TYPES, node_class.OUTPUT_TYPES, node_class.PARAMETERS)
+
+    def check(self, node_class: Type[Node]):
+        """Проверяет, что загруженный класс соответствует объявленному описанию."""
+        for attribute in ("INPUT_TYPES", "OUTPUT_TYPES", "PARAMETERS"):
+            if getattr(node_class, attribute) != getattr(self, attribute):
+                raise TypeError(f"Node {self.name}: {attribute} of {self.target} differs from its registration")
+
+    def __repr__(self):
+        return f"<NodeSpec {self.name} -> {self.target}>"
+
+class NodeRegistry(Mapping):
+    """
+    Реестр типов узлов с ленивой загрузкой (как entry points): для каждого типа хранится описание (NodeSpec),
+    а модуль с реализацией импортируется при первом обращении к классу - обычно при построении Graph перед запуском.
+    Редактору для библиотеки узлов, портов и параметров достаточно spec() - тяжелые зависимости
+    реализаций (numpy, PIL, ...) при этом не загружаются.
+
+    Реестр - отображение {тип: класс} и передается в Graph, IncrementalSession и JobServer вместо словаря.
+
+    Внешние пакеты узлов (плагины) подключаются через load_plugin()/load_entry_points(): модуль плагина
+    объявляет функцию register(registry), которая добавляет свои узлы через add_lazy() или add().
+    Характеристики производительности (DETERMINISTIC, FUSABLE, THREAD_SAFE, COST) задаются атрибутами класса узла.
+
+    Example:
+        registry = NodeRegistry()
+        registry.add_lazy("Blur", "my_nodes.blur:Blur", inputs={"image": "Image"}, outputs={"image": "Image"},
+                          parameters={"radius": float})
+        registry.spec("Blur").PARAMETERS   # без импорта my_nodes.blur
+        registry["Blur"]                   # импорт и проверка описания
+    """
+    def __init__(self, classes: Optional[Dict[str, Type[Node]]] = None):
+        self._specs: Dict[str, NodeSpec] = {}
+        self._classes: Dict[str, Type[Node]] = {}
+        self.plugins: List[str] = [] # загруженные модули плагинов
+        for name, node_class in (classes or {}).items():
+            self.add(node_class, name)
+
+    def add(self, node_class: Type[Node], name: Optional[str] = None):
+        """Регистрирует уже импортированный класс."""
+        name = name or node_class.__name__
+        self._register(NodeSpec.from_class(name, node_class))
+        self._classes[name] = node_class
+
+    def add_lazy(self, name: str, target: str, inputs: Dict[str, Any], outputs: Dict[str, Any],
+                 parameters: Dict[str, Any]):
+        """Регистрирует класс по пути "module:Class"; модуль импортируется при первом обращении."""
+        self._register(NodeSpec(name, target, inputs, outputs, parameters))
+
+    def _register(self, spec: NodeSpec):
+        if spec.name in self._specs:
+            raise ValueError(f"Node type {spec.name} is already registered ({self._specs[spec.name].target})")
+        self._specs[spec.name] = spec
+
+    def load_plugin(self, module_name: str):
+        """
+        Подключает пакет узлов: импортирует модуль и вызывает его register(registry).
+        Повторная загрузка того же модуля ничего не делает.
+        """
+        if module_name in self.plugins:
+            return
+        module = importlib.import_module(module_name)
+        register = getattr(module, "register", None)
+        if not callable(register):
+            raise TypeError(f"Plugin {module_name} must define register(registry)")
+        register(self)
+        self.plugins.append(module_name)
+
+    def load_entry_points(self, group: str = "dataflow.nodes"):
+        """
+        Подключает плагины установленных пакетов, объявленные в entry points группы group:
+            [project.entry-points."dataflow.nodes"]
+            my_nodes = "my_nodes"
+        """
+        for entry_point in importlib.metadata.entry_points(group=group):
+            self.load_plugin(entry_point.module)
+
+    def spec(self, name: str) -> NodeSpec:
+        return self._specs[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._classes
+
+    def __getitem__(self, name: str) -> Type[Node]:
+        node_class = self._classes.get(name)
+        if node_class is None:
+            spec = self._specs[name]
+            module_name, _, class_name = spec.target.partition(":")
+            node_class = getattr(importlib.import_module(module_name), class_name)
+            spec.check(node_class)
+            self._classes[name] = node_class
+        return node_class
+
+    def __contains__(self, name) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
@@ -0,0 +1,420 @@
+import os
+import hmac
+import uuid
+import pickle
+import hashlib
+import socket
+import struct
+import argparse
+import itertools
+import threading
+import multiprocessing
+import concurrent.futures
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+from collections import defaultdict
+from .backends import ExecutionBackend
+from .payloads import payload_nbytes
+
+# Кадр протокола: длина тела и идентификатор запроса, затем pickle-тело
+_HEADER = struct.Struct("!QQ")
+# Длина случайного вызова при взаимной аутентификации (HMAC-SHA256 от общего ключа)
+_NONCE_SIZE = 32
+_HANDSHAKE_TIMEOUT = 10.0
+# Переменная окружения с общим ключом воркеров и клиентов
+AUTHKEY_ENV = "DATAFLOW_AUTHKEY"
+
+Address = Tuple[str, int]
+
+class RemoteRef:
+    """
+    Ссылка на значение, оставленное в хранилище удаленного воркера.
+    Большие выходы узлов не возвращаются в главный процесс: по сети передается только ссылка,
+    а задачи, которые их потребляют, по возможности отправляются на тот же воркер.
+    """
+    __slots__ = ("address", "key", "nbytes")
+
+    def __init__(self, address: Address, key: str, nbytes: int):
+        self.address = tuple(address)
+        self.key = key
+        self.nbytes = nbytes
+
+    def __repr__(self):
+        return f"<RemoteRef {self.address[0]}:{self.address[1]}/{self.key} {self.nbytes}B>"
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += count
+    return buffer
+
+def _send_frame(sock: socket.socket, request_id: int, message: Any):
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(body), request_id))
+    sock.sendall(body)
+
+def _recv_frame(sock: socket.socket) -> Tuple[int, bytearray]:
+    size, request_id = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return request_id, _recv_exact(sock, size)
+
+def default_authkey() -> bytes:
+    """
+    Общий ключ по умолчанию: переменная окружения DATAFLOW_AUTHKEY, иначе ключ текущего процесса
+    multiprocessing (его наследуют воркеры из spawn_local_workers).
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    return key.encode() if key else bytes(multiprocessing.current_process().authkey)
+
+def _digest(authkey: bytes, nonce) -> bytes:
+    return hmac.new(authkey, bytes(nonce), hashlib.sha256).digest()
+
+def _authenticate(sock: socket.socket, authkey: bytes, server: bool):
+    """
+    Взаимная аутентификация соединения до обмена pickle-кадрами: каждая сторона доказывает
+    знание общего ключа ответом HMAC на случайный вызов другой стороны.
+    Raises: multiprocessing.AuthenticationError при неверном ключе.
+    """
+    sock.settimeout(_HANDSHAKE_TIMEOUT)
+    if server:
+        nonce = os.urandom(_NONCE_SIZE)
+        sock.sendall(nonce)
+        reply = _recv_exact(sock, 2 * _NONCE_SIZE)
+        if not hmac.compare_digest(bytes(reply[:_NONCE_SIZE]), _digest(authkey, nonce)):
+            raise multiprocessing.AuthenticationError("Client failed to authenticate")
+        sock.sendall(_digest(authkey, reply[_NONCE_SIZE:]))
+    else:
+        challenge = _recv_exact(sock, _NONCE_SIZE)
+        nonce = os.urandom(_NONCE_SIZE)
+        sock.sendall(_digest(authkey, challenge) + nonce)
+        if not hmac.compare_digest(bytes(_recv_exact(sock, _NONCE_SIZE)), _digest(authkey, nonce)):
+            raise multiprocessing.AuthenticationError("Worker failed to authenticate")
+    sock.settimeout(None)
+
+def _walk(value: Any, func, depth: int = 3) -> Any:
+    """
+    Применяет func к элементам контейнеров (tuple, list, dict) на глубину depth.
+    Подклассы list (например, Items) сохраняют свой тип.
+    """
+    if depth > 0:
+        if isinstance(value, tuple):
+            return tuple(_walk(item, func, depth - 1) for item in value)
+        if isinstance(value, list):
+            return type(value)(_walk(item, func, depth - 1) for item in value)
+        if isinstance(value, dict):
+            return {key: _walk(item, func, depth - 1) for key, item in value.items()}
+    return func(value)
+
+def _find_refs(value: Any) -> List[RemoteRef]:
+    refs = []
+    def collect(item):
+        if isinstance(item, RemoteRef):
+            refs.append(item)
+        return item
+    _walk(value, collect)
+    return refs
+
+class WorkerServer:
+    """
+    Удаленный воркер: принимает задачи по TCP и выполняет их по одной.
+
+    Задача - это вызов fn(*args, **kwargs) (например, _execute_node_wrapper). Входные
+    RemoteRef разрешаются из локального хранилища или запрашиваются у соседнего воркера.
+    Выходы размером от inline_bytes остаются в хранилище, клиенту возвращается RemoteRef.
+    Значения принадлежат соединению клиента и удаляются при его закрытии или по запросу release
+    (исполнитель отправляет его, когда значение обработали все потребители).
+
+    Воркер выполняет присланный код (pickle), поэтому принимает только соединения, прошедшие
+    аутентификацию общим ключом authkey (по умолчанию default_authkey()). Ключ защищает от посторонних
+    клиентов, но не шифрует трафик: в недоверенной сети воркеры нужно закрывать VPN или туннелем.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, inline_bytes: int = 256 * 1024,
+                 authkey: Optional[bytes] = None):
+        self.authkey = authkey or default_authkey()
+        self._socket = socket.create_server((host, port))
+        self.address: Address = self._socket.getsockname()[:2]
+        self.inline_bytes = inline_bytes
+        self._store: Dict[str, Any] = {}
+        self._store_lock = threading.Lock()
+        self._exec_lock = threading.Lock()
+        self._peers: Dict[Address, "_Connection"] = {}
+        self._peers_lock = threading.Lock()
+
+    def serve_forever(self):
+        while True:
+            conn, _ = self._socket.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        owned: Set[str] = set()
+        try:
+            _authenticate(conn, self.authkey, server=True)
+        except (multiprocessing.AuthenticationError, ConnectionError, OSError) as e:
+            print(f"Rejected connection: {e}")
+            conn.close()
+            return
+        try:
+            while True:
+                request_id, body = _recv_frame(conn)
+                try:
+                    op, payload = pickle.loads(body)
+                    response = (True, self._dispatch(op, payload, owned))
+                except Exception as e:
+                    response = (False, _portable_exception(e))
+                _send_frame(conn, request_id, response)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._drop(owned)
+            conn.close()
+
+    def _dispatch(self, op: str, payload: Any, owned: Set[str]) -> Any:
+        if op == "run":
+            fn, args, kwargs = payload
+            args, kwargs = _walk((args, kwargs), self._resolve_ref, depth=4)
+            with self._exec_lock:
+                result = fn(*args, **kwargs)
+            return _walk(result, lambda value: self._retain(value, owned))
+        if op == "fetch":
+            with self._store_lock:
+                return self._store[payload]
+        if op == "release":
+            # payload: ключи значений соединения (None - все значения)
+            if payload is None:
+                self._drop(owned)
+            else:
+                keys = owned.intersection(payload)
+                owned.difference_update(keys)
+                self._drop(keys)
+            return None
+        raise ValueError(f"Unknown operation: {op}")
+
+    def _retain(self, value: Any, owned: Set[str]) -> Any:
+        nbytes = payload_nbytes(value)
+        if nbytes < self.inline_bytes:
+            return value
+        key = uuid.uuid4().hex
+        with self._store_lock:
+            self._store[key] = value
+        owned.add(key)
+        return RemoteRef(self.address, key, nbytes)
+
+    def _resolve_ref(self, value: Any) -> Any:
+        if not isinstance(value, RemoteRef):
+            return value
+        if value.address == self.address:
+            with self._store_lock:
+                return self._store[value.key]
+        with self._peers_lock:
+            peer = self._peers.get(value.address)
+            if peer is None:
+                peer = self._peers[value.address] = _Connection(value.address, self.authkey)
+        return peer.request("fetch", value.key).result()
+
+    def _drop(self, keys: Set[str]):
+        with self._store_lock:
+            for key in keys:
+                self._store.pop(key, None)
+        keys.clear()
+
+def _portable_exception(exc: Exception) -> Exception:
+    """Исключение, которое гарантированно переживет pickle."""
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+class _Connection:
+    """
+    Клиентское соединение с воркером: запросы отправляются конвейером, ответы
+    разбираются отдельным потоком и сопоставляются с Future по идентификатору.
+    """
+    def __init__(self, address: Address, authkey: bytes):
+        self.address = tuple(address)
+        self._socket = socket.create_connection(self.address)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            _authenticate(self._socket, authkey, server=False)
+        except Exception:
+            self._socket.close()
+            raise
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, concurrent.futures.Future] = {}
+        self._ids = itertools.count(1)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._pending)
+
+    def request(self, op: str, payload: Any) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel() # воркер начинает задачу сразу после получения; отменить ее нельзя
+        with self._send_lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                _send_frame(self._socket, request_id, (op, payload))
+            except Exception as e:
+                self._pending.pop(request_id, None)
+                future.set_exception(e)
+        return future
+
+    def _read_loop(self):
+        try:
+            while True:
+                request_id, body = _recv_frame(self._socket)
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                try:
+                    ok, value = pickle.loads(body)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except (ConnectionError, OSError) as e:
+            error = ConnectionError(f"Lost connection to worker {self.address[0]}:{self.address[1]}: {e}")
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    def close(self):
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+class RemoteBackend(ExecutionBackend):
+    """
+    Бэкенд, распределяющий задачи по удаленным воркерам (WorkerServer) по TCP.
+
+    Размещение учитывает локальность: задача отправляется на воркер, который хранит
+    больше всего байт ее входных RemoteRef, если у него не исчерпан лимит задач в полете.
+    Иначе выбирается наименее загруженный воркер.
+    authkey: общий ключ воркеров (по умолчанию default_authkey()).
+    """
+    def __init__(self, addresses: List[Union[str, Address]], max_inflight_per_worker: int = 2,
+                 authkey: Optional[bytes] = None):
+        if not addresses:
+            raise ValueError("RemoteBackend requires at least one worker address")
+        self.max_inflight_per_worker = max_inflight_per_worker
+        self._workers: Dict[Address, _Connection] = {}
+        for address in addresses:
+            address = _parse_address(address)
+            self._workers[address] = _Connection(address, authkey or default_authkey())
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn, /, *args, **kwargs) -> concurrent.futures.Future:
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        with self._lock:
+            worker = self._place(_find_refs((args, kwargs)))
+            return worker.request("run", (fn, args, kwargs))
+
+    def _place(self, refs: List[RemoteRef]) -> _Connection:
+        local_bytes: Dict[Address, int] = defaultdict(int)
+        for ref in refs:
+            local_bytes[ref.address] += ref.nbytes
+
+        available = [w for w in self._workers.values() if w.inflight < self.max_inflight_per_worker]
+        candidates = available or list(self._workers.values())
+        return max(candidates, key=lambda w: (local_bytes.get(w.address, 0), -w.inflight))
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Загружает значения RemoteRef (в том числе внутри списков и словарей) в главный процесс.
+        """
+        def fetch(item):
+            if not isinstance(item, RemoteRef):
+                return item
+            return self._workers[item.address].request("fetch", item.key).result()
+        return _walk(value, fetch)
+
+    def references(self, value: Any) -> List[RemoteRef]:
+        return _find_refs(value)
+
+    def release(self, refs: List[RemoteRef]):
+        """
+        Освобождает значения воркеров по ссылкам, которые исполнителю больше не нужны.
+        Ответ не ждется: запросы соединения обрабатываются по порядку, поэтому задачи, отправленные раньше, значения уже получили.
+        """
+        keys: Dict[Address, List[str]] = defaultdict(list)
+        for ref in refs:
+            keys[ref.address].append(ref.key)
+        for address, worker_keys in keys.items():
+            worker = self._workers.get(address)
+            if worker is not None and not self._shutdown:
+                worker.request("release", worker_keys)
+
+    def release_all(self):
+        """
+        Освобождает все значения, которые воркеры хранят для этого бэкенда.
+        Полезно между запусками, если бэкенд общий и живет долго.
+        """
+        futures = [worker.request("release", None) for worker in self._workers.values()]
+        concurrent.futures.wait(futures)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._shutdown = True
+        for worker in self._workers.values():
+            worker.close()
+
+def _parse_address(address: Union[str, Address]) -> Address:
+    if isinstance(address, str):
+        host, _, port = address.rpartition(":")
+        return host, int(port)
+    return tuple(address)
+
+def serve_worker(host: str = "127.0.0.1", port: int = 0, inline_bytes: int = 256 * 1024, ready=None,
+                 authkey: Optional[bytes] = None):
+    """
+    Запускает воркер в текущем процессе. ready: Connection, в которую отправляется фактический адрес.
+    """
+    server = WorkerServer(host, port, inline_bytes, authkey)
+    if ready is not None:
+        ready.send(server.address)
+        ready.close()
+    print(f"Worker listening on {server.address[0]}:{server.address[1]}")
+    server.serve_forever()
+
+def spawn_local_workers(count: int, inline_bytes: int = 256 * 1024,
+                        authkey: Optional[bytes] = None) -> Tuple[List[Address], List[multiprocessing.Process]]:
+    """
+    Запускает count воркеров на localhost в отдельных процессах (для разработки и тестов).
+    Returns: (адреса воркеров, процессы). Процессы нужно завершить через terminate().
+    """
+    authkey = authkey or default_authkey()
+    addresses, processes = [], []
+    for _ in range(count):
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=serve_worker, args=("127.0.0.1", 0, inline_bytes, child_conn, authkey),
+                                          daemon=True)
+        process.start()
+        child_conn.close()
+        addresses.append(parent_conn.recv())
+        processes.append(process)
+    return addresses, processes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remote worker for the dataflow executor")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--inline-bytes", type=int, default=256 * 1024,
+                        help="outputs of at least this size stay on the worker")
+    args = parser.parse_args()
+    if not os.environ.get(AUTHKEY_ENV):
+        parser.error(f"set the shared secret in the {AUTHKEY_ENV} environment variable (same value on clients)")
+    serve_worker(args.host, args.port, args.inline_bytes)
@@ -0,0 +1,106 @@
+from typing import Any, Dict, Optional
+from .payloads import SharedImageView
+from .concurrency import memory_info
+
+# Требования задачи узла к ресурсам (Node.RESOURCES, переопределяются в JSON графа ключом "resources"):
+#   cpu            - занимаемые CPU-слоты;
+#   memory_mb      - постоянная оценка памяти задачи, МБ;
+#   memory_per_mpx - память на мегапиксель входных изображений, МБ (промежуточные копии, результат);
+#   io             - задача монопольно занимает диск (одновременно выполняется не больше budget["io"] таких задач).
+DEFAULT_RESOURCES: Dict[str, Any] = {"cpu": 1, "memory_mb": 0, "memory_per_mpx": 0, "io": False}
+
+def validate_resources(resources: Dict[str, Any]) -> Dict[str, Any]:
+    """Проверяет ключи и значения требований. Returns: требования, дополненные значениями по умолчанию."""
+    unknown = set(resources) - set(DEFAULT_RESOURCES)
+    if unknown:
+        raise ValueError(f"Unknown resources: {sorted(unknown)}. Expected some of {sorted(DEFAULT_RESOURCES)}")
+    merged = dict(DEFAULT_RESOURCES, **resources)
+    for key in ("cpu", "memory_mb", "memory_per_mpx"):
+        if not isinstance(merged[key], (int, float)) or merged[key] < 0:
+            raise ValueError(f"Resource '{key}' must be a non-negative number, got {merged[key]!r}")
+    merged["io"] = bool(merged["io"])
+    return merged
+
+def megapixels(value: Any) -> float:
+    """
+    Оценивает размер изображений в значении (в мегапикселях) без загрузки данных.
+    Для SharedValue и RemoteRef размер известен только в байтах и пересчитывается как RGB.
+    """
+    if isinstance(value, (list, tuple)):
+        return sum(megapixels(item) for item in value)
+    if isinstance(value, dict):
+        return sum(megapixels(item) for item in value.values())
+    if isinstance(value, SharedImageView):
+        width, height = value.size
+        return width * height / 1e6
+    if hasattr(value, "getbands") and hasattr(value, "size"): # PIL.Image
+        width, height = value.size
+        return width * height / 1e6
+    shape = getattr(value, "shape", None) # numpy.ndarray
+    if isinstance(shape, tuple) and len(shape) >= 2:
+        return shape[0] * shape[1] / 1e6
+    nbytes = getattr(value, "nbytes", None) # SharedValue, RemoteRef
+    if isinstance(nbytes, int):
+        return nbytes / 3e6
+    return 0.0
+
+def task_demand(resources: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, float]:
+    """Потребность задачи с данными входами: {"cpu": слоты, "memory": МБ, "io": 0 | 1}."""
+    memory = resources["memory_mb"]
+    if resources["memory_per_mpx"]:
+        memory += resources["memory_per_mpx"] * megapixels(inputs)
+    return {"cpu": resources["cpu"], "memory": memory, "io": 1 if resources["io"] else 0}
+
+def default_memory_budget(fraction: float = 0.75) -> Optional[float]:
+    """Доля доступной сейчас памяти, МБ (None - если объем памяти узнать нельзя)."""
+    info = memory_info()
+    return info[0] * fraction / 2**20 if info else None
+
+class ResourceBudget:
+    """
+    Бюджет ресурсов, против которого планировщик упаковывает задачи.
+    capacity: {"cpu": слоты, "memory": МБ, "io": монопольных задач}; None или отсутствие ключа - без ограничения.
+    Задача, которая не помещается даже в пустой бюджет, запускается, когда других задач нет,
+    иначе она никогда бы не выполнилась.
+    Один бюджет может быть общим для нескольких исполнителей (см. JobServer).
+    """
+    def __init__(self, capacity: Dict[str, Optional[float]]):
+        unknown = set(capacity) - {"cpu", "memory", "io"}
+        if unknown:
+            raise ValueError(f"Unknown budget resources: {sorted(unknown)}")
+        self.capacity = dict(capacity)
+        self.in_use: Dict[str, float] = {"cpu": 0, "memory": 0, "io": 0}
+        self.tasks = 0
+
+    @classmethod
+    def default(cls, cpu: Optional[float], overrides: Optional[Dict[str, Optional[float]]] = None) -> "ResourceBudget":
+        """
+        Бюджет по умолчанию: cpu слотов и 75% доступной сейчас памяти. I/O не ограничен: кодирование при
+        сохранении обычно нагружает CPU, а не диск, поэтому монопольный доступ включается явно ({"io": 1}).
+        overrides: значения, заменяющие умолчания (None - без ограничения).
+        """
+        capacity = {"cpu": cpu, "memory": default_memory_budget(), "io": None}
+        capacity.update(overrides or {})
+        return cls(capacity)
+
+    def fits(self, demand: Dict[str, float]) -> bool:
+        if self.tasks == 0:
+            return True
+        for key, amount in demand.items():
+            limit = self.capacity.get(key)
+            if amount and limit is not None and self.in_use[key] + amount > limit:
+                return False
+        return True
+
+    def acquire(self, demand: Dict[str, float]):
+        for key, amount in demand.items():
+            self.in_use[key] += amount
+        self.tasks += 1
+
+    def release(self, demand: Dict[str, float]):
+        for key, amount in demand.items():
+            self.in_use[key] -= amount
+        self.tasks -= 1
+
+    def __repr__(self):
+        return f"<ResourceBudget in_use={self.in_use} capacity={self.capacity}>"
@@ -0,0 +1,151 @@
+import io
+import zlib
+import pickle
+import struct
+from typing import Any, List, Optional
+
+try:
+    import lz4.frame
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+# Формат кадра: [кодек: B][число буферов: I][длины частей: Q * (буферы + 1)][данные]
+# Первая часть - поток pickle, остальные - внеполосные буферы (пиксели изображений, массивы).
+_HEADER = struct.Struct("!BI")
+_LENGTH = struct.Struct("!Q")
+
+CODECS = {None: 0, "zlib": 1, "lz4": 2}
+_CODEC_NAMES = {code: name for name, code in CODECS.items()}
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 1)
+    if not HAS_LZ4:
+        raise ImportError("Compression 'lz4' requires the lz4 package")
+    return lz4.frame.compress(data)
+
+def _decompress(codec: str, data) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if not HAS_LZ4:
+        raise ImportError("Compression 'lz4' requires the lz4 package")
+    return lz4.frame.decompress(data)
+
+def _is_pil_image(obj: Any) -> bool:
+    return type(obj).__module__.startswith("PIL.") and hasattr(obj, "getbands") and hasattr(obj, "tobytes")
+
+def _rebuild_image(mode: str, size, data, info: dict, palette):
+    from PIL import Image
+    img = Image.frombytes(mode, size, data)
+    if palette is not None:
+        img.putpalette(palette)
+    img.info.update(info)
+    return img
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler (протокол 5), который передает пиксели PIL-изображений внеполосным буфером.
+    Массивы numpy поддерживают внеполосные буферы сами.
+    """
+    def reducer_override(self, obj):
+        if _is_pil_image(obj):
+            palette = obj.getpalette() if obj.mode in ("P", "PA") else None
+            return _rebuild_image, (obj.mode, obj.size, pickle.PickleBuffer(obj.tobytes()), dict(obj.info), palette)
+        return NotImplemented
+
+def _part_object(part: memoryview):
+    """Объект части для pickle: исходный bytes без копии, если часть покрывает его целиком."""
+    if isinstance(part.obj, bytes) and part.nbytes == len(part.obj):
+        return part.obj
+    return part.tobytes()
+
+def _restore_frame(codec: Optional[str], parts: list) -> "Frame":
+    frame = Frame.__new__(Frame)
+    frame.codec = codec
+    frame.parts = [memoryview(part) for part in parts]
+    frame.nbytes = sum(part.nbytes for part in frame.parts)
+    return frame
+
+class Frame:
+    """
+    Сериализованное значение: заголовок и части, которые копируются в целевой буфер
+    (bytes или блок разделяемой памяти) ровно один раз.
+    Сам Frame тоже можно передать через pickle (например, в пул процессов): части
+    передаются как есть, без предварительной склейки в один буфер.
+    """
+    def __init__(self, parts: List[memoryview], codec: Optional[str] = None):
+        self.codec = codec
+        lengths = [part.nbytes for part in parts]
+        if codec is not None:
+            parts = [memoryview(_compress(codec, b"".join(parts)))]
+        header = _HEADER.pack(CODECS[codec], len(lengths) - 1) + b"".join(_LENGTH.pack(n) for n in lengths)
+        self.parts = [memoryview(header)] + parts
+        self.nbytes = sum(part.nbytes for part in self.parts)
+
+    def write_to(self, target: memoryview):
+        offset = 0
+        for part in self.parts:
+            target[offset:offset + part.nbytes] = part
+            offset += part.nbytes
+
+    def tobytes(self) -> bytearray:
+        result = bytearray(self.nbytes)
+        self.write_to(memoryview(result))
+        return result
+
+    def __reduce__(self):
+        return _restore_frame, (self.codec, [_part_object(part) for part in self.parts])
+
+def encode(value: Any, compression: Optional[str] = None) -> Frame:
+    """
+    Сериализует значение протоколом pickle 5 с внеполосными буферами.
+    compression: None | "zlib" | "lz4" (lz4 - опциональная зависимость).
+    """
+    if compression not in CODECS:
+        raise ValueError(f"Unknown compression: {compression}")
+    stream = io.BytesIO()
+    buffers: List[pickle.PickleBuffer] = []
+    _Pickler(stream, protocol=5, buffer_callback=buffers.append).dump(value)
+    parts = [stream.getbuffer()] + [buffer.raw() for buffer in buffers]
+    return Frame(parts, compression)
+
+def decode(data, copy_buffers: bool = False) -> Any:
+    """
+    Восстанавливает значение из кадра (Frame или его байты). Без copy_buffers массивы ссылаются на data напрямую,
+    поэтому для буферов, которые будут освобождены (разделяемая память), нужен copy_buffers=True.
+    """
+    if isinstance(data, Frame):
+        if data.codec is None and not copy_buffers:
+            # Части уже разделены: заголовок не нужен
+            return pickle.loads(data.parts[1], buffers=data.parts[2:])
+        data = data.tobytes()
+    view = memoryview(data)
+    code, count = _HEADER.unpack_from(view)
+    offset = _HEADER.size
+    lengths = []
+    for _ in range(count + 1):
+        lengths.append(_LENGTH.unpack_from(view, offset)[0])
+        offset += _LENGTH.size
+
+    codec = _CODEC_NAMES.get(code, code)
+    if codec is not None:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown compression code: {code}")
+        view = memoryview(_decompress(codec, view[offset:]))
+        offset = 0
+    elif copy_buffers:
+        view = memoryview(bytes(view[offset:offset + sum(lengths)]))
+        offset = 0
+
+    parts = []
+    for length in lengths:
+        parts.append(view[offset:offset + length])
+        offset += length
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+def dumps(value: Any, compression: Optional[str] = None) -> bytes:
+    return bytes(encode(value, compression).tobytes())
+
+def loads(data) -> Any:
+    return decode(data)
@@ -0,0 +1,37 @@
+import os
+import sys
+from multiprocessing import shared_memory, resource_tracker
+
+# Блоками управляет исполнитель (он же их удаляет), поэтому resource_tracker не должен
+# отслеживать их в воркерах: иначе при выходе воркера блок удаляется раньше времени.
+# В Python 3.13+ для этого есть параметр track=False, в более старых версиях снимаем регистрацию вручную.
+_TRACK_ARG = sys.version_info >= (3, 13)
+_TRACKED = os.name == "posix" and not _TRACK_ARG
+
+def _untrack(block: shared_memory.SharedMemory):
+    if _TRACKED:
+        resource_tracker.unregister(block._name, "shared_memory")
+
+def create_block(size: int) -> shared_memory.SharedMemory:
+    """Создает блок разделяемой памяти, не регистрируя его в resource_tracker."""
+    if _TRACK_ARG:
+        return shared_memory.SharedMemory(create=True, size=max(size, 1), track=False)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _untrack(block)
+    return block
+
+def attach_block(name: str) -> shared_memory.SharedMemory:
+    """Подключается к существующему блоку."""
+    if _TRACK_ARG:
+        return shared_memory.SharedMemory(name=name, track=False)
+    block = shared_memory.SharedMemory(name=name)
+    _untrack(block)
+    return block
+
+def unlink_block(block: shared_memory.SharedMemory):
+    """Закрывает и удаляет блок."""
+    block.close()
+    if _TRACKED:
+        # SharedMemory.unlink() снимает регистрацию, поэтому перед удалением восстанавливаем ее
+        resource_tracker.register(block._name, "shared_memory")
+    block.unlink()
@@ -0,0 +1,75 @@
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+class StatusUpdate(NamedTuple):
+    """
+    Состояние узла на момент доставки: последний статус и счетчики задач узла с начала запуска.
+    Для узлов, которые выполняются много раз (списки, потоки), счетчики показывают прогресс.
+    """
+    node_id: str
+    status: str # "running" | "completed" | "error" | "cancelled"
+    started: int
+    completed: int
+    failed: int # ошибки и отмененные задачи
+
+    @property
+    def active(self) -> int:
+        """Задачи узла, которые сейчас выполняются."""
+        return self.started - self.completed - self.failed
+
+class StatusChannel:
+    """
+    Канал статусов узлов. Переходы копятся и объединяются по узлу: за интервал обработчик получает
+    по одной записи StatusUpdate на каждый изменившийся узел, а не событие на каждую задачу.
+    Так поток интерфейса обновляется пачкой раз в кадр, даже если задачи завершаются тысячами в секунду.
+
+    Канал можно передать как status_callback (он вызывается как функция(node_id, status));
+    тогда доставку по времени обеспечивают вызовы pump() (исполнитель делает их в цикле, см. Executor(status_handler=...)).
+    """
+    def __init__(self, handler: Optional[Callable[[List[StatusUpdate]], None]] = None, interval: float = 1 / 30):
+        """
+        handler: функция(updates), получает список StatusUpdate. Без обработчика записи забираются вызовом drain().
+        interval: минимальный интервал между доставками, секунды (по умолчанию - кадр при 30 FPS).
+        """
+        self.handler = handler
+        self.interval = interval
+        self._counters: Dict[str, List[int]] = {} # node_id -> [started, completed, failed]
+        self._pending: Dict[str, str] = {} # node_id -> последний статус с прошлой доставки
+        self._last_delivery = 0.0
+
+    def reset(self):
+        """Начинает отсчет нового запуска: счетчики обнуляются, недоставленные записи отбрасываются."""
+        self._counters.clear()
+        self._pending.clear()
+
+    def __call__(self, node_id: str, status: str):
+        self.publish(node_id, status)
+
+    def publish(self, node_id: str, status: str):
+        counters = self._counters.setdefault(node_id, [0, 0, 0])
+        if status == "running":
+            counters[0] += 1
+        elif status == "completed":
+            counters[1] += 1
+        else:
+            counters[2] += 1
+        self._pending[node_id] = status
+        self.pump()
+
+    def pump(self):
+        """Передает накопленные изменения, если прошел интервал с прошлой доставки."""
+        if self._pending and self.handler is not None and time.time() - self._last_delivery >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Немедленно передает все накопленные изменения."""
+        updates = self.drain()
+        if updates and self.handler is not None:
+            self.handler(updates)
+
+    def drain(self) -> List[StatusUpdate]:
+        """Возвращает накопленные изменения без вызова обработчика."""
+        updates = [StatusUpdate(node_id, status, *self._counters[node_id]) for node_id, status in self._pending.items()]
+        self._pending.clear()
+        self._last_delivery = time.time()
+        return updates
@@ -0,0 +1,72 @@
+from typing import Any, List, Optional
+
+# Пары типов, между которыми исполнитель преобразует данные на связях автоматически
+CONVERTIBLE = {("Image", "Array"), ("Array", "Image")}
+
+def type_members(port_type: str) -> List[str]:
+    """Разбирает объединение типов: "Image|List[Image]" -> ["Image", "List[Image]"]."""
+    return [member.strip() for member in port_type.split("|")]
+
+def _list_item(member: str) -> Optional[str]:
+    if member.startswith("List[") and member.endswith("]"):
+        return member[5:-1]
+    return None
+
+def _convertible(source: str, target: str) -> bool:
+    if (source, target) in CONVERTIBLE:
+        return True
+    source_item, target_item = _list_item(source), _list_item(target)
+    return source_item is not None and target_item is not None and _convertible(source_item, target_item)
+
+def link_conversion(out_type: str, in_type: str) -> Optional[str]:
+    """
+    Проверяет совместимость типов связи.
+    Returns: None, если данные передаются как есть, иначе тип, в который их нужно преобразовать.
+    Raises: ValueError, если типы несовместимы.
+    """
+    if out_type == "Any" or in_type == "Any":
+        return None
+    out_members, in_members = type_members(out_type), type_members(in_type)
+    if set(out_members) & set(in_members):
+        return None
+    for target in in_members:
+        if any(_convertible(source, target) for source in out_members):
+            return target
+    raise ValueError(f"Incompatible types: {out_type} -> {in_type}")
+
+def types_compatible(out_type: str, in_type: str) -> bool:
+    try:
+        link_conversion(out_type, in_type)
+        return True
+    except ValueError:
+        return False
+
+def convert(value: Any, target: str) -> Any:
+    """
+    Преобразует значение к типу target ("Image", "Array", "List[...]").
+    Значения, которые уже имеют нужный вид, возвращаются без изменений.
+    """
+    item = _list_item(target)
+    if item is not None:
+        if isinstance(value, list):
+            return [convert(element, item) for element in value]
+        return value
+    if target == "Array":
+        return to_array(value)
+    if target == "Image":
+        return to_image(value)
+    return value
+
+def to_array(value: Any) -> Any:
+    """PIL.Image -> numpy.ndarray (только для чтения: значение может быть у нескольких потребителей)."""
+    if hasattr(value, "getbands") and hasattr(value, "size"):
+        import numpy as np
+        return np.asarray(value)
+    return value
+
+def to_image(value: Any) -> Any:
+    """numpy.ndarray -> PIL.Image."""
+    if hasattr(value, "__array_interface__") and hasattr(value, "dtype"):
+        from PIL import Image
+        return Image.fromarray(value)
+    return value
@@ -1,18 +1,26 @@
 import uuid
 from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QMenu
-from PySide6.QtCore import Qt, Signal, QPointF
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF
 from PySide6.QtGui import QPainter, QTransform, QWheelEvent, QMouseEvent, QPen, QColor
 from .graphics_items import NodeItem, EdgeItem, PortItem
+from core.types import types_compatible
 
 class NodeEditorWidget(QGraphicsView):
+    PORT_PICK_RADIUS = 10 # радиус поиска порта под курсором при создании связи, в пикселях экрана
+    SCENE_MARGIN = 1000
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene(self)
+        # BSP-индекс сцены: поиск элементов в области (отрисовка, выбор портов) не перебирает все элементы
+        self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
         self.scene.setSceneRect(0, 0, 5000, 5000)
         self.setScene(self.scene)
         
         self.setRenderHint(QPainter.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Перерисовываются только измененные области: при перемещении узла - он и его связи, а не весь экран
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
@@ -20,6 +28,9 @@ class NodeEditorWidget(QGraphicsView):
         
         self.nodes = {} # id -> NodeItem
         self.edges = [] # EdgeItem
+        # Узлы, измененные после последнего запуска, для каждого вида запуска ("run", "preview").
+        # Нет записи - граф заменен целиком или запусков еще не было, нужен полный запуск.
+        self._dirty = {}
         
         # Логика соединения
         self.temp_edge = None
@@ -39,8 +50,19 @@ class NodeEditorWidget(QGraphicsView):
             
         self.scene.addItem(node)
         self.nodes[node_id] = node
+        self.mark_dirty(node_id)
         return node
 
+    def mark_dirty(self, node_id):
+        for dirty in self._dirty.values():
+            dirty.add(node_id)
+
+    def take_dirty(self, consumer="run"):
+        """Возвращает изменения с прошлого вызова для consumer (None - полный запуск) и начинает отсчет заново."""
+        dirty = self._dirty.get(consumer)
+        self._dirty[consumer] = set()
+        return dirty
+
     def wheelEvent(self, event: QWheelEvent):
         zoom_in_factor = 1.25
         zoom_out_factor = 1 / zoom_in_factor
@@ -65,9 +87,6 @@ class NodeEditorWidget(QGraphicsView):
                 self.temp_edge_line = self.scene.addLine(start_pos.x(), start_pos.y(),
                                                          start_pos.x(), start_pos.y())
 
-                self.temp_edge_line = self.scene.addLine(start_pos.x(), start_pos.y(),
-                                                         start_pos.x(), start_pos.y())
-
                 pen = QPen(QColor("white"))
                 pen.setWidth(2)
                 pen.setCosmetic(True)  # толщина не зависит от zoom
@@ -97,31 +116,16 @@ class NodeEditorWidget(QGraphicsView):
                 self.scene.removeItem(self.temp_edge_line)
                 self.temp_edge_line = None
 
-            item = self.itemAt(event.pos())
-            if isinstance(item, PortItem) and item != self.start_port:
+            item = self._port_at(event.pos())
+            if item is not None and item != self.start_port:
                 # Проверяем валидность: output → input
                 if self.start_port.is_output != item.is_output:
                     # Проверка совместимости типов
                     source_port = self.start_port if self.start_port.is_output else item
                     target_port = item if self.start_port.is_output else self.start_port
                     
-                    # Простая проверка типов: "Any" совместим со всем, иначе типы должны совпадать
-                    # Добавляем поддержку Union типов через символ '|'
-                    
-                    def types_compatible(source, target):
-                        if source == "Any" or target == "Any":
-                            return True
-                        
-                        source_types = source.split('|')
-                        target_types = target.split('|')
-                        
-                        # Проверяем, есть ли пересечение множеств типов
-                        for s_t in source_types:
-                            for t_t in target_types:
-                                if s_t == t_t:
-                                    return True
-                        return False
-
+                    # Те же правила, что и при загрузке графа: "Any", объединения через '|'
+                    # и автоматически преобразуемые типы (Image <-> Array)
                     if types_compatible(source_port.port_type, target_port.port_type):
                         self.add_edge(source_port, target_port)
                     else:
@@ -135,21 +139,40 @@ class NodeEditorWidget(QGraphicsView):
 
         super().mouseReleaseEvent(event)
 
+    def _port_at(self, view_pos):
+        """
+        Ближайший к курсору порт в радиусе PORT_PICK_RADIUS. Поиск идет по индексу сцены в небольшой области,
+        поэтому не зависит от размера графа и допускает неточное попадание в маленький порт.
+        """
+        scene_pos = self.mapToScene(view_pos)
+        radius = self.PORT_PICK_RADIUS / max(self.transform().m11(), 1e-6)
+        area = QRectF(scene_pos.x() - radius, scene_pos.y() - radius, 2 * radius, 2 * radius)
+        best, best_distance = None, None
+        for item in self.scene.items(area):
+            if not isinstance(item, PortItem):
+                continue
+            delta = item.scenePos() - scene_pos
+            distance = delta.x() ** 2 + delta.y() ** 2
+            if best is None or distance < best_distance:
+                best, best_distance = item, distance
+        return best
+
     def add_edge(self, source_port, target_port):
-        # Удаляем существующие связи в этот вход
-        # Проверим существующие связи
-        for edge in self.edges[:]:
+        # Удаляем существующие связи в этот вход (только среди связей целевого узла, а не всего графа)
+        for edge in target_port.parentItem().edges[:]:
             if edge.target_port == target_port:
-                self.scene.removeItem(edge)
-                self.edges.remove(edge)
+                self._remove_edge(edge)
 
         edge = EdgeItem(source_port, target_port)
+        edge.attach()
         self.scene.addItem(edge)
         self.edges.append(edge)
+        self.mark_dirty(target_port.parentItem().node_id)
 
     def update_node_param(self, node_id, param_name, value):
         if node_id in self.nodes:
             self.nodes[node_id].params[param_name] = value
+            self.mark_dirty(node_id)
 
     def serialize_graph(self):
         graph_data = {"nodes": [], "links": []}
@@ -220,23 +243,31 @@ class NodeEditorWidget(QGraphicsView):
             if source_port and target_port:
                 self.add_edge(source_port, target_port)
 
+        # Сгенерированные графы могут не помещаться в исходную область сцены
+        self.scene.setSceneRect(QRectF(0, 0, 5000, 5000).united(
+            self.scene.itemsBoundingRect().adjusted(-self.SCENE_MARGIN, -self.SCENE_MARGIN, self.SCENE_MARGIN, self.SCENE_MARGIN)))
+        self._dirty.clear()
+
     def clear(self):
         self.scene.clear()
         self.nodes = {}
         self.edges = []
+        self._dirty.clear()
 
     def remove_node(self, node):
         # 1. Удалить все связи ноды
+        for edge in node.edges[:]:
+            self._remove_edge(edge)
+            self.mark_dirty(edge.target_port.parentItem().node_id)
         for port in node.inputs + node.outputs:
-            for edge in self.edges:
-                if edge.target_port == port or edge.source_port == port:
-                    self.scene.removeItem(edge)
-                    self.edges.remove(edge)
             self.scene.removeItem(port)
 
-
-
         # 2. Удалить графический объект ноды
         if node.node_id in self.nodes:
             self.scene.removeItem(self.nodes[node.node_id])
             self.nodes.pop(node.node_id)
+
+    def _remove_edge(self, edge):
+        edge.detach()
+        self.scene.removeItem(edge)
+        self.edges.remove(edge)
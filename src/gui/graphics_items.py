@@ -1,7 +1,28 @@
-from PySide6.QtWidgets import QGraphicsItem, QGraphicsPathItem, QGraphicsTextItem, QMenu
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsPathItem, QGraphicsTextItem, QMenu, QStyleOptionGraphicsItem
 from PySide6.QtCore import Qt, QRectF, QPointF, Signal, QObject
-from PySide6.QtGui import QBrush, QPen, QPainter, QPainterPath, QColor, QFont
-from nodes.image_nodes import NODE_REGISTRY
+from PySide6.QtGui import QBrush, QPen, QPainter, QPainterPath, QColor, QFont, QImage, QPixmap
+from nodes.registry import NODE_REGISTRY
+
+PORT_COLORS = {
+    "Image": QColor("#FFFF00"),
+    "Array": QColor("#00BFFF"),
+}
+
+# Масштаб, ниже которого элементы рисуются упрощенно: без подписей, портов и кривых связей.
+# При таком увеличении надписи все равно нечитаемы, а на больших графах их отрисовка занимает большую часть кадра.
+LOW_DETAIL_LOD = 0.4
+
+_FONTS = {}
+
+def _font(size, bold=False):
+    """Шрифты создаются один раз, а не при каждой перерисовке."""
+    key = (size, bold)
+    if key not in _FONTS:
+        _FONTS[key] = QFont("Arial", size, QFont.Bold if bold else QFont.Normal)
+    return _FONTS[key]
+
+def level_of_detail(painter):
+    return QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
 
 class PortItem(QGraphicsItem):
     def __init__(self, name, port_type, is_output, parent=None):
@@ -15,12 +36,14 @@ class PortItem(QGraphicsItem):
         self.setAcceptHoverEvents(True)
         
         # Определяем цвет порта (можно добавить маппинг типов к цветам)
-        self.color = QColor("#FFFF00") if port_type == "Image" else QColor("#00FF00")
+        self.color = PORT_COLORS.get(port_type, QColor("#00FF00"))
 
     def boundingRect(self):
         return QRectF(-self.radius, -self.radius, 2*self.radius, 2*self.radius)
 
     def paint(self, painter, option, widget):
+        if level_of_detail(painter) < LOW_DETAIL_LOD:
+            return
         painter.setBrush(self.color)
         if self.is_output:
              painter.setPen(QPen(Qt.white, 1))
@@ -45,9 +68,12 @@ class NodeItem(QGraphicsItem):
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
         
+        self.edges = [] # EdgeItem, подключенные к портам узла
         self.inputs = []
         self.outputs = []
-        self.status = "idle" # idle, running, completed, error
+        self.status = "idle" # idle, running, completed, error, cancelled
+        self.runs = 0 # завершенные задачи узла в текущем запуске (для узлов, выполняемых много раз)
+        self.thumbnail = None # QPixmap результата предпросмотра
         
         self._init_ports()
 
@@ -55,8 +81,28 @@ class NodeItem(QGraphicsItem):
         self.status = status
         self.update() # Trigger repaint
 
+    def apply_update(self, update):
+        """update: StatusUpdate из пачки статусов исполнителя."""
+        # Пока выполняются другие задачи узла, он остается "running", даже если последняя уже завершилась
+        status = "running" if update.active > 0 and update.status != "cancelled" else update.status
+        if status != self.status or update.completed != self.runs:
+            self.runs = update.completed
+            self.set_status(status)
+
+    def set_thumbnail(self, image):
+        """image: PIL.Image в режиме RGBA (см. utils.make_thumbnail) или None - убрать миниатюру."""
+        self.prepareGeometryChange()
+        if image is None:
+            self.thumbnail = None
+            self.height = self.ports_height
+        else:
+            qimage = QImage(image.tobytes(), image.width, image.height, image.width * 4, QImage.Format_RGBA8888)
+            self.thumbnail = QPixmap.fromImage(qimage) # копирует данные
+            self.height = self.ports_height + image.height + 10
+        self.update()
+
     def _init_ports(self):
-        node_class = NODE_REGISTRY[self.node_type]
+        node_class = NODE_REGISTRY.spec(self.node_type) # описание портов без загрузки реализации
         
         # Inputs
         y = self.header_height + 10
@@ -79,6 +125,7 @@ class NodeItem(QGraphicsItem):
         output_height = y
         
         self.height = max(input_height, output_height, 50) + 10
+        self.ports_height = self.height # высота без миниатюры
 
     def radius_offset(self):
         return 0 # Порты на границе
@@ -87,6 +134,10 @@ class NodeItem(QGraphicsItem):
         return QRectF(0, 0, self.width, self.height)
 
     def paint(self, painter, option, widget):
+        if level_of_detail(painter) < LOW_DETAIL_LOD:
+            self._paint_low_detail(painter)
+            return
+
         # Body
         if self.status == "running":
             painter.setBrush(QColor("#445544")) # Greenish background
@@ -103,6 +154,8 @@ class NodeItem(QGraphicsItem):
             painter.setPen(QPen(QColor("#00CC00"), 2))
         elif self.status == "error":
             painter.setPen(QPen(QColor("#FF0000"), 2))
+        elif self.status == "cancelled":
+            painter.setPen(QPen(QColor("#888888"), 2, Qt.DashLine))
         else:
             painter.setPen(Qt.NoPen)
             
@@ -119,13 +172,14 @@ class NodeItem(QGraphicsItem):
         
         # Title
         painter.setPen(Qt.white)
-        font = QFont("Arial", 10, QFont.Bold)
-        painter.setFont(font)
+        painter.setFont(_font(10, bold=True))
         painter.drawText(QRectF(0, 0, self.width, self.header_height), Qt.AlignCenter, f"{self.node_type}")
+        if self.runs > 1:
+            painter.setFont(_font(7))
+            painter.drawText(QRectF(0, 0, self.width - 6, self.header_height), Qt.AlignRight | Qt.AlignVCenter, f"x{self.runs}")
         
         # Port Labels
-        font = QFont("Arial", 8)
-        painter.setFont(font)
+        painter.setFont(_font(8))
         
         for port in self.inputs:
             painter.drawText(QRectF(10, port.y()-10, self.width/2, 20), Qt.AlignLeft | Qt.AlignVCenter, port.name)
@@ -133,12 +187,21 @@ class NodeItem(QGraphicsItem):
         for port in self.outputs:
             painter.drawText(QRectF(self.width/2, port.y()-10, self.width/2 - 10, 20), Qt.AlignRight | Qt.AlignVCenter, port.name)
 
+        if self.thumbnail is not None:
+            painter.drawPixmap(int((self.width - self.thumbnail.width()) / 2), int(self.ports_height), self.thumbnail)
+
+    def _paint_low_detail(self, painter):
+        """Отдаленный вид: прямоугольник цвета статуса без заголовка и подписей."""
+        colors = {"running": "#00FF00", "completed": "#00CC00", "error": "#FF0000", "cancelled": "#888888"}
+        painter.setPen(QPen(QColor("#FF9900"), 0) if self.isSelected() else Qt.NoPen)
+        painter.setBrush(QColor(colors.get(self.status, "#555555")))
+        painter.drawRect(self.boundingRect())
+
     def itemChange(self, change, value):
-        if change == QGraphicsItem.ItemPositionChange:
-            # Здесь можно обновлять связи
-            # В QGraphicsScene связи обновятся автоматически, если они правильно привязаны,
-            # или нужно вызывать update() для них.
-            pass
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            # Пути связей кэшируются и пересчитываются только при перемещении их концов
+            for edge in self.edges:
+                edge.update_path()
         return super().itemChange(change, value)
 
     def contextMenuEvent(self, event):
@@ -165,6 +228,17 @@ class EdgeItem(QGraphicsPathItem):
         pen = QPen(QColor("#AAAAAA"), 2)
         self.setPen(pen)
 
+    def attach(self):
+        """Регистрирует связь у узлов ее портов, чтобы они обновляли путь при перемещении."""
+        for port in (self.source_port, self.target_port):
+            port.parentItem().edges.append(self)
+
+    def detach(self):
+        for port in (self.source_port, self.target_port):
+            edges = port.parentItem().edges
+            if self in edges:
+                edges.remove(self)
+
     def update_path(self):
         if not self.source_port or not self.target_port:
             return
@@ -185,6 +259,11 @@ class EdgeItem(QGraphicsPathItem):
         self.setPath(path)
 
     def paint(self, painter, option, widget):
-        self.update_path() # Обновляем при перерисовке
+        if level_of_detail(painter) < LOW_DETAIL_LOD:
+            # Отдаленный вид: прямая вместо кривой, без сглаживания
+            painter.setRenderHint(QPainter.Antialiasing, False)
+            painter.setPen(QPen(self.pen().color(), 0))
+            painter.drawLine(self.path().elementAt(0), self.path().currentPosition())
+            return
         super().paint(painter, option, widget)
 
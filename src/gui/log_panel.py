@@ -0,0 +1,42 @@
+import threading
+from PySide6.QtWidgets import QPlainTextEdit
+from PySide6.QtCore import QTimer
+
+class LogPanel(QPlainTextEdit):
+    """
+    Панель логов. Текст можно добавлять из любого потока: он копится в буфере,
+    а в виджет попадает одной вставкой по таймеру. Число строк ограничено max_lines.
+    """
+    def __init__(self, parent=None, max_lines: int = 5000, interval_ms: int = 100):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+
+        self._pending = []
+        self._lock = threading.Lock()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._flush)
+        self._timer.start()
+
+    def append_text(self, text: str):
+        if text:
+            with self._lock:
+                self._pending.append(text)
+
+    def _flush(self):
+        with self._lock:
+            text = "".join(self._pending)
+            # Незавершенная строка ждет своего перевода строки
+            end = text.rfind("\n")
+            self._pending = [text[end + 1:]] if end + 1 < len(text) else []
+        if end < 0:
+            return
+
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        # appendPlainText сам добавляет перевод строки
+        self.appendPlainText(text[:end])
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
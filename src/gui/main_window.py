@@ -1,21 +1,25 @@
 import json
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                               QDockWidget, QListWidget, QPushButton, QTextEdit, 
+                               QDockWidget, QListWidget, QPushButton, 
                                QMessageBox, QSplitter, QFileDialog)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import Qt, QTimer
 from .editor_widget import NodeEditorWidget
+from .log_panel import LogPanel
 from .properties_widget import PropertiesWidget
-from core.executor import Executor
 from core.graph import Graph
-from nodes.image_nodes import NODE_REGISTRY
-from .utils import StreamRedirector
+from core.incremental import IncrementalSession
+from nodes.registry import NODE_REGISTRY
+from .utils import StreamRedirector, make_thumbnail
 from .signals import ExecutionSignals
 import threading
 import time
 import sys
 
 class MainWindow(QMainWindow):
+    PREVIEW_SIZE = 512 # наибольшая сторона изображений в режиме предпросмотра
+    PREVIEW_DELAY_MS = 300
+    THUMBNAIL_SIZE = 120
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Dataflow Pipeline Editor")
@@ -24,15 +28,24 @@ class MainWindow(QMainWindow):
         # Сигналы для обновления UI из потока выполнения
         self.exec_signals = ExecutionSignals()
         self.exec_signals.status_changed.connect(self._on_node_status_changed)
+        self.exec_signals.status_batch.connect(self._on_status_batch)
+        # Запуски выполняют только узлы, измененные в редакторе с прошлого запуска, и их потомков.
+        # Статусы узлов приходят пачками раз в кадр (один межпоточный сигнал вместо сигнала на каждую задачу).
+        self.session = IncrementalSession(NODE_REGISTRY, status_handler=self.exec_signals.status_batch.emit)
+        self._run_thread = None
 
-        # Перенаправление stdout / stderr в логовую панель
-        self.redirector = StreamRedirector(sys.stdout)
-        self.redirector.messageWritten.connect(self._on_stdout_message, Qt.QueuedConnection)
-        sys.stdout = self.redirector
-
-        self.stderr_redirector = StreamRedirector(sys.stderr)
-        self.stderr_redirector.messageWritten.connect(self._on_stdout_message, Qt.QueuedConnection)
-        sys.stderr = self.stderr_redirector
+        # Живой предпросмотр: после правок граф выполняется на уменьшенных копиях изображений,
+        # результаты показываются миниатюрами на узлах. Отдельная сессия - свои сохраненные выходы.
+        self.exec_signals.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.exec_signals.preview_finished.connect(self._on_preview_finished)
+        self.preview_session = IncrementalSession(NODE_REGISTRY, preview=self.PREVIEW_SIZE)
+        self._preview_thread = None
+        self._preview_pending = False
+        # Правки параметров копятся PREVIEW_DELAY_MS, затем запускается один предпросмотр
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._run_preview)
 
         # Центральный виджет - Редактор графа
         self.editor = NodeEditorWidget(self)
@@ -44,6 +57,14 @@ class MainWindow(QMainWindow):
         self._create_logs_dock()
         self._create_toolbar()
 
+        # Перенаправление stdout / stderr в логовую панель.
+        # Панель сама копит текст и обновляется пачками по таймеру, поэтому писать в нее можно из любого потока.
+        self.redirector = StreamRedirector(sys.stdout, self.log_output.append_text)
+        sys.stdout = self.redirector
+
+        self.stderr_redirector = StreamRedirector(sys.stderr, self.log_output.append_text)
+        sys.stderr = self.stderr_redirector
+
         # Связывание сигналов
         self.editor.scene.selectionChanged.connect(self._on_selection_changed)
 
@@ -77,8 +98,7 @@ class MainWindow(QMainWindow):
         self.logs_dock.setFeatures(QDockWidget.NoDockWidgetFeatures)
         self.logs_dock.setAllowedAreas(Qt.BottomDockWidgetArea)
         
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_output = LogPanel()
         
         self.logs_dock.setWidget(self.log_output)
         self.addDockWidget(Qt.BottomDockWidgetArea, self.logs_dock)
@@ -96,6 +116,13 @@ class MainWindow(QMainWindow):
 
         run_action = toolbar.addAction("Run Pipeline")
         run_action.triggered.connect(self._run_pipeline)
+
+        stop_action = toolbar.addAction("Stop")
+        stop_action.triggered.connect(self._stop_pipeline)
+
+        self.preview_action = toolbar.addAction("Live Preview")
+        self.preview_action.setCheckable(True)
+        self.preview_action.toggled.connect(self._on_preview_toggled)
         
         clear_action = toolbar.addAction("Clear Graph")
         clear_action.triggered.connect(self.editor.clear)
@@ -148,24 +175,79 @@ class MainWindow(QMainWindow):
 
     def _on_param_changed(self, node_id, param_name, value):
         self.editor.update_node_param(node_id, param_name, value)
+        if self.preview_action.isChecked():
+            self._preview_timer.start() # перезапуск отсчета: частые правки дают один предпросмотр
 
     def _on_node_status_changed(self, node_id, status):
         if node_id in self.editor.nodes:
             node_item = self.editor.nodes[node_id]
             node_item.set_status(status)
 
-    def _on_stdout_message(self, text):
-        if not text:
+    def _on_status_batch(self, updates):
+        for update in updates:
+            node_item = self.editor.nodes.get(update.node_id)
+            if node_item is not None:
+                node_item.apply_update(update)
+
+    def _on_thumbnail_ready(self, node_id, image):
+        if node_id in self.editor.nodes:
+            self.editor.nodes[node_id].set_thumbnail(image)
+
+    def _on_preview_toggled(self, enabled):
+        if enabled:
+            self._preview_timer.start()
             return
-        self.log_output.moveCursor(QTextCursor.End)
-        self.log_output.insertPlainText(text)
-        self.log_output.moveCursor(QTextCursor.End)
-        self.log_output.ensureCursorVisible()
+        self._preview_timer.stop()
+        self._preview_pending = False
+        executor = self.preview_session.executor
+        if executor is not None:
+            executor.cancel()
+        for node_item in self.editor.nodes.values():
+            node_item.set_thumbnail(None)
+
+    def _run_preview(self):
+        if self._preview_thread is not None and self._preview_thread.is_alive():
+            # Устаревший предпросмотр прерывается, новый запустится по его завершении
+            self._preview_pending = True
+            executor = self.preview_session.executor
+            if executor is not None:
+                executor.cancel()
+            return
+        graph_data = self.editor.serialize_graph()
+        if not graph_data["nodes"]:
+            return
+        dirty = self.editor.take_dirty("preview")
+        self._preview_thread = threading.Thread(target=self._preview_thread_main, args=(graph_data, dirty), daemon=True)
+        self._preview_thread.start()
+
+    def _preview_thread_main(self, graph_data, dirty):
+        try:
+            if self.preview_session.run(graph_data, dirty) == "finished":
+                for node_id, outputs in self.preview_session.outputs.items():
+                    # Миниатюра - первое изображение среди выходов последней задачи узла
+                    for value in (outputs[-1].values() if outputs else ()):
+                        thumbnail = make_thumbnail(value, self.THUMBNAIL_SIZE)
+                        if thumbnail is not None:
+                            self.exec_signals.thumbnail_ready.emit(node_id, thumbnail)
+                            break
+        except Exception as e:
+            self.preview_session.invalidate()
+            print(f"Preview error: {e}")
+        finally:
+            self.exec_signals.preview_finished.emit()
+
+    def _on_preview_finished(self):
+        if self._preview_pending and self.preview_action.isChecked():
+            self._preview_pending = False
+            self._run_preview()
 
     def log(self, message):
         print(f"[{time.strftime('%H:%M:%S')}] {message}")
 
     def _run_pipeline(self):
+        if self._run_thread is not None and self._run_thread.is_alive():
+            self.log("Pipeline is already running.")
+            return
         graph_data = self.editor.serialize_graph()
         if not graph_data["nodes"]:
             self.log("Graph is empty!")
@@ -181,27 +263,38 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Graph Error", str(e))
             return
 
-        self.log("Starting execution...")
+        dirty = self.editor.take_dirty("run")
+        self.log("Starting execution..." if dirty is None else f"Starting execution ({len(dirty)} changed nodes)...")
         
         # Запуск в отдельном потоке, чтобы не блокировать UI
         # Executor использует multiprocessing, но сам метод run() блокирующий.
-        threading.Thread(target=self._execute_thread, args=(graph,), daemon=True).start()
+        self._run_thread = threading.Thread(target=self._execute_thread, args=(graph_data, dirty), daemon=True)
+        self._run_thread.start()
 
-    def _execute_thread(self, graph):
+    def _stop_pipeline(self):
+        executor = self.session.executor
+        if executor is None:
+            self.log("Nothing is running.")
+            return
+        self.log("Cancelling execution...")
+        executor.cancel()
+
+    def _execute_thread(self, graph_data, dirty):
         try:
-            # Функция обратного вызова, которая будет вызываться из executor
-            # Так как это выполняется в другом потоке, используем сигналы для передачи в UI
-            def status_callback(node_id, status):
-                self.exec_signals.status_changed.emit(node_id, status)
+            # Статусы узлов передаются в UI сигналом status_batch (см. status_handler сессии)
+            outcome = self.session.run(graph_data, dirty)
 
-            executor = Executor(graph)
-            executor.run(status_callback=status_callback)
-            
-            print("Execution finished successfully.") 
+            if outcome == "cancelled":
+                print("Execution cancelled.")
+            else:
+                print("Execution finished successfully.")
         except Exception as e:
+            # Сохраненные выходы могут не соответствовать графу: следующий запуск полный
+            self.session.invalidate()
             print(f"Execution error: {e}")
 
     def closeEvent(self, event):
-        # Restore stdout
+        # Restore stdout / stderr
         sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
         super().closeEvent(event)
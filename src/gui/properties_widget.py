@@ -2,7 +2,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout,
                                QLineEdit, QDoubleSpinBox, QSpinBox, 
                                QLabel, QComboBox, QPushButton, QHBoxLayout, QFileDialog)
 from PySide6.QtCore import Signal
-from nodes.image_nodes import NODE_REGISTRY
+from nodes.registry import NODE_REGISTRY
 
 class PropertiesWidget(QWidget):
     paramChanged = Signal(str, str, object) # node_id, param_name, value
@@ -20,9 +20,9 @@ class PropertiesWidget(QWidget):
         self.clear()
         
         node_type = node_item.node_type
-        node_class = NODE_REGISTRY.get(node_type)
-        if not node_class:
+        if node_type not in NODE_REGISTRY:
             return
+        node_class = NODE_REGISTRY.spec(node_type)
             
         # Заголовок
         self.layout.insertWidget(0, QLabel(f"Properties: {node_type}"))
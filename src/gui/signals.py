@@ -2,3 +2,6 @@ from PySide6.QtCore import QObject, Signal
 
 class ExecutionSignals(QObject):
     status_changed = Signal(str, str) # node_id, status ("running", "completed", "error")
+    status_batch = Signal(object) # List[StatusUpdate] - статусы узлов пачкой, не чаще раза в кадр
+    thumbnail_ready = Signal(str, object) # node_id, уменьшенное изображение выхода (PIL.Image)
+    preview_finished = Signal()
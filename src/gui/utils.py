@@ -1,18 +1,32 @@
 import sys
-from PySide6.QtCore import QObject, Signal
 
-class StreamRedirector(QObject):
-    messageWritten = Signal(str)
-
-    def __init__(self, stream=None):
-        super().__init__()
+class StreamRedirector:
+    """
+    Дублирует запись в поток (stdout/stderr) в приемник sink(text).
+    Приемник должен быть потокобезопасным и дешевым: write вызывается на каждый фрагмент print.
+    """
+    def __init__(self, stream=None, sink=None):
         self._stream = stream or sys.stdout
+        self._sink = sink
 
     def write(self, text):
         self._stream.write(text)
-        self.messageWritten.emit(text)
+        if self._sink is not None:
+            self._sink(text)
 
     def flush(self):
         self._stream.flush()
 
-
+def make_thumbnail(value, size: int = 120):
+    """
+    Миниатюра выхода узла (PIL.Image или массив изображения) для показа на узле; None - если это не изображение.
+    Вызывается в потоке выполнения, чтобы не уменьшать изображения в потоке интерфейса.
+    """
+    from PIL import Image # не загружается при запуске редактора
+    if hasattr(value, "ndim") and value.ndim in (2, 3):
+        value = Image.fromarray(value)
+    if not isinstance(value, Image.Image):
+        return None
+    thumbnail = value.convert("RGBA")
+    thumbnail.thumbnail((size, size))
+    return thumbnail
@@ -5,13 +5,18 @@ import multiprocessing
 # Добавляем корень проекта в sys.path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from PySide6.QtWidgets import QApplication
-from gui.main_window import MainWindow
-
 if __name__ == "__main__":
     # Необходимая инициализация для multiprocessing на Windows
     multiprocessing.freeze_support()
-    
+
+    # Импорт внутри блока: воркеры, запущенные методом spawn, повторно импортируют этот модуль
+    # и иначе загружали бы Qt и весь редактор
+    from PySide6.QtWidgets import QApplication
+    from gui.main_window import MainWindow
+    from nodes.registry import load_plugins
+
+    # Внешние пакеты узлов (entry points "dataflow.nodes" и DATAFLOW_PLUGINS) - до построения библиотеки узлов
+    load_plugins()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,31 +1,102 @@
+import io
+import glob
+import importlib.util
+import os
 import time
+import uuid
 import numpy as np
 from PIL import Image, ImageFilter, ImageOps
-from core.node import Node
+from core.node import Node, Items
+from core.payloads import share_image_rows
+from nodes.stitching import stitch, tile_info, StitchCanvas
 from typing import Dict, Any, List
 
-try:
-    from skimage.measure import shannon_entropy
-    HAS_SKIMAGE = True
-except ImportError:
-    HAS_SKIMAGE = False
+# skimage импортируется только узлом, которому он нужен: его загрузка занимает больше времени, чем запуск небольшого графа
+HAS_SKIMAGE = importlib.util.find_spec("skimage") is not None
+
+def open_image(source, preview_size=None) -> Image.Image:
+    """
+    Открывает и декодирует изображение. preview_size: в режиме предпросмотра - наибольшая сторона
+    уменьшенной копии (JPEG сразу декодируется в уменьшенном масштабе); доля от исходного размера
+    сохраняется в info["proxy_scale"], чтобы узлы могли пересчитать параметры в пикселях.
+    """
+    img = Image.open(source)
+    if not preview_size:
+        img.load()
+        return img
+    full_width = img.width
+    img.draft(img.mode, (preview_size, preview_size))
+    img.load()
+    img.thumbnail((preview_size, preview_size))
+    img.info["proxy_scale"] = img.width / full_width
+    return img
 
 class LoadImage(Node):
     INPUT_TYPES = {}
     OUTPUT_TYPES = {"image": "Image"}
     PARAMETERS = {"path": str}
+    RESOURCES = {"io": True}
+    DETERMINISTIC = True # ключ кэша учитывает размер и время изменения файла
 
     def execute(self, **inputs) -> Dict[str, Any]:
         path = self.params.get("path")
         print(f"Loading image from {path}")
-        img = Image.open(path)
-        img.load() 
+        img = open_image(path, self.preview_size)
         return {"image": img}
 
+class ListImages(Node):
+    """
+    Перечисляет файлы изображений в каталоге и выдает пути по одному (Items),
+    чтобы их чтение и декодирование шли конвейером.
+    """
+    INPUT_TYPES = {}
+    OUTPUT_TYPES = {"path": "Path"}
+    PARAMETERS = {"directory": str, "pattern": str}
+
+    def execute(self, **inputs) -> Dict[str, Any]:
+        directory = self.params.get("directory", ".")
+        pattern = self.params.get("pattern", "*.png")
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        print(f"Found {len(paths)} images in {directory}")
+        return {"path": Items(paths)}
+
+class DecodeImage(Node):
+    """
+    Декодирует изображение по пути. Файл заранее читает исполнитель (PREFETCH_INPUT):
+    пока воркеры заняты обработкой, следующие файлы уже читаются с диска.
+    """
+    INPUT_TYPES = {"path": "Path"}
+    OUTPUT_TYPES = {"image": "Image"}
+    PARAMETERS = {}
+    PREFETCH_INPUT = "path"
+    DETERMINISTIC = True
+
+    def execute(self, **inputs) -> Dict[str, Any]:
+        path = inputs.get("path")
+        data = getattr(path, "data", None)
+        print(f"Decoding {path}" + (" (prefetched)" if data is not None else ""))
+        img = open_image(io.BytesIO(data) if data is not None else path, self.preview_size)
+        return {"image": img}
+
+def _new_file(base: str, fmt: str) -> str:
+    """
+    Создает пустой файл base.fmt (или base-N.fmt, если имя занято) и возвращает его путь:
+    задачи SaveImage в разных воркерах могут сохранять в одну и ту же миллисекунду.
+    """
+    filename, index = f"{base}.{fmt}", 1
+    while True:
+        try:
+            with open(filename, "x"):
+                return filename
+        except FileExistsError:
+            filename, index = f"{base}-{index}.{fmt}", index + 1
+
 class SaveImage(Node):
     INPUT_TYPES = {"image": "Any"} # Supports Image or List[Image]
     OUTPUT_TYPES = {}
     PARAMETERS = {"path_prefix": str, "format": str}
+    RESOURCES = {"io": True, "memory_per_mpx": 4} # буферы кодировщика
+    PREVIEW_SKIP = True # предпросмотр не перезаписывает результаты
 
     def execute(self, **inputs) -> Dict[str, Any]:
         data = inputs.get("image")
@@ -36,11 +107,11 @@ class SaveImage(Node):
         if isinstance(data, list):
             print(f"Saving batch of {len(data)} images as {fmt}")
             for i, img in enumerate(data):
-                filename = f"{prefix}_{timestamp}_{i}.{fmt}"
+                filename = _new_file(f"{prefix}_{timestamp}_{i}", fmt)
                 print(f"  Saving {filename}")
                 img.save(filename)
         elif data:
-            filename = f"{prefix}_{timestamp}.{fmt}"
+            filename = _new_file(f"{prefix}_{timestamp}", fmt)
             print(f"Saving image to {filename}")
             data.save(filename)
         else:
@@ -52,22 +123,31 @@ class GaussianBlur(Node):
     INPUT_TYPES = {"image": "Image"}
     OUTPUT_TYPES = {"image": "Image"}
     PARAMETERS = {"radius": float}
+    RESOURCES = {"memory_per_mpx": 8} # результат и промежуточный буфер фильтра
+    DETERMINISTIC = True
+    COST = 0.2 # на кадр в несколько мегапикселей
 
     def execute(self, **inputs) -> Dict[str, Any]:
         img = inputs.get("image")
         radius = self.params.get("radius", 2.0)
         print(f"Applying Gaussian Blur with radius {radius}")
-        result = img.filter(ImageFilter.GaussianBlur(radius))
+        # На уменьшенной копии (предпросмотр) радиус уменьшается в том же масштабе
+        result = img.filter(ImageFilter.GaussianBlur(radius * img.info.get("proxy_scale", 1.0)))
         return {"image": result}
 
 class Grayscale(Node):
     INPUT_TYPES = {"image": "Image"}
     OUTPUT_TYPES = {"image": "Image"}
     PARAMETERS = {}
+    DETERMINISTIC = True
+    FUSABLE = True
 
     def execute(self, **inputs) -> Dict[str, Any]:
         img = inputs.get("image")
         print("Converting to Grayscale")
+        if img.mode == "L":
+            # Уже в оттенках серого: входы не изменяются, поэтому значение можно передать дальше без копии
+            return {"image": img}
         result = ImageOps.grayscale(img)
         return {"image": result}
 
@@ -75,6 +155,8 @@ class BlendImages(Node):
     INPUT_TYPES = {"image_a": "Image", "image_b": "Image"}
     OUTPUT_TYPES = {"image": "Image"}
     PARAMETERS = {"alpha": float}
+    RESOURCES = {"memory_per_mpx": 8} # приведенная копия image_b и результат
+    DETERMINISTIC = True
 
     def execute(self, **inputs) -> Dict[str, Any]:
         img_a = inputs.get("image_a")
@@ -83,14 +165,20 @@ class BlendImages(Node):
         
         print(f"Blending images with alpha {alpha}")
         
-        img_b_resized = img_b.resize(img_a.size).convert(img_a.mode)
-        result = Image.blend(img_a, img_b_resized, alpha)
+        if img_b.size != img_a.size:
+            img_b = img_b.resize(img_a.size)
+        if img_b.mode != img_a.mode:
+            img_b = img_b.convert(img_a.mode)
+
+        result = Image.blend(img_a, img_b, alpha)
         return {"image": result}
 
 class ConvertToJPG(Node):
     INPUT_TYPES = {"image": "Image"}
     OUTPUT_TYPES = {"image": "Image"}
     PARAMETERS = {}
+    DETERMINISTIC = True
+    FUSABLE = True
 
     def execute(self, **inputs) -> Dict[str, Any]:
         img = inputs.get("image")
@@ -100,8 +188,12 @@ class ConvertToJPG(Node):
         return {"image": img}
 
 class SliceImage(Node):
+    """
+    Режет изображение на горизонтальные полосы.
+    images - список полос, tiles - те же полосы поэлементно (для потоковой обработки и StreamStitch).
+    """
     INPUT_TYPES = {"image": "Image"}
-    OUTPUT_TYPES = {"images": "List[Image]"}
+    OUTPUT_TYPES = {"images": "List[Image]", "tiles": "Image"}
     PARAMETERS = {"num_slices": int}
 
     def execute(self, **inputs) -> Dict[str, Any]:
@@ -111,40 +203,82 @@ class SliceImage(Node):
         
         w, h = img.size
         slice_height = h // num_slices
-        slices = []
+        boxes = []
         
         for i in range(num_slices):
             # box = (left, upper, right, lower)
             upper = i * slice_height
             lower = (i + 1) * slice_height if i < num_slices - 1 else h
-            box = (0, upper, w, lower)
-            slices.append(img.crop(box))
+            boxes.append((0, upper, w, lower))
+
+        source = f"{self.node_id}/{uuid.uuid4().hex}"
+        infos = [dict(img.info, **tile_info(i, num_slices, box, (w, h), source)) for i, box in enumerate(boxes)]
+        slices = None
+        if self.shared_memory:
+            # Пиксели копируются в разделяемую память один раз, полосы - лишь представления строк
+            slices = share_image_rows(img, [(upper, lower) for _, upper, _, lower in boxes], infos)
+        if slices is None:
+            slices = []
+            for box, info in zip(boxes, infos):
+                strip = img.crop(box)
+                strip.info.update(info)
+                slices.append(strip)
             
-        return {"images": slices}
+        return {"images": slices, "tiles": Items(slices)}
 
 class StitchPanorama(Node):
+    """
+    Склеивает список изображений. layout: "vertical" | "horizontal" | "grid" (columns столбцов, 0 - авто).
+    Режим результата - общий режим входов (без принудительного перевода в RGB).
+    """
     INPUT_TYPES = {"images": "List[Image]"}
     OUTPUT_TYPES = {"image": "Image"}
-    PARAMETERS = {}
+    PARAMETERS = {"layout": str, "columns": int}
+    RESOURCES = {"memory_per_mpx": 8} # холст и копии плиток в режиме холста
+    DETERMINISTIC = True
+    COST = 2.0 # склейка ждет все плитки и обычно самая долгая задача запуска
 
     def execute(self, **inputs) -> Dict[str, Any]:
         images = inputs.get("images")
         if not images:
             raise ValueError("No images to stitch")
-            
-        print(f"Stitching {len(images)} images")
-        
-        w = max(img.width for img in images)
-        h = sum(img.height for img in images)
-        
-        result = Image.new('RGB', (w, h))
-        y_offset = 0
-        for img in images:
-            result.paste(img, (0, y_offset))
-            y_offset += img.height
-            
+
+        layout = self.params.get("layout", "vertical")
+        print(f"Stitching {len(images)} images ({layout})")
+        result = stitch(images, layout, self.params.get("columns", 0))
         return {"image": result}
 
+class StreamStitch(Node):
+    """
+    Потоковая склейка полос от SliceImage (выход tiles): каждая полоса записывается
+    в холст сразу по прибытии, результат выдается после последней полосы.
+    Полосы нескольких изображений могут приходить вперемешку (например, после параллельной обработки),
+    поэтому для каждого исходного изображения (info["tile_source"]) ведется свой холст.
+    Холсты хранятся в состоянии узла, поэтому узел выполняется в главном процессе (INLINE).
+    """
+    INPUT_TYPES = {"tile": "Image"}
+    OUTPUT_TYPES = {"image": "Image"}
+    PARAMETERS = {}
+    INLINE = True
+    RESOURCES = {"cpu": 0} # выполняется в главном процессе и не занимает воркер
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.canvases: Dict[str, StitchCanvas] = {}
+
+    def execute(self, **inputs) -> Dict[str, Any]:
+        tile = inputs.get("tile")
+        source = tile.info.get("tile_source", "")
+        canvas = self.canvases.get(source)
+        if canvas is None:
+            canvas = self.canvases[source] = StitchCanvas.for_tile(tile)
+        if not canvas.add(tile):
+            return {}
+
+        print(f"Stitched {canvas.count} tiles")
+        del self.canvases[source]
+        return {"image": canvas.image()}
+
 class CollectImages(Node):
     """
     Собирает изображения в список. 
@@ -166,8 +300,11 @@ class CollectImages(Node):
             
             if val is None:
                 continue
-                
-            if isinstance(val, list):
+
+            if isinstance(val, list) and not images and self.owns_input(key):
+                # Собственный список дополняем на месте вместо копирования
+                images = val
+            elif isinstance(val, list):
                 images.extend(val)
             else:
                 images.append(val)
@@ -186,6 +323,8 @@ class LoopMerge(Node):
     OUTPUT_TYPES = {"value": "Any", "final_value": "Any"}
     PARAMETERS = {"iterations": int}
     INPUT_STRATEGY = "ANY"
+    CONCURRENCY_LEVEL = 1 # счетчик итераций хранится в состоянии узла
+    THREAD_SAFE = False
 
     def __init__(self, node_id, params=None):
         super().__init__(node_id, params)
@@ -233,9 +372,12 @@ class LoopMerge(Node):
         return {"value": val}
 
 class ImageQualityMetric(Node):
-    INPUT_TYPES = {"image": "Image"}
+    INPUT_TYPES = {"image": "Image|Array"}
     OUTPUT_TYPES = {"quality": "float"}
     PARAMETERS = {"metric": str} # "sharpness" or "entropy"
+    DETERMINISTIC = True
+    FUSABLE = True
+    MAX_BATCH = 8 # дешевый расчет: при длинной очереди несколько изображений за задачу
 
     def execute(self, **inputs) -> Dict[str, Any]:
         img = inputs.get("image")
@@ -244,6 +386,9 @@ class ImageQualityMetric(Node):
         
         quality = 0.0
         
+        if isinstance(img, np.ndarray) and not (metric_name == "entropy" and img.ndim == 2):
+            img = Image.fromarray(img)
+
         if metric_name == "sharpness":
 
             gray = img.convert('L')
@@ -257,7 +402,10 @@ class ImageQualityMetric(Node):
             
         elif metric_name == "entropy":
             if HAS_SKIMAGE:
-                quality = shannon_entropy(np.array(img.convert('L')))
+                from skimage.measure import shannon_entropy
+                # Массив в оттенках серого используется как есть, без преобразования в Image
+                gray = img if isinstance(img, np.ndarray) else np.array(img.convert('L'))
+                quality = shannon_entropy(gray)
             else:
                 print("Warning: skimage not found, returning 0 for entropy")
                 quality = 0.0
@@ -286,15 +434,20 @@ class SelectBest(Node):
         else:
             return {"image": img2}
 
+# Реестр классов для кода, которому нужны реализации сразу. Редактор и CLI используют nodes.registry,
+# где те же узлы зарегистрированы без импорта этого модуля.
 NODE_REGISTRY = {
     "LoadImage": LoadImage,
     "SaveImage": SaveImage,
+    "ListImages": ListImages,
+    "DecodeImage": DecodeImage,
     "GaussianBlur": GaussianBlur,
     "Grayscale": Grayscale,
     "BlendImages": BlendImages,
     "ConvertToJPG": ConvertToJPG,
     "SliceImage": SliceImage,
     "StitchPanorama": StitchPanorama,
+    "StreamStitch": StreamStitch,
     "CollectImages": CollectImages,
     "ImageQualityMetric": ImageQualityMetric,
     "SelectBest": SelectBest,
@@ -0,0 +1,84 @@
+"""
+Реестр встроенных узлов с ленивой загрузкой (core.registry.NodeRegistry).
+
+Здесь объявлены только порты и параметры узлов, поэтому импорт модуля не загружает numpy, PIL и реализации:
+редактор строит библиотеку узлов и формы параметров по этим описаниям, а nodes.image_nodes импортируется
+при первом построении графа для запуска. При загрузке класса описание сверяется с его атрибутами.
+"""
+import os
+from typing import Iterable
+
+from core.registry import NodeRegistry
+
+NODE_REGISTRY = NodeRegistry()
+
+NODE_REGISTRY.add_lazy("LoadImage", "nodes.image_nodes:LoadImage",
+                       inputs={},
+                       outputs={"image": "Image"},
+                       parameters={"path": str})
+NODE_REGISTRY.add_lazy("SaveImage", "nodes.image_nodes:SaveImage",
+                       inputs={"image": "Any"},
+                       outputs={},
+                       parameters={"path_prefix": str, "format": str})
+NODE_REGISTRY.add_lazy("ListImages", "nodes.image_nodes:ListImages",
+                       inputs={},
+                       outputs={"path": "Path"},
+                       parameters={"directory": str, "pattern": str})
+NODE_REGISTRY.add_lazy("DecodeImage", "nodes.image_nodes:DecodeImage",
+                       inputs={"path": "Path"},
+                       outputs={"image": "Image"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("GaussianBlur", "nodes.image_nodes:GaussianBlur",
+                       inputs={"image": "Image"},
+                       outputs={"image": "Image"},
+                       parameters={"radius": float})
+NODE_REGISTRY.add_lazy("Grayscale", "nodes.image_nodes:Grayscale",
+                       inputs={"image": "Image"},
+                       outputs={"image": "Image"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("BlendImages", "nodes.image_nodes:BlendImages",
+                       inputs={"image_a": "Image", "image_b": "Image"},
+                       outputs={"image": "Image"},
+                       parameters={"alpha": float})
+NODE_REGISTRY.add_lazy("ConvertToJPG", "nodes.image_nodes:ConvertToJPG",
+                       inputs={"image": "Image"},
+                       outputs={"image": "Image"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("SliceImage", "nodes.image_nodes:SliceImage",
+                       inputs={"image": "Image"},
+                       outputs={"images": "List[Image]", "tiles": "Image"},
+                       parameters={"num_slices": int})
+NODE_REGISTRY.add_lazy("StitchPanorama", "nodes.image_nodes:StitchPanorama",
+                       inputs={"images": "List[Image]"},
+                       outputs={"image": "Image"},
+                       parameters={"layout": str, "columns": int})
+NODE_REGISTRY.add_lazy("StreamStitch", "nodes.image_nodes:StreamStitch",
+                       inputs={"tile": "Image"},
+                       outputs={"image": "Image"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("CollectImages", "nodes.image_nodes:CollectImages",
+                       inputs={"input_1": "Image|List[Image]", "input_2": "Image|List[Image]"},
+                       outputs={"images": "List[Image]"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("ImageQualityMetric", "nodes.image_nodes:ImageQualityMetric",
+                       inputs={"image": "Image|Array"},
+                       outputs={"quality": "float"},
+                       parameters={"metric": str})
+NODE_REGISTRY.add_lazy("SelectBest", "nodes.image_nodes:SelectBest",
+                       inputs={"image_1": "Image", "quality_1": "float", "image_2": "Image", "quality_2": "float"},
+                       outputs={"image": "Image"},
+                       parameters={})
+NODE_REGISTRY.add_lazy("LoopMerge", "nodes.image_nodes:LoopMerge",
+                       inputs={"initial": "Any", "loop_back": "Any"},
+                       outputs={"value": "Any", "final_value": "Any"},
+                       parameters={"iterations": int})
+
+def load_plugins(modules: Iterable[str] = ()):
+    """
+    Подключает к NODE_REGISTRY внешние пакеты узлов: из entry points "dataflow.nodes" установленных пакетов,
+    из переменной окружения DATAFLOW_PLUGINS (модули через запятую) и modules.
+    """
+    NODE_REGISTRY.load_entry_points()
+    names = [name.strip() for name in os.environ.get("DATAFLOW_PLUGINS", "").split(",")]
+    for name in [name for name in names if name] + list(modules):
+        NODE_REGISTRY.load_plugin(name)
@@ -0,0 +1,122 @@
+import math
+import numpy as np
+from PIL import Image
+from typing import List, Tuple
+
+LAYOUTS = ("vertical", "horizontal", "grid")
+
+def common_mode(images: List[Image.Image]) -> str:
+    """
+    Режим холста для набора изображений: общий режим, если он у всех одинаковый,
+    иначе наименьший режим, вмещающий все (L, RGB или RGBA). Палитры не объединяются.
+    """
+    modes = {img.mode for img in images}
+    if len(modes) == 1 and "P" not in modes and "PA" not in modes:
+        return modes.pop()
+    if any("A" in img.getbands() or "transparency" in img.info for img in images):
+        return "RGBA"
+    if modes <= {"1", "L"}:
+        return "L"
+    return "RGB"
+
+def grid_layout(sizes: List[Tuple[int, int]], layout: str = "vertical", columns: int = 0):
+    """
+    Раскладывает плитки по сетке. vertical - один столбец, horizontal - одна строка,
+    grid - columns столбцов (0 - примерно квадратная сетка).
+    Ширина столбца и высота строки равны наибольшей плитке в них.
+    Returns: ((ширина холста, высота холста), [(x, y) для каждой плитки])
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}. Expected one of {LAYOUTS}")
+    count = len(sizes)
+    if layout == "vertical":
+        columns = 1
+    elif layout == "horizontal":
+        columns = count
+    elif columns <= 0:
+        columns = math.ceil(math.sqrt(count))
+    columns = max(1, min(columns, count))
+    rows = math.ceil(count / columns)
+
+    col_widths, row_heights = [0] * columns, [0] * rows
+    for index, (width, height) in enumerate(sizes):
+        row, col = divmod(index, columns)
+        col_widths[col] = max(col_widths[col], width)
+        row_heights[row] = max(row_heights[row], height)
+
+    col_x = np.concatenate(([0], np.cumsum(col_widths))).tolist()
+    row_y = np.concatenate(([0], np.cumsum(row_heights))).tolist()
+    offsets = [(col_x[index % columns], row_y[index // columns]) for index in range(count)]
+    return (col_x[-1], row_y[-1]), offsets
+
+def _allocate(mode: str, size: Tuple[int, int]) -> np.ndarray:
+    # Форма и тип элементов берутся у пустого изображения нужного режима (uint8, int32, float32, bool...)
+    sample = np.asarray(Image.new(mode, (1, 1)))
+    width, height = size
+    return np.zeros((height, width) + sample.shape[2:], dtype=sample.dtype)
+
+def _to_image(buffer: np.ndarray, mode: str) -> Image.Image:
+    img = Image.fromarray(buffer)
+    if img.mode != mode:
+        # Режимы с одинаковой формой массива (например, CMYK и RGBA) различаются только по имени
+        img = Image.frombytes(mode, img.size, buffer.tobytes())
+    return img
+
+def _pixels(img: Image.Image, mode: str) -> np.ndarray:
+    return np.asarray(img if img.mode == mode else img.convert(mode))
+
+def stitch(images: List[Image.Image], layout: str = "vertical", columns: int = 0) -> Image.Image:
+    """
+    Склеивает изображения в одном заранее выделенном буфере: каждая плитка копируется
+    одним векторным присваиванием, режим холста - common_mode().
+    """
+    if not images:
+        raise ValueError("No images to stitch")
+    mode = common_mode(images)
+    size, offsets = grid_layout([img.size for img in images], layout, columns)
+    canvas = _allocate(mode, size)
+    for img, (x, y) in zip(images, offsets):
+        canvas[y:y + img.height, x:x + img.width] = _pixels(img, mode)
+    return _to_image(canvas, mode)
+
+def tile_info(index: int, count: int, box: Tuple[int, int, int, int], canvas_size: Tuple[int, int],
+              source: str = "") -> dict:
+    """
+    Метаданные плитки (хранятся в img.info), по которым StitchCanvas собирает исходное изображение.
+    source - идентификатор исходного изображения: плитки разных изображений могут приходить вперемешку.
+    """
+    return {"tile_index": index, "tile_count": count, "tile_box": tuple(box), "tile_canvas": tuple(canvas_size),
+            "tile_source": source}
+
+class StitchCanvas:
+    """
+    Потоковая сборка: холст выделяется по первой плитке, остальные записываются
+    на свои места (info["tile_box"]) по мере поступления, в любом порядке.
+    """
+    def __init__(self, size: Tuple[int, int], mode: str, count: int):
+        self.size = size
+        self.mode = mode
+        self.count = count
+        self.buffer = _allocate(mode, size)
+        self.received = set()
+
+    @classmethod
+    def for_tile(cls, tile: Image.Image) -> "StitchCanvas":
+        if "tile_box" not in tile.info:
+            raise ValueError("Tile has no placement info (tile_box); produce tiles with SliceImage")
+        mode = tile.mode if tile.mode not in ("P", "PA") else "RGBA"
+        return cls(tile.info["tile_canvas"], mode, tile.info["tile_count"])
+
+    def add(self, tile: Image.Image) -> bool:
+        """Записывает плитку. Returns: True, если получены все плитки."""
+        left, upper, right, lower = tile.info["tile_box"]
+        self.buffer[upper:lower, left:right] = _pixels(tile, self.mode)
+        self.received.add(tile.info["tile_index"])
+        return self.complete
+
+    @property
+    def complete(self) -> bool:
+        return len(self.received) >= self.count
+
+    def image(self) -> Image.Image:
+        return _to_image(self.buffer, self.mode)
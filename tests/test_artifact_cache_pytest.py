@@ -0,0 +1,111 @@
+import os
+import sys
+from typing import Dict, Any
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.artifact_cache import ArtifactCache
+from src.core.payloads import SharedBlock, share_image_rows
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(3))}
+
+
+class Scale(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {"factor": int}
+    DETERMINISTIC = True
+
+    def execute(self, value):
+        return {"value": value * self.params.get("factor", 2)}
+
+
+class Collect(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.values = []
+
+    def execute(self, value):
+        self.values.append(value)
+        return {}
+
+
+REGISTRY = {"Numbers": Numbers, "Scale": Scale, "Collect": Collect}
+
+
+def _run(cache: ArtifactCache, factor: int = 2):
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"},
+                  {"id": "a", "type": "Scale", "params": {"factor": factor}},
+                  {"id": "b", "type": "Scale", "params": {"factor": 10}},
+                  {"id": "sink", "type": "Collect"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "a", "to_input": "value"},
+                  {"from_node": "a", "from_output": "value", "to_node": "b", "to_input": "value"},
+                  {"from_node": "b", "from_output": "value", "to_node": "sink", "to_input": "value"}],
+    })
+    executor = Executor(graph, max_workers=2, cache=cache)
+    assert executor.run() == "finished"
+    cached = executor.metrics.get("executor_cache_total")
+    return sorted(executor.graph.nodes["sink"].values), cached.value(result="hit"), cached.value(result="miss")
+
+
+def test_second_run_takes_results_from_cache(tmp_path):
+    assert _run(ArtifactCache(str(tmp_path))) == ([0, 20, 40], 0, 6)
+    # Новый экземпляр кэша (как в другом процессе или сессии) видит те же записи
+    cache = ArtifactCache(str(tmp_path))
+    assert _run(cache) == ([0, 20, 40], 6, 0)
+    assert cache.stats()["entries"] == 6
+    # Другие параметры - другие ключи, в том числе у потребителей измененного узла
+    assert _run(cache, factor=3) == ([0, 30, 60], 0, 6)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=300 * 1024)
+    block = np.zeros(100 * 1024, dtype=np.uint8)
+    cache.put("aa01", {"value": block})
+    cache.put("aa02", {"value": block})
+    os.utime(cache._path("aa01"), (0, 0))
+    assert cache.get("aa02")["value"].nbytes == block.nbytes
+    cache.put("aa03", {"value": block})
+
+    assert cache.get("aa01") is None
+    assert cache.get("aa03") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 300 * 1024
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_shared_strips_are_keyed_by_producer_not_hashed(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    executor = Executor(Graph(REGISTRY), max_workers=1, cache=cache)
+    node = Scale("a", {})
+    strip = share_image_rows(Image.new("L", (4, 4)), [(0, 2)])[0]
+    try:
+        # Источник без ключа: полосы не загружаются в планировщик, задача идет без кэша
+        assert executor._cache_key(node, {"value": strip}) is None
+        executor._value_keys[id(strip)] = ["producer/value/0/None", 1]
+        assert executor._cache_key(node, {"value": strip}) == cache.key(node, {"value": "producer/value/0/None"})
+    finally:
+        SharedBlock(strip.name).release()
@@ -0,0 +1,73 @@
+import os
+import sys
+import asyncio
+import concurrent.futures
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+
+
+class Source(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {"value": int}
+
+    def execute(self, **inputs):
+        return {"out": self.params.get("value", 1)}
+
+
+class Double(Node):
+    INPUT_TYPES: Dict[str, Any] = {"x": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": inputs["x"] * 2}
+
+
+REGISTRY = {"Source": Source, "Double": Double}
+
+
+def build_chain(value):
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "Source", "params": {"value": value}},
+            {"id": "double", "type": "Double", "params": {}},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "out", "to_node": "double", "to_input": "x"},
+        ],
+    })
+    return graph
+
+
+def test_events_stream_node_outputs_in_order():
+    executor = Executor(build_chain(3), max_workers=1, timeout=5)
+
+    async def collect():
+        return [event async for event in executor.events()]
+
+    events = asyncio.run(collect())
+
+    completed = [e for e in events if e.status == "completed"]
+    assert [e.node_id for e in completed] == ["src", "double"]
+    assert completed[-1].outputs == {"out": 6}
+    assert executor.outcome == "finished"
+
+
+def test_concurrent_runs_share_one_pool():
+    async def run_all(pool):
+        executors = [Executor(build_chain(v), max_workers=2, timeout=5, backend=pool) for v in range(4)]
+        return await asyncio.gather(*(e.run_async() for e in executors))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+        outcomes = asyncio.run(run_all(pool))
+
+    assert outcomes == ["finished"] * 4
@@ -0,0 +1,104 @@
+import os
+import sys
+from typing import Dict, Any, List
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(40))}
+
+
+class Square(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int", "batch": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    MAX_BATCH = 4
+
+    def execute(self, value):
+        return {"value": value * value, "batch": 1}
+
+    def execute_batch(self, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{"value": inputs["value"] ** 2, "batch": len(inputs_list)} for inputs in inputs_list]
+
+
+class Negate(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    MAX_BATCH = 8
+
+    def execute(self, value):
+        if self.params.get("fail"):
+            raise ValueError("negate failed")
+        return {"value": -value}
+
+
+class Collect(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.values = []
+
+    def execute(self, value):
+        self.values.append(value)
+        return {}
+
+
+NODE_TYPES = {"Numbers": Numbers, "Square": Square, "Negate": Negate, "Collect": Collect}
+
+
+def _graph(node_type: str, port: str = "value", params: Dict[str, Any] = None):
+    graph = Graph(NODE_TYPES)
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}, {"id": "op", "type": node_type, "params": params or {}},
+                  {"id": "sink", "type": "Collect"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "op", "to_input": "value"},
+                  {"from_node": "op", "from_output": port, "to_node": "sink", "to_input": "value"}],
+    })
+    return graph
+
+
+def test_queued_inputs_run_as_batches():
+    graph = _graph("Square")
+    statuses = []
+    executor = Executor(graph, max_workers=1)
+    assert executor.run(status_callback=lambda node_id, s: statuses.append(s) if node_id == "op" else None) == "finished"
+
+    assert sorted(graph.nodes["sink"].values) == [i * i for i in range(40)]
+    assert statuses.count("running") == 40 and statuses.count("completed") == 40
+    batches = executor.metrics.get("executor_batch_size").value(node_type="Square")
+    assert batches["count"] == 10 and batches["sum"] == 40
+
+    # Не больше значений на задачу, чем приходится на воркер: 40 / 20 -> 2
+    graph = _graph("Square", port="batch")
+    Executor(graph, max_workers=20).run()
+    assert len(graph.nodes["sink"].values) == 40 and max(graph.nodes["sink"].values) == 2
+
+
+def test_default_execute_batch_and_batch_errors():
+    graph = _graph("Negate")
+    executor = Executor(graph, max_workers=1)
+    assert executor.run() == "finished"
+    assert sorted(graph.nodes["sink"].values) == [-i for i in reversed(range(40))]
+    assert executor.metrics.get("executor_batch_size").value(node_type="Negate")["count"] == 5
+
+    graph = _graph("Negate", params={"fail": True})
+    executor = Executor(graph, max_workers=4)
+    assert executor.run() == "finished"
+    assert executor.metrics.get("executor_tasks_total").value(node_type="Negate", status="error") == 40
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import threading
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.backends import LocalProcessBackend
+from src.core.job_server import JobServer
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {"count": int}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(self.params.get("count", 3)))}
+
+
+class Hang(Node):
+    """Зависает (без проверок срока) на значении hang, остальные значения обрабатывает сразу."""
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {"hang": int}
+
+    def execute(self, value):
+        if value == self.params.get("hang", 0):
+            time.sleep(60)
+        return {"value": value}
+
+
+class Polite(Node):
+    """Долгий цикл, который сам проверяет срок задачи."""
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    TIMEOUT = 0.3
+
+    def execute(self, **inputs):
+        while True:
+            self.check_deadline()
+            time.sleep(0.01)
+
+
+REGISTRY = {"Numbers": Numbers, "Hang": Hang, "Polite": Polite}
+
+
+def _graph_data(hang: int, timeout=None, count: int = 3) -> Dict[str, Any]:
+    node = {"id": "hang", "type": "Hang", "params": {"hang": hang}}
+    if timeout is not None:
+        node["timeout"] = timeout
+    return {
+        "nodes": [{"id": "src", "type": "Numbers", "params": {"count": count}}, node],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "hang", "to_input": "value"}],
+    }
+
+
+def _graph(hang: int, timeout=None, count: int = 3) -> Graph:
+    graph = Graph(REGISTRY)
+    graph.load_from_json(_graph_data(hang, timeout, count))
+    return graph
+
+
+def test_hung_task_is_stopped_and_others_finish():
+    statuses = []
+    with LocalProcessBackend(max_workers=2) as backend:
+        executor = Executor(_graph(0, timeout=0.5), backend=backend, kill_grace=0.2)
+        started = time.time()
+        outcome = executor.run(status_callback=lambda node_id, status: statuses.append((node_id, status)))
+        elapsed = time.time() - started
+        assert backend.recycles == 1
+
+    assert outcome == "finished"
+    assert elapsed < 15
+    assert statuses.count(("hang", "error")) == 1
+    assert statuses.count(("hang", "completed")) == 2
+    assert executor.metrics.get("executor_tasks_terminated_total").value(reason="timeout") == 1
+
+
+def test_node_checks_its_own_deadline():
+    graph = Graph(REGISTRY)
+    graph.load_from_json({"nodes": [{"id": "p", "type": "Polite"}]})
+    with LocalProcessBackend(max_workers=1) as backend:
+        errors = []
+        executor = Executor(graph, backend=backend, kill_grace=5.0)
+        executor.run(status_callback=lambda node_id, status: errors.append(status))
+        # Узел завершился сам, пул не пришлось заменять
+        assert backend.recycles == 0
+    assert errors == ["running", "error"]
+
+
+def test_cancel_stops_the_run():
+    executor = Executor(_graph(0, count=1))
+    timer = threading.Timer(0.5, executor.cancel)
+    timer.start()
+    started = time.time()
+    outcome = executor.run()
+    timer.join()
+
+    assert outcome == "cancelled"
+    assert time.time() - started < 15
+    assert not executor._has_pending_data()
+    assert executor.budget.tasks == 0
+
+
+def test_error_in_status_callback_releases_the_run():
+    def fail_on_start(node_id, status):
+        if node_id == "hang" and status == "running":
+            raise RuntimeError("handler failed")
+
+    executor = Executor(_graph(-1, count=4), max_workers=2)
+    with pytest.raises(RuntimeError):
+        executor.run(status_callback=fail_on_start)
+    # Ресурсы и задачи прерванного запуска освобождены: исполнитель можно запустить снова
+    assert executor.budget.tasks == 0 and not executor.active_tasks
+    assert executor.run() == "finished"
+
+
+def test_job_server_cancels_one_job():
+    with JobServer(REGISTRY, max_workers=2) as server:
+        hung = server.submit(_graph_data(0, count=2))
+        other = server.submit(_graph_data(-1, count=2))
+        time.sleep(0.5)
+        server.cancel(hung)
+        assert server.wait(hung, timeout=15).status == "cancelled"
+        assert server.wait(other, timeout=15).status == "finished"
+    assert server.budget.tasks == 0
+
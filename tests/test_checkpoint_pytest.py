@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(1, 7))}
+
+
+class Total(Node):
+    """Накапливает сумму и число значений в состоянии узла."""
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.total = 0
+        self.count = 0
+
+    def execute(self, value):
+        time.sleep(0.05)
+        self.total += value
+        self.count += 1
+        return {}
+
+
+REGISTRY = {"Numbers": Numbers, "Total": Total}
+
+
+def _graph() -> Graph:
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}, {"id": "sum", "type": "Total"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "sum", "to_input": "value"}],
+    })
+    return graph
+
+
+def test_cancelled_run_resumes_without_redoing_work(tmp_path):
+    executor = Executor(_graph(), checkpoint_dir=str(tmp_path))
+    completed = []
+
+    def cancel_after_two(node_id, status):
+        if node_id == "sum" and status == "completed":
+            completed.append(node_id)
+            if len(completed) == 2:
+                executor.cancel()
+
+    assert executor.run(status_callback=cancel_after_two) == "cancelled"
+    assert executor.checkpoint.exists()
+    done_before = executor.graph.nodes["sum"].count
+    assert 2 <= done_before < 6
+
+    resumed = Executor(_graph(), checkpoint_dir=str(tmp_path))
+    runs = []
+    assert resumed.run(status_callback=lambda node_id, status: runs.append((node_id, status)), resume=True) == "finished"
+
+    node = resumed.graph.nodes["sum"]
+    assert (node.total, node.count) == (21, 6)
+    # Источник и уже обработанные значения повторно не выполняются
+    assert ("src", "running") not in runs
+    assert runs.count(("sum", "completed")) == 6 - done_before
+    assert not resumed.checkpoint.exists()
+
+
+def test_resume_rejects_checkpoint_of_another_graph(tmp_path):
+    executor = Executor(_graph(), checkpoint_dir=str(tmp_path))
+    executor.run(status_callback=lambda node_id, status: executor.cancel())
+    assert executor.checkpoint.exists()
+
+    other = Graph(REGISTRY)
+    other.load_from_json({"nodes": [{"id": "sum", "type": "Total"}]})
+    with pytest.raises(ValueError):
+        Executor(other, checkpoint_dir=str(tmp_path)).run(resume=True)
+    with pytest.raises(ValueError):
+        Executor(_graph()).run(resume=True)
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import subprocess
+
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+import cli
+from core.checkpoint import Checkpoint
+
+
+def _write_graph(tmp_path):
+    graph_path = os.path.join(str(tmp_path), "graph.json")
+    with open(graph_path, "w") as f:
+        json.dump({
+            "nodes": [{"id": "list", "type": "ListImages", "params": {"directory": "missing", "pattern": "*.png"}},
+                      {"id": "decode", "type": "DecodeImage"},
+                      {"id": "gray", "type": "Grayscale"},
+                      {"id": "save", "type": "SaveImage", "params": {"path_prefix": "unused"}}],
+            "links": [{"from_node": "list", "from_output": "path", "to_node": "decode", "to_input": "path"},
+                      {"from_node": "decode", "from_output": "image", "to_node": "gray", "to_input": "image"},
+                      {"from_node": "gray", "from_output": "image", "to_node": "save", "to_input": "image"}],
+        }, f)
+    return graph_path
+
+
+def test_cli_runs_graph_with_overrides_without_gui_imports(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    for i in range(3):
+        Image.new("RGB", (8, 8), (i, 0, 0)).save(str(images / f"img_{i}.png"))
+    out = tmp_path / "out"
+    out.mkdir()
+    graph_path = _write_graph(tmp_path)
+
+    script = ("import sys; sys.path.insert(0, sys.argv[1]); import cli; "
+              "code = cli.main(sys.argv[2:]); "
+              "print('imported', 'PySide6' in sys.modules, 'skimage' in sys.modules); sys.exit(code)")
+    result = subprocess.run([sys.executable, "-c", script, SRC_ROOT, graph_path, "--input-dir", str(images),
+                             "--set", f"save.path_prefix={out / 'result'}", "--workers", "2"],
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == cli.EXIT_OK, result.stderr
+    assert "imported False False" in result.stdout
+    assert "nodes 4/4" in result.stderr
+    assert "1 run(s)" in result.stderr
+    assert len(os.listdir(str(out))) == 3
+
+
+def test_cli_exit_codes(tmp_path, capsys):
+    graph_path = _write_graph(tmp_path)
+    assert cli.main([graph_path, "--set", "nope.radius=1"]) == cli.EXIT_USAGE
+    assert cli.main([os.path.join(str(tmp_path), "missing.json")]) == cli.EXIT_USAGE
+    # Файл не найден - ошибка в узле DecodeImage
+    assert cli.main([graph_path, "--input", "decode.path=missing.png", "--set", "list.directory=none",
+                     "--quiet", "--workers", "1"]) == cli.EXIT_NODE_ERRORS
+    assert "unknown node 'nope'" in capsys.readouterr().err
+
+
+def test_cli_resume_without_matching_checkpoint(tmp_path, capsys):
+    graph_path = _write_graph(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    assert cli.main([graph_path, "--resume", "--checkpoint", checkpoint_dir, "--quiet"]) == cli.EXIT_USAGE
+    assert "no checkpoint" in capsys.readouterr().err
+
+    Checkpoint(checkpoint_dir).save({"graph": {"other": "Grayscale"}})
+    assert cli.main([graph_path, "--resume", "--checkpoint", checkpoint_dir, "--quiet",
+                     "--workers", "1"]) == cli.EXIT_USAGE
+    assert "different graph" in capsys.readouterr().err
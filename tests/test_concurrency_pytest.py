@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.concurrency import ConcurrencyController
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(4))}
+
+
+class Sequential(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.spans = []
+
+    def execute(self, **inputs):
+        started = time.time()
+        time.sleep(0.05)
+        self.spans.append((started, time.time()))
+        return {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_controller_climbs_reverses_and_backs_off():
+    clock = FakeClock()
+    load = {"value": (0.5, 0.5)}
+    controller = ConcurrencyController(4, max_limit=10, interval=1.0, load_fn=lambda: load["value"], clock=clock)
+
+    def window(completed, saturated=True):
+        for _ in range(completed):
+            controller.record_completion()
+        if saturated:
+            controller.note_saturated()
+        clock.now += 1.0
+        return controller.update()
+
+    assert window(10) == 5
+    assert window(12) == 6
+    assert window(6) == 5          # пропускная способность упала - шаг назад
+    assert window(6, saturated=False) == 5
+    load["value"] = (0.5, 0.05)
+    assert window(6) == 2          # мало памяти - лимит вдвое меньше
+    load["value"] = (1.0, 0.5)
+    assert window(20) == 2         # CPU загружен полностью - не растем
+
+
+def test_concurrency_level_serializes_stateful_node():
+    graph = Graph({"Numbers": Numbers, "Sequential": Sequential})
+    graph.load_from_json({
+        "nodes": [{"id": "numbers", "type": "Numbers"}, {"id": "seq", "type": "Sequential"}],
+        "links": [{"from_node": "numbers", "from_output": "value", "to_node": "seq", "to_input": "value"}],
+    })
+    executor = Executor(graph, max_workers=4, timeout=5, adaptive=True)
+    assert executor.run() == "finished"
+
+    spans = sorted(graph.nodes["seq"].spans)
+    assert len(spans) == 4
+    assert all(previous[1] <= following[0] for previous, following in zip(spans, spans[1:]))
@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+import threading
 from typing import Dict, Any, List
 
 import pytest
@@ -276,6 +277,21 @@ def test_errors_from_nodes_stop_downstream_and_are_logged(capsys):
     assert "Error executing node" in out
 
 
+def test_unpicklable_input_fails_only_its_task(capsys):
+    graph = build_graph({
+        "nodes": [{"id": "src", "type": "Source", "params": {}}, {"id": "sink", "type": "Sink", "params": {}}],
+        "links": [{"from_node": "src", "from_output": "out", "to_node": "sink", "to_input": "value"}],
+    })
+    executor = Executor(graph, max_workers=1, timeout=2)
+
+    assert executor.run(initial_inputs={"sink": {"value": threading.Lock()}}) == "finished"
+
+    out, err = capsys.readouterr()
+    assert "Error executing node sink" in out
+    assert graph.get_node("sink").received == 1 # следующее значение обработано как обычно
+    assert not executor._shared
+
+
 def test_deadlock_detection_when_data_waits_without_ready_nodes(capsys):
     graph_data = {
         "nodes": [
@@ -0,0 +1,68 @@
+import os
+import sys
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.payloads import SharedValue
+from src.core.shm import attach_block
+
+PAYLOAD = bytes(range(256)) * 1024
+
+
+class Source(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "bytes"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": PAYLOAD}
+
+
+class Sink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "bytes"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        self.received = inputs["value"] == PAYLOAD
+        return {}
+
+
+def test_fanout_value_is_shared_once_and_released(monkeypatch):
+    graph = Graph({"Source": Source, "Sink": Sink})
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Source", "params": {}}]
+                 + [{"id": f"sink{i}", "type": "Sink", "params": {}} for i in range(3)],
+        "links": [
+            {"from_node": "src", "from_output": "out", "to_node": f"sink{i}", "to_input": "value"}
+            for i in range(3)
+        ],
+    })
+    created = []
+    original_init = SharedValue.__init__
+
+    def tracking_init(self, value):
+        original_init(self, value)
+        created.append(self.name)
+
+    monkeypatch.setattr(SharedValue, "__init__", tracking_init)
+    executor = Executor(graph, max_workers=2, timeout=5)
+    assert executor.run() == "finished"
+
+    assert all(graph.nodes[f"sink{i}"].received for i in range(3))
+    assert len(created) == 1
+    saved = executor.metrics.get("executor_fanout_bytes_saved_total").value()
+    assert saved >= 2 * len(PAYLOAD)
+    assert executor._shared == {}
+    try:
+        attach_block(created[0]).close()
+        leaked = True
+    except FileNotFoundError:
+        leaked = False
+    assert not leaked
@@ -0,0 +1,87 @@
+import os
+import sys
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.incremental import IncrementalSession
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(3))}
+
+
+class Scale(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {"factor": int}
+
+    def execute(self, value):
+        return {"value": value * self.params.get("factor", 1)}
+
+
+class Collect(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.values = []
+
+    def execute(self, value):
+        self.values.append(value)
+        return {}
+
+
+REGISTRY = {"Numbers": Numbers, "Scale": Scale, "Collect": Collect}
+
+
+def _graph_data(factor: int) -> Dict[str, Any]:
+    return {
+        "nodes": [{"id": "src", "type": "Numbers"},
+                  {"id": "a", "type": "Scale", "params": {"factor": 2}},
+                  {"id": "b", "type": "Scale", "params": {"factor": factor}},
+                  {"id": "sink", "type": "Collect"},
+                  {"id": "side", "type": "Collect"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "a", "to_input": "value"},
+                  {"from_node": "a", "from_output": "value", "to_node": "b", "to_input": "value"},
+                  {"from_node": "b", "from_output": "value", "to_node": "sink", "to_input": "value"},
+                  {"from_node": "a", "from_output": "value", "to_node": "side", "to_input": "value"}],
+    }
+
+
+def _run(session: IncrementalSession, graph_data, dirty=None):
+    started = []
+
+    def on_status(node_id, status):
+        if status == "running":
+            started.append(node_id)
+
+    return session.run(graph_data, dirty, status_callback=on_status), started
+
+
+def test_only_changed_nodes_and_their_consumers_run():
+    session = IncrementalSession(REGISTRY, max_workers=2)
+    outcome, started = _run(session, _graph_data(10))
+    assert outcome == "finished"
+    assert set(started) == {"src", "a", "b", "sink", "side"}
+
+    outcome, started = _run(session, _graph_data(100), dirty={"b"})
+    assert outcome == "finished"
+    assert sorted(started) == ["b", "b", "b", "sink", "sink", "sink"]
+
+    # Ничего не изменилось - ничего не выполняется
+    assert _run(session, _graph_data(100), dirty=set()) == ("finished", [])
+    # Выходы прошлых запусков сохраняются и для невыполнявшихся узлов
+    assert sorted(outputs["value"] for outputs in session.outputs["b"]) == [0, 200, 400]
+    assert [outputs["value"] for outputs in session.outputs["src"]] == [Items(range(3))]
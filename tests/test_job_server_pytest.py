@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import concurrent.futures
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.job_server import Job, JobServer
+
+
+class Source(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": 1}
+
+
+class Sink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.received = None
+
+    def execute(self, **inputs):
+        self.received = inputs.get("value")
+        return {}
+
+
+REGISTRY = {"Source": Source, "Sink": Sink}
+
+CHAIN = {
+    "nodes": [
+        {"id": "src", "type": "Source", "params": {}},
+        {"id": "sink", "type": "Sink", "params": {}},
+    ],
+    "links": [
+        {"from_node": "src", "from_output": "out", "to_node": "sink", "to_input": "value"},
+    ],
+}
+
+
+def test_jobs_run_on_shared_pool_and_report_latency():
+    with JobServer(REGISTRY, max_workers=2, timeout=5) as server:
+        job_ids = [server.submit(json.dumps(CHAIN), priority=p) for p in (1, 2, 3)]
+        jobs = [server.wait(job_id, timeout=10) for job_id in job_ids]
+
+    for job in jobs:
+        assert job.status == "finished"
+        assert job.tasks_completed == 2
+        assert job.latency >= job.queue_time >= 0
+        assert job.executor.graph.get_node("sink").received == 1
+
+    stats = server.stats()
+    assert set(stats) == set(job_ids)
+    assert stats[job_ids[0]]["latency"] is not None
+
+
+def test_invalid_graph_is_rejected_without_stopping_server():
+    with JobServer(REGISTRY, max_workers=1, timeout=5) as server:
+        bad_id = server.submit({"nodes": [{"id": "x", "type": "Missing"}], "links": []})
+        good_id = server.submit(CHAIN)
+
+        assert server.wait(bad_id, timeout=10).status == "error"
+        assert server.wait(good_id, timeout=10).status == "finished"
+
+
+def test_fair_share_prefers_least_loaded_job_per_priority():
+    server = JobServer(REGISTRY, max_workers=1, backend=object())
+    low = Job("low", CHAIN, priority=1)
+    high = Job("high", CHAIN, priority=4)
+    for job in (low, high):
+        job.ready.append(("src", {}))
+    server._active = [low, high]
+
+    low.running, high.running = 1, 3
+    assert server._pick_job() is high
+
+    high.running = 5
+    assert server._pick_job() is low
+
+    with pytest.raises(ValueError):
+        Job("zero", CHAIN, priority=0)
+
+
+class FlakyBackend(concurrent.futures.ThreadPoolExecutor):
+    """Отказывает в отправке задач узла sink первого задания."""
+    def submit(self, fn, /, *args, **kwargs):
+        node = args[0]
+        if node.node_id == "sink" and node.params.get("fail"):
+            raise RuntimeError("backend rejected the task")
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_failure_in_one_job_does_not_stop_the_server():
+    broken = json.loads(json.dumps(CHAIN))
+    broken["nodes"][1]["params"] = {"fail": True}
+    with FlakyBackend(max_workers=2) as backend:
+        with JobServer(REGISTRY, max_workers=2, timeout=5, backend=backend) as server:
+            failed_id = server.submit(broken)
+            ok_id = server.submit(CHAIN)
+            failed = server.wait(failed_id, timeout=10)
+            ok = server.wait(ok_id, timeout=10)
+            assert server._thread.is_alive()
+
+    assert failed.status == "error"
+    assert "rejected" in str(failed.error)
+    assert ok.status == "finished"
+
+
+class SlowSource(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        time.sleep(0.3)
+        return {"out": 1}
+
+
+def test_source_waiting_for_shared_budget_is_not_skipped():
+    graph = {"nodes": [{"id": "src", "type": "SlowSource"}, {"id": "sink", "type": "Sink"}],
+             "links": [{"from_node": "src", "from_output": "out", "to_node": "sink", "to_input": "value"}]}
+    with JobServer({"SlowSource": SlowSource, "Sink": Sink}, max_workers=2, timeout=5, resources={"cpu": 1}) as server:
+        first = server.submit(graph)
+        second = server.submit(graph, priority=100)
+        jobs = [server.wait(job_id, timeout=10) for job_id in (first, second)]
+
+    for job in jobs:
+        assert job.status == "finished" and job.tasks_completed == 2
+        assert job.executor.graph.get_node("sink").received == 1
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": Items(range(6))}
+
+
+class Work(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        time.sleep(0.05)
+        return {}
+
+
+def test_shared_budget_goes_to_high_priority_job():
+    graph = {"nodes": [{"id": "src", "type": "Numbers"}, {"id": "work", "type": "Work"}],
+             "links": [{"from_node": "src", "from_output": "out", "to_node": "work", "to_input": "value"}]}
+    with JobServer({"Numbers": Numbers, "Work": Work}, max_workers=2, timeout=5, resources={"cpu": 1}) as server:
+        low = server.submit(graph)
+        time.sleep(0.1)
+        high = server.submit(graph, priority=100)
+        low_job, high_job = server.wait(low, timeout=10), server.wait(high, timeout=10)
+
+    assert low_job.status == high_job.status == "finished"
+    # Задачи задания с низким приоритетом не занимают бюджет впрок: освободившийся слот достается high
+    assert high_job.finished_at < low_job.finished_at
+
+
+class Square(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    MAX_BATCH = 3
+
+    def execute(self, **inputs):
+        return {"out": inputs["value"] ** 2}
+
+
+def test_job_server_submits_batches_as_one_task():
+    graph = {"nodes": [{"id": "src", "type": "Numbers"}, {"id": "square", "type": "Square"}],
+             "links": [{"from_node": "src", "from_output": "out", "to_node": "square", "to_input": "value"}]}
+    with JobServer({"Numbers": Numbers, "Square": Square}, max_workers=1, timeout=5) as server:
+        job = server.wait(server.submit(graph), timeout=10)
+
+    assert job.status == "finished"
+    assert job.tasks_completed == 3 # источник и два пакета по 3 значения
+    batches = job.executor.metrics.get("executor_batch_size").value(node_type="Square")
+    assert batches["count"] == 2 and batches["sum"] == 6
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import concurrent.futures
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.logs import LEVELS, LogChannel, WorkerLog
+
+
+class Chatty(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        print("step", end=" ")
+        print("one")
+        self.log("careful", level="WARNING")
+        self.log("details", level="DEBUG")
+        return {}
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(8))}
+
+
+class Echo(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, value):
+        print("start", self.node_id, value)
+        time.sleep(0.02)
+        print("end", self.node_id, value)
+        return {}
+
+
+def run_chatty(log_level):
+    graph = Graph({"Chatty": Chatty})
+    graph.load_from_json({"nodes": [{"id": "chatty", "type": "Chatty", "params": {}}], "links": []})
+    batches = []
+    Executor(graph, max_workers=1, timeout=5, log_level=log_level, log_handler=batches.append).run()
+    return [record for batch in batches for record in batch]
+
+
+def test_worker_records_are_structured_and_filtered_by_level():
+    records = run_chatty("INFO")
+    assert [(r.node_id, r.level, r.message) for r in records] == [
+        ("chatty", LEVELS["INFO"], "step one"),
+        ("chatty", LEVELS["WARNING"], "careful"),
+    ]
+
+    records = run_chatty("WARNING")
+    assert [r.message for r in records] == ["careful"]
+
+
+def test_channel_delivers_batches():
+    batches = []
+    channel = LogChannel(batches.append, interval=3600, max_batch=3)
+
+    log = WorkerLog("n")
+    log.write("a\nb\nc\nd")
+    records = log.close()
+
+    channel.publish(records[:1])
+    channel.publish(records[1:3])
+    assert [[r.message for r in batch] for batch in batches] == [["a"]]
+
+    channel.publish(records[3:])
+    assert [[r.message for r in batch] for batch in batches] == [["a"], ["b", "c", "d"]]
+
+
+def test_threads_capture_their_own_output(capsys):
+    graph = Graph({"Numbers": Numbers, "Echo": Echo})
+    echoes = [f"echo{i}" for i in range(4)]
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}] + [{"id": node_id, "type": "Echo"} for node_id in echoes],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": node_id, "to_input": "value"}
+                  for node_id in echoes],
+    })
+    batches = []
+    with concurrent.futures.ThreadPoolExecutor(4) as backend:
+        Executor(graph, max_workers=4, backend=backend, log_handler=batches.append).run()
+    # Каждая запись попала в лог своего узла, ни одна не потерялась
+    records = sorted((record.node_id, record.message) for batch in batches for record in batch)
+    assert records == sorted((node_id, f"{word} {node_id} {i}") for node_id in echoes for i in range(8)
+                             for word in ("start", "end"))
+
+    # Вывод основного процесса после запуска не теряется
+    print("after run")
+    assert "after run" in capsys.readouterr().out
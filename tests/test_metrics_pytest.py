@@ -0,0 +1,86 @@
+import os
+import sys
+import urllib.request
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.metrics import MetricsRegistry
+
+
+class Source(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "bytes"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": b"x" * 100}
+
+
+class Sink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "bytes"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {}
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ("kind",)).inc(2, kind='a"b')
+    registry.gauge("depth", "Depth").set(3)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    text = registry.render_prometheus()
+    assert '# TYPE jobs_total counter' in text
+    assert 'jobs_total{kind="a\\"b"} 2' in text
+    assert 'depth 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_count 2' in text
+
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total", "Jobs")
+    with pytest.raises(ValueError):
+        registry.get("jobs_total").inc(-1, kind="a")
+
+
+def test_executor_records_scheduler_metrics_and_serves_them():
+    graph = Graph({"Source": Source, "Sink": Sink})
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "Source", "params": {}},
+            {"id": "sink", "type": "Sink", "params": {}},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "out", "to_node": "sink", "to_input": "value"},
+        ],
+    })
+    executor = Executor(graph, max_workers=1, timeout=5)
+    executor.run()
+
+    metrics = executor.metrics
+    assert metrics.get("executor_tasks_total").value(node_type="Sink", status="completed") == 1
+    assert metrics.get("executor_queue_depth").value(node="sink", port="value") == 0
+    assert metrics.get("executor_queue_wait_seconds").value(node_type="Sink")["count"] == 1
+    assert metrics.get("executor_node_duration_seconds").value(node_type="Source")["count"] == 1
+    assert metrics.get("executor_payload_bytes_total").value(node_type="Source", direction="out") == 100
+    assert metrics.get("executor_inflight_limit").value() == 2
+
+    server = metrics.serve(port=0)
+    try:
+        host, port = server.server_address[:2]
+        body = urllib.request.urlopen(f"http://{host}:{port}/metrics").read().decode()
+    finally:
+        server.shutdown()
+    assert 'executor_tasks_total{node_type="Source",status="completed"} 1' in body
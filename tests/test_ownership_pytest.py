@@ -0,0 +1,96 @@
+import os
+import sys
+import concurrent.futures
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+from PIL import Image
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+from nodes.image_nodes import BlendImages
+
+
+class Source(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"out": "list"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"out": [1, 2, 3]}
+
+
+class Pair(Node):
+    INPUT_TYPES: Dict[str, Any] = {"a": "list", "b": "list"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        self.owned = sorted(self.inputs_owned)
+        return {}
+
+
+class Single(Node):
+    INPUT_TYPES: Dict[str, Any] = {"a": "list"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        self.owned = sorted(self.inputs_owned)
+        return {}
+
+
+def _build_graph():
+    graph = Graph({"Source": Source, "Pair": Pair, "Single": Single})
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "Source", "params": {}},
+            {"id": "src2", "type": "Source", "params": {}},
+            {"id": "pair", "type": "Pair", "params": {}},
+            {"id": "single", "type": "Single", "params": {}},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "out", "to_node": "pair", "to_input": "a"},
+            {"from_node": "src", "from_output": "out", "to_node": "pair", "to_input": "b"},
+            {"from_node": "src2", "from_output": "out", "to_node": "single", "to_input": "a"},
+        ],
+    })
+    return graph
+
+
+def test_process_backend_owns_all_but_aliased_inputs():
+    graph = _build_graph()
+    Executor(graph, max_workers=2, timeout=5).run()
+    assert graph.nodes["pair"].owned == []
+    assert graph.nodes["single"].owned == ["a"]
+    assert not hasattr(graph.nodes["single"], "_log_sink")
+    assert "inputs_owned" not in vars(graph.nodes["single"])
+
+
+def test_in_process_backend_owns_only_single_consumer_values():
+    graph = _build_graph()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        Executor(graph, max_workers=2, timeout=5, backend=pool).run()
+    assert graph.nodes["pair"].owned == []
+    assert graph.nodes["single"].owned == ["a"]
+
+
+def test_blend_result_does_not_depend_on_ownership():
+    img_a = Image.new("RGB", (4, 4), (0, 0, 0))
+    img_b = Image.new("RGB", (4, 4), (201, 101, 51))
+    node = BlendImages("blend", {"alpha": 0.3})
+    expected = Image.blend(img_a, img_b, 0.3)
+
+    shared_result = node.execute(image_a=img_a, image_b=img_b)["image"]
+    node.inputs_owned = frozenset({"image_a"})
+    owned_result = node.execute(image_a=img_a, image_b=img_b)["image"]
+
+    assert shared_result.tobytes() == owned_result.tobytes() == expected.tobytes()
+    assert img_a.getpixel((0, 0)) == (0, 0, 0)
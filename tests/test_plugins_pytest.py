@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+from core.node import Node, Items
+from core.graph import Graph
+from core.executor import Executor
+from core.registry import NodeRegistry
+
+PLUGIN = '''
+from core.node import Node
+
+class Triple(Node):
+    INPUT_TYPES = {"value": "int"}
+    OUTPUT_TYPES = {"value": "int"}
+    PARAMETERS = {}
+    FUSABLE = True
+
+    def execute(self, value):
+        return {"value": value * 3}
+
+def register(registry):
+    registry.add_lazy("Triple", "dataflow_test_plugin:Triple", inputs={"value": "int"}, outputs={"value": "int"},
+                      parameters={})
+'''
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(10))}
+
+
+class AddOne(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    FUSABLE = True
+
+    def execute(self, value):
+        if value == 3:
+            raise ValueError("three")
+        return {"value": value + 1}
+
+
+class Double(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    FUSABLE = True
+
+    def execute(self, value):
+        return {"value": value * 2}
+
+
+class Collect(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.values = []
+
+    def execute(self, value):
+        self.values.append(value)
+        return {}
+
+
+class Unsafe(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    THREAD_SAFE = False
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def execute(self, value):
+        with Unsafe.lock:
+            Unsafe.active += 1
+            Unsafe.peak = max(Unsafe.peak, Unsafe.active)
+        time.sleep(0.15) # дольше прохода планировщика: без ограничения задачи пересекались бы
+        with Unsafe.lock:
+            Unsafe.active -= 1
+        return {}
+
+
+NODE_TYPES = {"Numbers": Numbers, "AddOne": AddOne, "Double": Double, "Collect": Collect, "Unsafe": Unsafe}
+
+
+def _chain_graph():
+    graph = Graph(NODE_TYPES)
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}, {"id": "add", "type": "AddOne"},
+                  {"id": "double", "type": "Double"}, {"id": "sink", "type": "Collect"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "add", "to_input": "value"},
+                  {"from_node": "add", "from_output": "value", "to_node": "double", "to_input": "value"},
+                  {"from_node": "double", "from_output": "value", "to_node": "sink", "to_input": "value"}],
+    })
+    return graph
+
+
+def test_plugin_registers_nodes(tmp_path, monkeypatch):
+    (tmp_path / "dataflow_test_plugin.py").write_text(PLUGIN)
+    (tmp_path / "not_a_plugin.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = NodeRegistry()
+    registry.load_plugin("dataflow_test_plugin")
+    registry.load_plugin("dataflow_test_plugin") # повторная загрузка ничего не делает
+    assert list(registry) == ["Triple"] and registry.plugins == ["dataflow_test_plugin"]
+    assert registry["Triple"].FUSABLE
+    with pytest.raises(TypeError):
+        registry.load_plugin("not_a_plugin")
+
+
+@pytest.mark.parametrize("fusion", [True, False])
+def test_fusable_nodes_run_in_source_task(fusion):
+    graph = _chain_graph()
+    completed = []
+    executor = Executor(graph, max_workers=2, fusion=fusion)
+    status = executor.run(status_callback=lambda node_id, s: completed.append(node_id) if s == "completed" else None)
+    assert status == "finished"
+
+    assert sorted(graph.nodes["sink"].values) == [(i + 1) * 2 for i in range(10) if i != 3]
+    assert completed.count("add") == 9 and completed.count("double") == 9
+    tasks = executor.metrics.get("executor_tasks_total")
+    assert tasks.value(node_type="AddOne", status="error") == 1
+    fused = executor.metrics.get("executor_fused_total")
+    assert fused.value(node_type="AddOne") == (10 if fusion else 0)
+    assert fused.value(node_type="Double") == (9 if fusion else 0)
+
+
+def test_nodes_with_deadlines_are_not_fused():
+    graph = _chain_graph()
+    graph.nodes["double"].timeout = 5.0
+    executor = Executor(graph, max_workers=2)
+    assert executor.run() == "finished"
+    fused = executor.metrics.get("executor_fused_total")
+    assert fused.value(node_type="AddOne") == 10 and fused.value(node_type="Double") == 0
+
+    # Срок по умолчанию есть у каждого узла: слияние не применяется
+    graph = _chain_graph()
+    executor = Executor(graph, max_workers=2, node_timeout=5.0)
+    assert executor.run() == "finished"
+    assert executor.metrics.get("executor_fused_total").value(node_type="AddOne") == 0
+    assert sorted(graph.nodes["sink"].values) == [(i + 1) * 2 for i in range(10) if i != 3]
+
+
+def test_thread_unsafe_node_runs_one_task_at_a_time():
+    graph = Graph(NODE_TYPES)
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}, {"id": "unsafe", "type": "Unsafe"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "unsafe", "to_input": "value"}],
+    })
+    Unsafe.peak = 0
+    with concurrent.futures.ThreadPoolExecutor(4) as backend:
+        assert Executor(graph, max_workers=4, backend=backend).run() == "finished"
+    assert Unsafe.peak == 1
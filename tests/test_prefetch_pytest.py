@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+from typing import Dict, Any
+
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+from core.node import Node
+from core.graph import Graph
+from core.executor import Executor
+import core.prefetch
+from core.prefetch import PrefetchReader
+from nodes.image_nodes import NODE_REGISTRY
+
+
+class CountImages(Node):
+    INPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    INLINE = True
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.sizes = []
+
+    def execute(self, **inputs):
+        self.sizes.append(inputs["image"].size)
+        return {}
+
+
+def _write_images(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"img_{i}.png")
+        Image.new("RGB", (8 + i, 4), (i, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_reader_bounds_read_ahead(tmp_path):
+    paths = _write_images(str(tmp_path), 5)
+    reader = PrefetchReader(depth=2, threads=2)
+    try:
+        handles = [reader.request(path) for path in paths]
+        handles.append(reader.request(str(tmp_path / "missing.png")))
+        assert len(reader._active) == 2
+
+        taken = [reader.take(handle) for handle in handles]
+        assert taken[:5] == paths
+        assert all(item.data is not None for item in taken[:5])
+        assert taken[5].data is None
+        assert (reader.hits, reader.misses) == (5, 1)
+    finally:
+        reader.shutdown()
+
+
+
+def test_reader_reports_ready_only_after_read(tmp_path, monkeypatch):
+    paths = _write_images(str(tmp_path), 2)
+    release = threading.Event()
+    original = core.prefetch.read_file
+
+    def slow_read(path):
+        release.wait(5)
+        return original(path)
+
+    monkeypatch.setattr(core.prefetch, "read_file", slow_read)
+    reader = PrefetchReader(depth=1, threads=1)
+    try:
+        first, second = reader.request(paths[0]), reader.request(paths[1])
+        assert not reader.ready(first) and not reader.ready(second)
+        assert len(reader.reads) == 1
+        release.set()
+        reader.reads[0].result(timeout=5)
+        assert reader.ready(first) and not reader.ready(second)
+        assert reader.take(first).data is not None
+        assert reader.take(second).data is not None
+    finally:
+        reader.shutdown()
+
+def test_directory_pipeline_decodes_prefetched_files(tmp_path):
+    _write_images(str(tmp_path), 6)
+    graph = Graph(dict(NODE_REGISTRY, CountImages=CountImages))
+    graph.load_from_json({
+        "nodes": [
+            {"id": "list", "type": "ListImages", "params": {"directory": str(tmp_path), "pattern": "*.png"}},
+            {"id": "decode", "type": "DecodeImage"},
+            {"id": "count", "type": "CountImages"},
+        ],
+        "links": [
+            {"from_node": "list", "from_output": "path", "to_node": "decode", "to_input": "path"},
+            {"from_node": "decode", "from_output": "image", "to_node": "count", "to_input": "image"},
+        ],
+    })
+    executor = Executor(graph, max_workers=2, timeout=5, prefetch_depth=3)
+    assert executor.run() == "finished"
+
+    assert sorted(graph.nodes["count"].sizes) == [(8 + i, 4) for i in range(6)]
+    prefetch = executor.metrics.get("executor_prefetch_total")
+    assert prefetch.value(result="hit") + prefetch.value(result="miss") == 6
+    assert prefetch.value(result="hit") >= 3
+    assert executor._reader is None
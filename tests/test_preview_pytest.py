@@ -0,0 +1,63 @@
+import os
+import sys
+from typing import Dict, Any
+
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+from core.node import Node
+from core.graph import Graph
+from core.executor import Executor
+from nodes.image_nodes import NODE_REGISTRY
+
+
+class ImageInfo(Node):
+    INPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    INLINE = True
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.seen = []
+
+    def execute(self, **inputs):
+        image = inputs["image"]
+        self.seen.append((image.size, image.info.get("proxy_scale")))
+        return {}
+
+
+def _run(tmp_path, preview):
+    source = os.path.join(str(tmp_path), "photo.jpg")
+    Image.new("RGB", (1024, 512), (200, 10, 10)).save(source)
+    registry = dict(NODE_REGISTRY, ImageInfo=ImageInfo)
+    graph = Graph(registry)
+    graph.load_from_json({
+        "nodes": [{"id": "load", "type": "LoadImage", "params": {"path": source}},
+                  {"id": "blur", "type": "GaussianBlur", "params": {"radius": 8.0}},
+                  {"id": "info", "type": "ImageInfo"},
+                  {"id": "save", "type": "SaveImage", "params": {"path_prefix": os.path.join(str(tmp_path), "out")}}],
+        "links": [{"from_node": "load", "from_output": "image", "to_node": "blur", "to_input": "image"},
+                  {"from_node": "blur", "from_output": "image", "to_node": "info", "to_input": "image"},
+                  {"from_node": "blur", "from_output": "image", "to_node": "save", "to_input": "image"}],
+    })
+    executor = Executor(graph, max_workers=2, preview=preview)
+    statuses = []
+    assert executor.run(status_callback=lambda node_id, status: statuses.append((node_id, status))) == "finished"
+    return executor.graph.nodes["info"].seen, statuses
+
+
+def test_preview_runs_on_proxies_and_skips_side_effects(tmp_path):
+    seen, statuses = _run(tmp_path, preview=128)
+    assert seen == [((128, 64), 0.125)]
+    assert not any(node_id == "save" for node_id, _ in statuses)
+    assert not any(name.startswith("out") for name in os.listdir(str(tmp_path)))
+
+    # Обычный запуск - полный размер и запись результата
+    seen, _ = _run(tmp_path, preview=None)
+    assert seen == [((1024, 512), None)]
+    assert any(name.startswith("out") for name in os.listdir(str(tmp_path)))
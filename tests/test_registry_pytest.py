@@ -0,0 +1,57 @@
+import os
+import sys
+import subprocess
+from typing import Dict, Any
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+from core.node import Node
+from core.graph import Graph
+from core.registry import NodeRegistry
+from nodes.registry import NODE_REGISTRY
+
+
+class Echo(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, value):
+        return {"value": value}
+
+
+def test_metadata_is_available_without_importing_implementations():
+    script = ("import sys; sys.path.insert(0, sys.argv[1]); from nodes.registry import NODE_REGISTRY; "
+              "spec = NODE_REGISTRY.spec('GaussianBlur'); "
+              "print(spec.PARAMETERS['radius'].__name__, sorted(NODE_REGISTRY)[0], "
+              "'nodes.image_nodes' in sys.modules, 'numpy' in sys.modules, 'PIL' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", script, SRC_ROOT], capture_output=True, text=True, timeout=60)
+    assert result.stdout.split() == ["float", "BlendImages", "False", "False", "False"], result.stderr
+
+
+def test_lazy_registrations_match_their_classes():
+    from nodes.image_nodes import NODE_REGISTRY as CLASSES
+    assert sorted(NODE_REGISTRY) == sorted(CLASSES)
+    for name in NODE_REGISTRY:
+        assert NODE_REGISTRY[name] is CLASSES[name] # загрузка сверяет порты и параметры с описанием
+
+
+def test_registry_loads_on_first_use_and_checks_metadata():
+    registry = NodeRegistry()
+    registry.add_lazy("Echo", f"{__name__}:Echo", inputs={"value": "int"}, outputs={"value": "int"}, parameters={})
+    registry.add_lazy("Broken", f"{__name__}:Echo", inputs={"other": "int"}, outputs={}, parameters={})
+    assert not registry.is_loaded("Echo")
+
+    graph = Graph(registry)
+    graph.load_from_json({"nodes": [{"id": "a", "type": "Echo"}]})
+    assert isinstance(graph.nodes["a"], Echo) and registry.is_loaded("Echo")
+
+    with pytest.raises(TypeError):
+        registry["Broken"]
+    with pytest.raises(ValueError):
+        registry.add(Echo)
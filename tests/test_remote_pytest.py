@@ -0,0 +1,165 @@
+import os
+import sys
+from typing import Dict, Any
+
+import asyncio
+import multiprocessing
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.remote import RemoteBackend, RemoteRef, spawn_local_workers
+
+
+class Blob(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"data": "bytes"}
+    PARAMETERS: Dict[str, Any] = {"size": int}
+
+    def execute(self, **inputs):
+        return {"data": b"x" * self.params.get("size", 16)}
+
+
+class Measure(Node):
+    INPUT_TYPES: Dict[str, Any] = {"data": "bytes"}
+    OUTPUT_TYPES: Dict[str, Any] = {"length": "int", "worker": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.length = None
+
+    def execute(self, **inputs):
+        self.length = len(inputs["data"])
+        return {"length": self.length, "worker": os.getpid()}
+
+
+class Chunks(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"data": "bytes"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"data": Items(b"y" * size for size in (2048, 3072, 4096))}
+
+
+REGISTRY = {"Blob": Blob, "Measure": Measure, "Chunks": Chunks}
+
+
+@pytest.fixture
+def workers():
+    addresses, processes = spawn_local_workers(2, inline_bytes=1024)
+    yield addresses
+    for process in processes:
+        process.terminate()
+        process.join()
+
+
+def test_remote_backend_runs_graph_and_keeps_large_outputs_on_workers(workers):
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "big", "type": "Blob", "params": {"size": 4096}},
+            {"id": "small", "type": "Blob", "params": {"size": 8}},
+            {"id": "m_big", "type": "Measure", "params": {}},
+            {"id": "m_small", "type": "Measure", "params": {}},
+        ],
+        "links": [
+            {"from_node": "big", "from_output": "data", "to_node": "m_big", "to_input": "data"},
+            {"from_node": "small", "from_output": "data", "to_node": "m_small", "to_input": "data"},
+        ],
+    })
+
+    backend = RemoteBackend(workers)
+
+    def status_callback(node_id, status):
+        assert status != "error"
+
+    executor = Executor(graph, max_workers=2, timeout=5, backend=backend)
+    try:
+        executor.run(status_callback=status_callback)
+        big_ref = backend.submit(Blob("again", {"size": 2048}).execute).result()["data"]
+        assert isinstance(big_ref, RemoteRef)
+        assert backend.resolve(big_ref) == b"x" * 2048
+    finally:
+        backend.shutdown()
+
+    assert executor.outcome == "finished"
+    assert graph.get_node("m_big").length == 4096
+    assert graph.get_node("m_small").length == 8
+
+
+def test_placement_prefers_worker_holding_inputs(workers):
+    backend = RemoteBackend(workers)
+    try:
+        first, second = workers
+        ref = RemoteRef(second, "k", 10_000)
+        assert backend._place([ref]).address == tuple(second)
+        assert backend._place([]).address in (tuple(first), tuple(second))
+    finally:
+        backend.shutdown()
+
+
+def test_items_fan_out_and_event_outputs_are_resolved(workers):
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [{"id": "chunks", "type": "Chunks"}, {"id": "measure", "type": "Measure"}],
+        "links": [{"from_node": "chunks", "from_output": "data", "to_node": "measure", "to_input": "data"}],
+    })
+    backend = RemoteBackend(workers)
+
+    async def collect():
+        return [event async for event in Executor(graph, max_workers=2, timeout=5, backend=backend).events()
+                if event.status == "completed"]
+
+    try:
+        events = asyncio.run(collect())
+    finally:
+        backend.shutdown()
+
+    chunks = [event.outputs["data"] for event in events if event.node_id == "chunks"][0]
+    assert isinstance(chunks, Items)
+    assert [len(chunk) for chunk in chunks] == [2048, 3072, 4096]
+    lengths = sorted(event.outputs["length"] for event in events if event.node_id == "measure")
+    assert lengths == [2048, 3072, 4096]
+
+
+class RecordingBackend(RemoteBackend):
+    def __init__(self, addresses):
+        super().__init__(addresses)
+        self.released = []
+
+    def release(self, refs):
+        self.released.extend(refs)
+        super().release(refs)
+
+
+def test_worker_values_are_released_after_last_consumer(workers):
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [{"id": "chunks", "type": "Chunks"}, {"id": "a", "type": "Measure"}, {"id": "b", "type": "Measure"}],
+        "links": [{"from_node": "chunks", "from_output": "data", "to_node": "a", "to_input": "data"},
+                  {"from_node": "chunks", "from_output": "data", "to_node": "b", "to_input": "data"}],
+    })
+    backend = RecordingBackend(workers)
+    try:
+        assert Executor(graph, max_workers=2, timeout=5, backend=backend).run() == "finished"
+        # Каждый фрагмент освобожден один раз - после обоих потребителей
+        assert sorted(ref.nbytes for ref in backend.released) == [2048, 3072, 4096]
+        for ref in backend.released:
+            with pytest.raises(KeyError):
+                backend.resolve(ref)
+    finally:
+        backend.shutdown()
+    assert graph.get_node("a").length == graph.get_node("b").length == 4096
+
+
+def test_worker_rejects_client_without_shared_key(workers):
+    with pytest.raises((multiprocessing.AuthenticationError, ConnectionError)):
+        RemoteBackend(workers, authkey=b"wrong key")
@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+from typing import Dict, Any
+
+import pytest
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.resources import ResourceBudget, task_demand, validate_resources
+
+_lock = threading.Lock()
+_running: Dict[str, int] = {"heavy": 0, "total": 0}
+_peaks: Dict[str, int] = {"heavy": 0, "total": 0}
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(6))}
+
+
+class Work(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {"kind": str}
+
+    def execute(self, **inputs):
+        kind = self.params.get("kind", "light")
+        with _lock:
+            for key in (kind, "total"):
+                if key in _running:
+                    _running[key] += 1
+                    _peaks[key] = max(_peaks[key], _running[key])
+        time.sleep(0.03)
+        with _lock:
+            for key in (kind, "total"):
+                if key in _running:
+                    _running[key] -= 1
+        return {}
+
+
+def test_graph_overrides_resources_per_instance():
+    graph = Graph({"Work": Work})
+    graph.load_from_json({"nodes": [
+        {"id": "a", "type": "Work", "resources": {"memory_mb": 500, "io": True}, "concurrency_level": 2},
+        {"id": "b", "type": "Work"},
+    ]})
+    assert graph.nodes["a"].resources == {"cpu": 1, "memory_mb": 500, "memory_per_mpx": 0, "io": True}
+    assert graph.nodes["a"].concurrency_level == 2
+    assert graph.nodes["b"].resources == validate_resources({})
+
+    with pytest.raises(ValueError):
+        graph.load_from_json({"nodes": [{"id": "a", "type": "Work", "resources": {"gpu": 1}}]})
+    with pytest.raises(ValueError):
+        graph.load_from_json({"nodes": [{"id": "a", "type": "Work", "concurrency_level": 0}]})
+
+
+def test_demand_scales_with_megapixels_and_oversized_task_runs_alone():
+    demand = task_demand(validate_resources({"memory_mb": 10, "memory_per_mpx": 8}),
+                         {"a": Image.new("RGB", (1000, 1000)), "b": [Image.new("L", (500, 1000))]})
+    assert demand == {"cpu": 1, "memory": pytest.approx(22.0), "io": 0}
+
+    budget = ResourceBudget({"memory": 15})
+    assert budget.fits(demand)   # пустой бюджет принимает даже слишком крупную задачу
+    budget.acquire(demand)
+    assert not budget.fits({"cpu": 1, "memory": 1, "io": 0})
+    assert budget.fits({"cpu": 1, "memory": 0, "io": 0})
+    budget.release(demand)
+    assert budget.in_use == {"cpu": 0, "memory": 0, "io": 0}
+
+    io_task = {"cpu": 1, "memory": 0, "io": 1}
+    default = ResourceBudget.default(cpu=8)
+    default.acquire(io_task)
+    assert default.fits(io_task)   # монопольный I/O включается явно
+    exclusive = ResourceBudget.default(cpu=8, overrides={"io": 1})
+    exclusive.acquire(io_task)
+    assert not exclusive.fits(io_task)
+
+
+def test_scheduler_packs_heavy_tasks_against_memory_budget():
+    graph = Graph({"Numbers": Numbers, "Work": Work})
+    graph.load_from_json({
+        "nodes": [
+            {"id": "numbers", "type": "Numbers"},
+            {"id": "heavy", "type": "Work", "params": {"kind": "heavy"}, "resources": {"memory_mb": 60}},
+            {"id": "light", "type": "Work", "params": {"kind": "light"}},
+        ],
+        "links": [
+            {"from_node": "numbers", "from_output": "value", "to_node": "heavy", "to_input": "value"},
+            {"from_node": "numbers", "from_output": "value", "to_node": "light", "to_input": "value"},
+        ],
+    })
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as backend:
+        executor = Executor(graph, max_workers=8, timeout=5, backend=backend, resources={"memory": 100})
+        assert executor.run() == "finished"
+
+    assert _peaks["heavy"] == 1       # две тяжелые задачи не помещаются в 100 МБ
+    assert _peaks["total"] > 1        # легкие задачи выполнялись параллельно с ними
+    assert executor.budget.in_use == {"cpu": 0, "memory": 0, "io": 0}
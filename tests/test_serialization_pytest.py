@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import glob
+import pickle
+import asyncio
+from typing import Dict, Any
+
+import numpy as np
+import pytest
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.serialization import encode, decode, dumps, loads
+from src.core.payloads import SharedValue
+
+
+class ImageSource(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"image": Image.new("RGB", (128, 128), (9, 8, 7))}
+
+
+class ImageSink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        self.pixel = inputs["image"].getpixel((5, 5))
+        return {}
+
+
+class BigArray(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"array": "Array"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        time.sleep(0.5)
+        return {"array": np.zeros(16 * 1024 * 1024, dtype=np.uint8)}
+
+
+class ArraySink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"array": "Array"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {}
+
+
+def test_images_and_arrays_use_out_of_band_buffers():
+    image = Image.new("RGB", (64, 32), (1, 2, 3))
+    image.info["dpi"] = (72, 72)
+    palette = Image.new("P", (8, 8), 5)
+    palette.putpalette([i % 256 for i in range(768)])
+    array = np.arange(1000, dtype=np.float32).reshape(10, 100)
+    value = {"image": image, "palette": palette, "arrays": [array, array[:, ::2]]}
+
+    frame = encode(value)
+    # заголовок, поток pickle и отдельные буферы пикселей изображений и массива
+    assert len(frame.parts) >= 5
+
+    restored = decode(frame.tobytes())
+    assert restored["image"].tobytes() == image.tobytes()
+    assert restored["image"].info["dpi"] == (72, 72)
+    assert restored["palette"].getpalette() == palette.getpalette()
+    assert np.array_equal(restored["arrays"][0], array)
+    assert np.array_equal(restored["arrays"][1], array[:, ::2])
+
+
+
+def test_frame_pickles_parts_without_joining():
+    image = Image.new("RGB", (64, 32), (1, 2, 3))
+    frame = encode({"image": image})
+    image_part = frame.parts[2]
+    assert frame.__reduce__()[1][1][2] is image_part.obj # пиксели передаются исходным объектом bytes
+
+    restored = decode(pickle.loads(pickle.dumps(frame)))
+    assert restored["image"].tobytes() == image.tobytes()
+
+def test_compression_and_shared_frames():
+    array = np.zeros((256, 256), dtype=np.uint8)
+    plain = dumps(array)
+    packed = dumps(array, compression="zlib")
+    assert len(packed) < len(plain) // 10
+    assert np.array_equal(loads(packed), array)
+    with pytest.raises(ValueError):
+        encode(array, compression="brotli")
+
+    shared = SharedValue.from_frame(encode(array))
+    try:
+        restored = shared.load()
+    finally:
+        shared.release()
+    assert np.array_equal(restored, array)
+
+
+def test_executor_transfers_payloads_through_frames_and_shared_memory():
+    graph = Graph({"ImageSource": ImageSource, "ImageSink": ImageSink})
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "ImageSource"}, {"id": "sink", "type": "ImageSink"}],
+        "links": [{"from_node": "src", "from_output": "image", "to_node": "sink", "to_input": "image"}],
+    })
+    executor = Executor(graph, max_workers=1, timeout=5, compression="zlib", transfer_threshold=1)
+    assert executor.run() == "finished"
+    assert graph.nodes["sink"].pixel == (9, 8, 7)
+    assert executor._shared == {}
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_dropped_task_result_leaves_no_shared_memory():
+    graph = Graph({"BigArray": BigArray, "ArraySink": ArraySink})
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "BigArray"}, {"id": "sink", "type": "ArraySink"}],
+        "links": [{"from_node": "src", "from_output": "array", "to_node": "sink", "to_input": "array"}],
+    })
+    executor = Executor(graph, max_workers=1, timeout=5, transfer_threshold=1024 * 1024)
+    before = set(glob.glob("/dev/shm/psm_*"))
+
+    async def first_event():
+        async for event in executor.events():
+            return event
+
+    # Итерация прервана, пока узел еще выполняется: его результат в разделяемой памяти никто не заберет
+    assert asyncio.run(first_event()).status == "running"
+    assert set(glob.glob("/dev/shm/psm_*")) - before == set()
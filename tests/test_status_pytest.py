@@ -0,0 +1,66 @@
+import os
+import sys
+from typing import Dict, Any
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node, Items
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.status import StatusChannel, StatusUpdate
+
+
+class Numbers(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"value": Items(range(40))}
+
+
+class Double(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    OUTPUT_TYPES: Dict[str, Any] = {"value": "int"}
+    PARAMETERS: Dict[str, Any] = {}
+    INLINE = True
+
+    def execute(self, value):
+        return {"value": value * 2}
+
+
+def test_channel_coalesces_transitions_per_node():
+    batches = []
+    channel = StatusChannel(batches.append, interval=3600)
+    channel("a", "running") # первая доставка сразу
+    for _ in range(3):
+        channel("b", "running")
+        channel("b", "completed")
+    channel("a", "error")
+    assert batches == [[StatusUpdate("a", "running", 1, 0, 0)]]
+
+    channel.flush()
+    assert batches[1] == [StatusUpdate("b", "completed", 3, 3, 0), StatusUpdate("a", "error", 1, 0, 1)]
+    assert batches[1][0].active == 0
+    channel.flush() # нечего доставлять
+    assert len(batches) == 2
+
+
+def test_executor_delivers_status_batches():
+    graph = Graph({"Numbers": Numbers, "Double": Double})
+    graph.load_from_json({
+        "nodes": [{"id": "src", "type": "Numbers"}, {"id": "double", "type": "Double"}],
+        "links": [{"from_node": "src", "from_output": "value", "to_node": "double", "to_input": "value"}],
+    })
+    batches = []
+    transitions = []
+    executor = Executor(graph, max_workers=2, status_handler=batches.append, status_interval=3600)
+    assert executor.run(status_callback=lambda node_id, status: transitions.append(status)) == "finished"
+
+    assert len(transitions) == 82
+    # Первая доставка - сразу, остальное накапливается до конца запуска
+    assert len(batches) == 2
+    final = {update.node_id: update for update in batches[-1]}
+    assert final["double"] == StatusUpdate("double", "completed", 40, 40, 0)
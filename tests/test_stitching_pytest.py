@@ -0,0 +1,157 @@
+import os
+import sys
+from typing import Dict, Any
+
+import numpy as np
+import pytest
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.append(SRC_ROOT)
+
+# Узлы из nodes.image_nodes импортируют core.*, поэтому исполнитель берется из того же пакета
+from core.node import Node
+from core.graph import Graph
+from core.executor import Executor
+from nodes.image_nodes import NODE_REGISTRY
+from core.node import Items
+from nodes.stitching import stitch
+
+
+def _gradient(width, height, mode="RGB"):
+    data = (np.arange(width * height * 3, dtype=np.uint32) % 251).astype(np.uint8).reshape(height, width, 3)
+    return Image.fromarray(data).convert(mode)
+
+
+class GradientSource(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"image": _gradient(40, 30)}
+
+
+class ColorSources(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"image": Items(Image.new("RGB", (20, 24), (v, v, v)) for v in (30, 120, 210))}
+
+
+class Capture(Node):
+    INPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+    CONCURRENCY_LEVEL = 1 # список результатов хранится в состоянии узла
+
+    def __init__(self, node_id, params=None):
+        super().__init__(node_id, params)
+        self.images = []
+
+    def execute(self, **inputs):
+        self.image = inputs["image"]
+        self.images.append(self.image)
+        return {}
+
+
+def test_stitch_layouts_keep_mode_and_pixels():
+    a, b, c = _gradient(4, 3, "L"), _gradient(2, 5, "L"), _gradient(3, 2, "L")
+
+    vertical = stitch([a, b, c])
+    assert vertical.mode == "L" and vertical.size == (4, 10)
+    assert np.array_equal(np.asarray(vertical)[3:8, :2], np.asarray(b))
+
+    horizontal = stitch([a, b, c], "horizontal")
+    assert horizontal.size == (9, 5)
+    assert np.array_equal(np.asarray(horizontal)[:2, 6:9], np.asarray(c))
+
+    grid = stitch([a, b, c], "grid", columns=2)
+    assert grid.size == (6, 7)
+    assert np.array_equal(np.asarray(grid)[5:7, :3], np.asarray(c))
+
+    assert stitch([a, _gradient(2, 2, "RGBA")]).mode == "RGBA"
+    with pytest.raises(ValueError):
+        stitch([a], "diagonal")
+
+
+def test_stream_stitch_reassembles_sliced_tiles():
+    registry = dict(NODE_REGISTRY, GradientSource=GradientSource, Capture=Capture)
+    graph = Graph(registry)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "GradientSource"},
+            {"id": "slice", "type": "SliceImage", "params": {"num_slices": 4}},
+            {"id": "gray", "type": "Grayscale"},
+            {"id": "stitch", "type": "StreamStitch"},
+            {"id": "out", "type": "Capture"},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "image", "to_node": "slice", "to_input": "image"},
+            {"from_node": "slice", "from_output": "tiles", "to_node": "gray", "to_input": "image"},
+            {"from_node": "gray", "from_output": "image", "to_node": "stitch", "to_input": "tile"},
+            {"from_node": "stitch", "from_output": "image", "to_node": "out", "to_input": "image"},
+        ],
+    })
+    executor = Executor(graph, max_workers=2, timeout=5)
+    assert executor.run() == "finished"
+
+    result = graph.nodes["out"].image
+    assert result.mode == "L" and result.size == (40, 30)
+    assert np.array_equal(np.asarray(result), np.asarray(_gradient(40, 30).convert("L")))
+    assert executor.metrics.get("executor_tasks_total").value(node_type="Grayscale", status="completed") == 4
+
+
+def test_slices_travel_as_shared_memory_views():
+    registry = dict(NODE_REGISTRY, GradientSource=GradientSource, Capture=Capture)
+    graph = Graph(registry)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "GradientSource"},
+            {"id": "slice", "type": "SliceImage", "params": {"num_slices": 3}},
+            {"id": "stitch", "type": "StitchPanorama"},
+            {"id": "out", "type": "Capture"},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "image", "to_node": "slice", "to_input": "image"},
+            {"from_node": "slice", "from_output": "images", "to_node": "stitch", "to_input": "images"},
+            {"from_node": "stitch", "from_output": "image", "to_node": "out", "to_input": "image"},
+        ],
+    })
+    executor = Executor(graph, max_workers=2, timeout=5)
+    assert executor.run() == "finished"
+
+    assert np.array_equal(np.asarray(graph.nodes["out"].image), np.asarray(_gradient(40, 30)))
+    # SliceImage вернул только представления строк, пиксели не сериализовались
+    assert executor.metrics.get("executor_payload_bytes_total").value(node_type="SliceImage", direction="out") == 0
+    assert executor._shared == {}
+
+
+def test_stream_stitch_keeps_interleaved_images_apart():
+    registry = dict(NODE_REGISTRY, ColorSources=ColorSources, Capture=Capture)
+    graph = Graph(registry)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "ColorSources"},
+            {"id": "slice", "type": "SliceImage", "params": {"num_slices": 4}},
+            {"id": "gray", "type": "Grayscale"},
+            {"id": "stitch", "type": "StreamStitch"},
+            {"id": "out", "type": "Capture"},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "image", "to_node": "slice", "to_input": "image"},
+            {"from_node": "slice", "from_output": "tiles", "to_node": "gray", "to_input": "image"},
+            {"from_node": "gray", "from_output": "image", "to_node": "stitch", "to_input": "tile"},
+            {"from_node": "stitch", "from_output": "image", "to_node": "out", "to_input": "image"},
+        ],
+    })
+    assert Executor(graph, max_workers=4, timeout=5).run() == "finished"
+
+    results = graph.nodes["out"].images
+    assert len(results) == 3
+    assert sorted(img.getextrema() for img in results) == [(30, 30), (120, 120), (210, 210)]
+    assert graph.nodes["stitch"].canvases == {}
@@ -0,0 +1,89 @@
+import os
+import sys
+import concurrent.futures
+from typing import Dict, Any
+
+import numpy as np
+import pytest
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.core.node import Node
+from src.core.graph import Graph
+from src.core.executor import Executor
+from src.core.types import link_conversion
+
+
+class ImageSource(Node):
+    INPUT_TYPES: Dict[str, Any] = {}
+    OUTPUT_TYPES: Dict[str, Any] = {"image": "Image"}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {"image": Image.new("RGB", (4, 3), (10, 20, 30))}
+
+
+class ArraySink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"array": "Array"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        self.value = inputs["array"]
+        return {}
+
+
+class FloatSink(Node):
+    INPUT_TYPES: Dict[str, Any] = {"value": "float"}
+    OUTPUT_TYPES: Dict[str, Any] = {}
+    PARAMETERS: Dict[str, Any] = {}
+
+    def execute(self, **inputs):
+        return {}
+
+
+REGISTRY = {"ImageSource": ImageSource, "ArraySink": ArraySink, "FloatSink": FloatSink}
+
+
+def test_link_conversion_rules():
+    assert link_conversion("Image", "Image|List[Image]") is None
+    assert link_conversion("Any", "Array") is None
+    assert link_conversion("Image", "Array") == "Array"
+    assert link_conversion("List[Array]", "List[Image]") == "List[Image]"
+    with pytest.raises(ValueError):
+        link_conversion("Image", "float")
+
+    graph = Graph(REGISTRY)
+    with pytest.raises(ValueError, match="Type mismatch"):
+        graph.load_from_json({
+            "nodes": [{"id": "src", "type": "ImageSource"}, {"id": "f", "type": "FloatSink"}],
+            "links": [{"from_node": "src", "from_output": "image", "to_node": "f", "to_input": "value"}],
+        })
+
+
+def test_image_converted_once_per_output_for_array_consumers():
+    graph = Graph(REGISTRY)
+    graph.load_from_json({
+        "nodes": [
+            {"id": "src", "type": "ImageSource"},
+            {"id": "a1", "type": "ArraySink"},
+            {"id": "a2", "type": "ArraySink"},
+        ],
+        "links": [
+            {"from_node": "src", "from_output": "image", "to_node": "a1", "to_input": "array"},
+            {"from_node": "src", "from_output": "image", "to_node": "a2", "to_input": "array"},
+        ],
+    })
+    assert all(link["convert"] == "Array" for link in graph.links)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        assert Executor(graph, max_workers=2, timeout=5, backend=pool).run() == "finished"
+
+    first, second = graph.nodes["a1"].value, graph.nodes["a2"].value
+    assert isinstance(first, np.ndarray)
+    assert first.shape == (3, 4, 3) and tuple(first[0, 0]) == (10, 20, 30)
+    assert first is second
+    assert not first.flags.writeable